@@ -0,0 +1,367 @@
+# GA checkpoints for warm restarts.
+# Every N generations the population, the fitness memo, the best genome and the
+# RNG states are written as one compact binary blob: a small JSON header followed
+# by little-endian arrays, zlib-compressed. /start looks for the newest checkpoint
+# of the session whose data fingerprint matches the current market and resumes
+# from it instead of a random population.
+#
+# Layout: MAGIC | u32 header length | header JSON | zlib(array block)
+# The header lists every array as (name, dtype, shape) in the order they appear.
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from fitness import GENOME_KEYS, population_matrix, scoring_of
+
+MAGIC = b"GACKPT1\0"
+FORMAT_VERSION = 1
+# Checkpoints kept per session; older ones are deleted after each save
+KEEP = 5
+
+
+class CheckpointError(Exception):
+    """Raised for blobs that are not valid checkpoints."""
+
+
+def _digest(market, start, stop):
+    digest = hashlib.blake2b(digest_size=16)
+    for column in (market.time, market.open, market.high, market.low, market.close, market.volume):
+        digest.update(np.ascontiguousarray(column[start:stop]).astype(column.dtype.newbyteorder("<")).tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint(market):
+    """
+    Identity of the bars a checkpoint was taken on: bar count, first/last bar time,
+    a digest of every column and one that leaves out the last bar, which may still
+    be forming and get overwritten by later updates.
+    """
+    n = len(market)
+    return {
+        "bars": n,
+        "first": int(market.time[0]) if n else None,
+        "last": int(market.time[-1]) if n else None,
+        "digest": _digest(market, 0, n),
+        "sealed": _digest(market, 0, max(n - 1, 0)),
+    }
+
+
+def match(saved, market):
+    """
+    How the current market relates to a checkpoint's fingerprint:
+      "exact"  - the same bars, so memoized scores are still valid
+      "prefix" - the checkpoint's bars (the last one possibly updated) followed by
+                 newer ones, the usual case after a cold start that re-fetched
+                 history; the population carries over but the scores do not
+      None     - different data
+    """
+    n = saved["bars"]
+    if not n or len(market) < n:
+        return None
+    start = int(np.searchsorted(market.time, saved["first"]))
+    stop = start + n
+    if stop > len(market) or market.time[start] != saved["first"] or market.time[stop - 1] != saved["last"]:
+        return None
+    if _digest(market, start, stop - 1) != saved["sealed"]:
+        return None
+    if start == 0 and stop == len(market) and _digest(market, start, stop) == saved["digest"]:
+        return "exact"
+    return "prefix"
+
+
+def _numpy_state(generator):
+    """
+    State of an MT19937 Generator in the layout np.random.get_state() uses, which is
+    what the format stores (checkpoints of the legacy global RNG restore as well).
+    """
+    state = generator.bit_generator.state
+    if state["bit_generator"] != "MT19937":
+        raise CheckpointError(f"cannot checkpoint a {state['bit_generator']} generator")
+    return ("MT19937", state["state"]["key"], state["state"]["pos"], 0, 0.0)
+
+
+class Checkpoint:
+    """Everything needed to continue a run: population, memo, best genome and RNG states."""
+
+    def __init__(self, generation, population, best_genome, best_fitness, memo_keys, memo_fitness,
+                 memo_positions, random_state, numpy_state, fingerprint, config=None, created=None):
+        self.generation = generation
+        self.population = population
+        self.best_genome = best_genome
+        self.best_fitness = best_fitness
+        self.memo_keys = memo_keys
+        self.memo_fitness = memo_fitness
+        self.memo_positions = memo_positions
+        self.random_state = random_state
+        self.numpy_state = numpy_state
+        self.fingerprint = fingerprint
+        self.config = config or {}
+        self.created = created if created is not None else time.time()
+
+    @classmethod
+    def capture(cls, state, population, market, memo_version):
+        """
+        Snapshot a run. The caller holds no lock: generation and best genome are read
+        under state.lock, the memo copies its own rows.
+        """
+        with state.lock:
+            generation = state.generation
+            best_genome = dict(state.best_genome) if state.best_genome else None
+            best_fitness = state.best_fitness
+            config = {k: state.config[k] for k in ("population_size", "num_parents", "fitness", "folds")}
+        keys, fitness, positions = state.memo.entries(memo_version, scoring_of(config))
+        return cls(
+            generation=generation,
+            population=population_matrix(population),
+            best_genome=best_genome,
+            best_fitness=best_fitness,
+            memo_keys=np.array(keys, dtype=np.int64).reshape(-1, len(GENOME_KEYS)),
+            memo_fitness=np.asarray(fitness, dtype=np.float64),
+            memo_positions=np.asarray(positions, dtype=np.int8),
+            random_state=state.rng.getstate(),
+            numpy_state=_numpy_state(state.np_rng),
+            fingerprint=fingerprint(market),
+            config=config,
+        )
+
+    def genomes(self):
+        """The saved population as genome dicts."""
+        return [dict(zip(GENOME_KEYS, map(int, row))) for row in self.population]
+
+    def restore_rng(self, state):
+        """Continue the saved random sequences in the session's own generators."""
+        state.rng.setstate(self.random_state)
+        name, words, pos, _, _ = self.numpy_state
+        state.np_rng.bit_generator.state = {
+            "bit_generator": name,
+            "state": {"key": np.asarray(words, dtype=np.uint32), "pos": int(pos)},
+        }
+
+    def to_bytes(self, level=6):
+        py_version, py_words, py_gauss = self.random_state
+        np_name, np_words, np_pos, np_has_gauss, np_gauss = self.numpy_state
+        arrays = [
+            ("population", self.population.astype("<i8")),
+            ("memo_keys", self.memo_keys.astype("<i8")),
+            ("memo_fitness", self.memo_fitness.astype("<f8")),
+            ("memo_positions", self.memo_positions.astype("i1")),
+            ("random_words", np.asarray(py_words, dtype="<u4")),
+            ("numpy_words", np.asarray(np_words, dtype="<u4")),
+        ]
+        header = {
+            "format": FORMAT_VERSION,
+            "created": self.created,
+            "generation": self.generation,
+            "best_genome": self.best_genome,
+            # JSON has no infinities; -inf means no genome has been scored yet
+            "best_fitness": self.best_fitness if np.isfinite(self.best_fitness) else None,
+            "fingerprint": self.fingerprint,
+            "config": self.config,
+            "random": {"version": py_version, "gauss": py_gauss},
+            "numpy": {"name": np_name, "pos": int(np_pos), "has_gauss": int(np_has_gauss), "gauss": float(np_gauss)},
+            "arrays": [(name, array.dtype.str, array.shape) for name, array in arrays],
+        }
+        head = json.dumps(header, separators=(",", ":")).encode()
+        body = zlib.compress(b"".join(array.tobytes() for _, array in arrays), level)
+        return MAGIC + struct.pack("<I", len(head)) + head + body
+
+    @staticmethod
+    def read_header(blob):
+        if blob[:len(MAGIC)] != MAGIC:
+            raise CheckpointError("not a GA checkpoint")
+        offset = len(MAGIC)
+        (length,) = struct.unpack_from("<I", blob, offset)
+        offset += 4
+        header = json.loads(blob[offset:offset + length])
+        if header.get("format") != FORMAT_VERSION:
+            raise CheckpointError(f"unsupported checkpoint format {header.get('format')}")
+        return header, offset + length
+
+    @classmethod
+    def from_bytes(cls, blob):
+        header, offset = cls.read_header(blob)
+        try:
+            body = zlib.decompress(blob[offset:])
+        except zlib.error as e:
+            raise CheckpointError(f"corrupt checkpoint body: {e}") from None
+        arrays, pos = {}, 0
+        for name, dtype, shape in header["arrays"]:
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            arrays[name] = np.frombuffer(body, dtype=dtype, count=count, offset=pos).reshape(shape)
+            pos += count * dtype.itemsize
+        if pos != len(body):
+            raise CheckpointError("checkpoint body does not match its header")
+
+        rnd, npy = header["random"], header["numpy"]
+        best_fitness = header["best_fitness"]
+        return cls(
+            generation=header["generation"],
+            population=arrays["population"].astype(np.int64),
+            best_genome=header["best_genome"],
+            best_fitness=-np.inf if best_fitness is None else best_fitness,
+            memo_keys=arrays["memo_keys"].astype(np.int64),
+            memo_fitness=arrays["memo_fitness"].astype(np.float64),
+            memo_positions=arrays["memo_positions"].astype(np.int64),
+            random_state=(rnd["version"], tuple(int(w) for w in arrays["random_words"]), rnd["gauss"]),
+            numpy_state=(npy["name"], arrays["numpy_words"].astype(np.uint32), npy["pos"],
+                         npy["has_gauss"], npy["gauss"]),
+            fingerprint=header["fingerprint"],
+            config=header["config"],
+            created=header["created"],
+        )
+
+
+# --- Storage backends ---
+
+class CheckpointStore:
+    """
+    Where checkpoint blobs live. Backends implement put/get/names/delete for opaque
+    names within a session; names sort in save order.
+    """
+
+    def put(self, session, name, blob):
+        raise NotImplementedError
+
+    def get(self, session, name):
+        raise NotImplementedError
+
+    def names(self, session):
+        """Checkpoint names of a session, oldest first."""
+        raise NotImplementedError
+
+    def delete(self, session, name):
+        raise NotImplementedError
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """One file per checkpoint under <root>/<session>/, written atomically."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _dir(self, session):
+        return os.path.join(self.root, session)
+
+    def put(self, session, name, blob):
+        directory = self._dir(session)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, os.path.join(directory, name))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def get(self, session, name):
+        with open(os.path.join(self._dir(session), name), "rb") as f:
+            return f.read()
+
+    def names(self, session):
+        try:
+            return sorted(n for n in os.listdir(self._dir(session)) if n.endswith(".ckpt"))
+        except FileNotFoundError:
+            return []
+
+    def delete(self, session, name):
+        try:
+            os.unlink(os.path.join(self._dir(session), name))
+        except FileNotFoundError:
+            pass
+
+
+class BucketCheckpointStore(CheckpointStore):
+    """Cloud Storage bucket of the Firebase project, so checkpoints outlive the instance."""
+
+    def __init__(self, bucket=None, prefix="ga-checkpoints"):
+        from firebase_admin import storage
+        self.bucket = storage.bucket(bucket)
+        self.prefix = prefix.rstrip("/")
+
+    def _path(self, session, name=""):
+        return f"{self.prefix}/{session}/{name}"
+
+    def put(self, session, name, blob):
+        self.bucket.blob(self._path(session, name)).upload_from_string(blob, content_type="application/octet-stream")
+
+    def get(self, session, name):
+        return self.bucket.blob(self._path(session, name)).download_as_bytes()
+
+    def names(self, session):
+        blobs = self.bucket.list_blobs(prefix=self._path(session))
+        return sorted(b.name.rsplit("/", 1)[-1] for b in blobs if b.name.endswith(".ckpt"))
+
+    def delete(self, session, name):
+        self.bucket.blob(self._path(session, name)).delete()
+
+
+def default_store():
+    """GA_CHECKPOINT_BUCKET selects Cloud Storage, otherwise files under GA_CHECKPOINT_DIR."""
+    bucket = os.environ.get("GA_CHECKPOINT_BUCKET")
+    if bucket:
+        return BucketCheckpointStore(bucket)
+    return LocalCheckpointStore(os.environ.get("GA_CHECKPOINT_DIR",
+                                               os.path.join(tempfile.gettempdir(), "ga-checkpoints")))
+
+
+class Checkpointer:
+    """Saves and finds checkpoints of one session in a CheckpointStore."""
+
+    def __init__(self, store, session, keep=KEEP):
+        self.store = store
+        self.session = session or "default"
+        self.keep = keep
+
+    def save(self, checkpoint):
+        # Names sort by save time, so a fresh run's checkpoints supersede an older run's
+        name = f"{int(checkpoint.created * 1000):013d}-{checkpoint.generation:010d}.ckpt"
+        blob = checkpoint.to_bytes()
+        self.store.put(self.session, name, blob)
+        for old in self.store.names(self.session)[:-self.keep]:
+            self.store.delete(self.session, old)
+        return name, len(blob)
+
+    def latest(self, market):
+        """
+        Newest checkpoint whose fingerprint matches `market`, as (checkpoint, match),
+        or (None, None). Unreadable checkpoints are skipped.
+        """
+        for name in reversed(self.store.names(self.session)):
+            try:
+                blob = self.store.get(self.session, name)
+                header, _ = Checkpoint.read_header(blob)
+                how = match(header["fingerprint"], market)
+                if how is not None:
+                    return Checkpoint.from_bytes(blob), how
+            except (CheckpointError, OSError, ValueError, KeyError) as e:
+                print(f"Skipping checkpoint {self.session}/{name}: {e}")
+        return None, None
+
+
+def restore_memo(memo, checkpoint, version, config):
+    """
+    Load the checkpoint's memoized scores as scores of data `version`, unless they
+    were computed with a different fitness than `config` asks for.
+    """
+    keys = [tuple(int(v) for v in row) for row in checkpoint.memo_keys]
+    if not keys or scoring_of(checkpoint.config) != scoring_of(config):
+        return 0
+    memo.store(version, keys, checkpoint.memo_fitness, checkpoint.memo_positions, scoring_of(config))
+    return len(keys)
+
+
+def resize_population(genomes, size, create):
+    """Fit a restored population to the configured size: keep the first `size`, pad with `create()`."""
+    genomes = genomes[:size]
+    genomes += [create() for _ in range(size - len(genomes))]
+    return genomes
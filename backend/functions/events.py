@@ -0,0 +1,64 @@
+# Event log for pushing GA progress to clients.
+# The evolution loop publishes compact events (generation finished, new global
+# best, trade signal) into a bounded ring. Each event gets an increasing id, so
+# clients can long-poll or stream from a cursor and resume after a disconnect
+# without losing signals.
+
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+
+class EventLog:
+    """Bounded ring of recent events. Thread-safe."""
+
+    def __init__(self, maxlen=1000):
+        self._events = deque(maxlen=maxlen)
+        self._next_id = 1
+        self._cond = threading.Condition()
+
+    @property
+    def cursor(self):
+        """Id of the most recent event (0 if none yet)."""
+        with self._cond:
+            return self._next_id - 1
+
+    def publish(self, event_type, data):
+        with self._cond:
+            event = {"id": self._next_id, "type": event_type, "time": time.time(), "data": data}
+            self._next_id += 1
+            self._events.append(event)
+            self._cond.notify_all()
+            return event
+
+    def since(self, cursor):
+        """
+        Events with id > cursor, oldest first. The second value is True when some
+        events after the cursor have already been dropped from the ring.
+        """
+        with self._cond:
+            return self._since(cursor)
+
+    def wait(self, cursor, timeout):
+        """Like since(), but blocks up to `timeout` seconds until there is at least one event."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                events, missed = self._since(cursor)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events, missed
+                self._cond.wait(remaining)
+
+    def _since(self, cursor):
+        missed = False
+        if cursor > self._next_id - 1:
+            # Cursor from an earlier instance of the log: replay what we have
+            cursor, missed = 0, True
+        if not self._events or cursor >= self._events[-1]["id"]:
+            return [], missed
+        oldest = self._events[0]["id"]
+        missed = missed or cursor + 1 < oldest
+        start = max(0, cursor + 1 - oldest)
+        return list(islice(self._events, start, None)), missed
@@ -0,0 +1,188 @@
+# Population evaluation executors for the GA.
+# "serial" runs in the calling thread, "thread" splits the population over a
+# thread pool, and "process" uses a long-lived process pool that reads the
+# market data from shared memory, published once per data version.
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from fitness import evaluate_population
+from indicators import IndicatorCache
+
+EXECUTOR_MODES = ("serial", "thread", "process")
+# Fewest genomes worth a pool task; below this the scheduling overhead dominates
+MIN_CHUNK = 4
+
+
+class PopulationEvaluator:
+    """
+    Evaluates population parameter matrices with the configured executor.
+    The pool is created on first use and kept alive until close(), so it can be
+    reused across generations and GA restarts. Several GA sessions may share one
+    evaluator; `namespace` tells their market data series apart. A population is
+    split into about one chunk per worker, of at most `chunk_size` genomes.
+    """
+
+    def __init__(self, mode="serial", workers=None, chunk_size=64):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+        self.mode = mode
+        self.requested_workers = workers
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # namespace -> (SharedMemory, data version) of the block workers read from
+        self._shared = {}
+
+    def bind(self, namespace):
+        """This evaluator with `namespace` filled in, for callers that handle one series."""
+        return BoundEvaluator(self, namespace)
+
+    def evaluate(self, params, close, open_=None, version=0, cache=None, namespace=None, scoring=None,
+                 freq_per_year=252):
+        """Score the whole population. Returns (fitness, last_position) like evaluate_population."""
+        params = np.asarray(params, dtype=np.int64)
+        fitness = np.full(len(params), -np.inf)
+        last_position = np.zeros(len(params), dtype=np.int64)
+        for rows, chunk_fitness, chunk_position in self.iter_evaluate(params, close, open_, version, cache, namespace,
+                                                                            scoring, freq_per_year):
+            fitness[rows] = chunk_fitness
+            last_position[rows] = chunk_position
+        return fitness, last_position
+
+    def iter_evaluate(self, params, close, open_=None, version=0, cache=None, namespace=None, scoring=None,
+                      freq_per_year=252):
+        """
+        Yield (rows, fitness, last_position) for each chunk of the population as
+        soon as it is scored, in completion order.
+        """
+        params = np.asarray(params, dtype=np.int64)
+        if self.mode == "serial" or self.workers == 1 or not len(params):
+            fitness, last_position = evaluate_population(params, close, cache=cache, version=version, scoring=scoring,
+                                                         freq_per_year=freq_per_year)
+            yield slice(0, len(params)), fitness, last_position
+            return
+
+        chunks = self._chunks(len(params))
+        pool = self._get_pool()
+        if self.mode == "thread":
+            futures = {
+                pool.submit(evaluate_population, params[rows], close, cache=cache, version=version, scoring=scoring,
+                            freq_per_year=freq_per_year): rows
+                for rows in chunks
+            }
+        else:
+            name, n = self._publish(close, open_, version, namespace)
+            futures = {
+                pool.submit(_evaluate_shared, name, n, version, params[rows], namespace, scoring, freq_per_year): rows
+                for rows in chunks
+            }
+        for future in as_completed(futures):
+            fitness, last_position = future.result()
+            yield futures[future], fitness, last_position
+
+    def _chunks(self, count):
+        """Row slices `count` genomes are split into: about one per worker, at least MIN_CHUNK long."""
+        size = min(self.chunk_size, max(MIN_CHUNK, math.ceil(count / self.workers)))
+        return [slice(start, start + size) for start in range(0, count, size)]
+
+    def _get_pool(self):
+        with self._pool_lock:
+            return self._create_pool()
+
+    def _create_pool(self):
+        if self._pool is None:
+            if self.mode == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+            else:
+                # Spawned workers never inherit the Flask app, its threads or its locks
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._pool
+
+    def _publish(self, close, open_, version, namespace=None):
+        """Copy Close/Open into a shared memory block once per data version of a series."""
+        n = len(close)
+        with self._pool_lock:
+            shm, shm_version = self._shared.get(namespace, (None, None))
+            if shm is None or shm_version != version:
+                shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * n * 8))
+                data = np.ndarray((2, n), dtype=np.float64, buffer=shm.buf)
+                data[0] = close
+                data[1] = np.nan if open_ is None else open_
+                self._release_shared(namespace)
+                self._shared[namespace] = (shm, version)
+            return shm.name, n
+
+    def _release_shared(self, namespace):
+        # Workers keep their own mapping alive until they attach the next block
+        shm, _ = self._shared.pop(namespace, (None, None))
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    def forget(self, namespace):
+        """Release the shared block of a series that is gone."""
+        with self._pool_lock:
+            self._release_shared(namespace)
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+            for namespace in list(self._shared):
+                self._release_shared(namespace)
+
+
+class BoundEvaluator:
+    """PopulationEvaluator with a fixed namespace; same evaluate()/iter_evaluate() interface."""
+
+    def __init__(self, evaluator, namespace):
+        self.evaluator = evaluator
+        self.namespace = namespace
+
+    @property
+    def mode(self):
+        return self.evaluator.mode
+
+    def evaluate(self, params, close, open_=None, version=0, cache=None, scoring=None, freq_per_year=252):
+        return self.evaluator.evaluate(params, close, open_, version, cache, self.namespace, scoring, freq_per_year)
+
+    def iter_evaluate(self, params, close, open_=None, version=0, cache=None, scoring=None, freq_per_year=252):
+        return self.evaluator.iter_evaluate(params, close, open_, version, cache, self.namespace, scoring,
+                                            freq_per_year)
+
+
+# --- Process-pool worker side ---
+
+# Per-worker view of the current shared market data and its indicator cache
+_worker = {"name": None, "shm": None, "close": None, "open": None, "cache": IndicatorCache()}
+
+
+def _attach(name, n):
+    if _worker["name"] == name:
+        return
+    if _worker["shm"] is not None:
+        # Drop our views first, otherwise the old mapping cannot be closed
+        _worker.update(close=None, open=None)
+        _worker["shm"].close()
+    shm = shared_memory.SharedMemory(name=name)
+    data = np.ndarray((2, n), dtype=np.float64, buffer=shm.buf)
+    data.setflags(write=False)
+    _worker.update(name=name, shm=shm, close=data[0], open=data[1])
+
+
+def _evaluate_shared(name, n, version, params, namespace=None, scoring=None, freq_per_year=252):
+    _attach(name, n)
+    cache = _worker["cache"].view(namespace)
+    return evaluate_population(params, _worker["close"], cache=cache, version=version, scoring=scoring,
+                               freq_per_year=freq_per_year)
@@ -0,0 +1,301 @@
+# Batched fitness evaluation for the GA population.
+# Equivalent to calling `calculate_fitness` in main.py once per genome, but every
+# moving average and RSI window is computed once and shared by the whole population.
+# Besides final equity, the fitness can be any analytics metric of the equity curves
+# or a walk-forward score that slices the same strategy returns into train/test
+# folds, so scoring K folds costs well under K times scoring the history once.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from analytics import performance
+from indicators import rolling_means, rsis
+
+# Column order of the population parameter matrix
+GENOME_KEYS = ("fast_ma", "slow_ma", "rsi_period", "rsi_low", "rsi_high")
+FAST, SLOW, RSI_PERIOD, RSI_LOW, RSI_HIGH = range(len(GENOME_KEYS))
+# Bars are crypto klines, traded around the clock
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+# Walk-forward score = mean*mean(test growth) + min*min(test growth) + sharpe*mean(test
+# Sharpe) - drawdown*mean(|test max drawdown|) - gap*mean(train growth above test growth)
+FOLD_WEIGHTS = {"mean": 0.5, "min": 0.5, "sharpe": 0.01, "drawdown": 1.0, "gap": 0.5}
+# Shortest train/test window, in bars
+MIN_FOLD_BARS = 20
+# analytics.METRICS that can be a fitness (higher is better)
+FITNESS_METRICS = ("total_return", "cagr", "sharpe", "sortino", "calmar", "max_drawdown", "win_rate")
+
+
+def scoring_of(config):
+    """
+    What a run's fitness values mean, as passed to evaluate_population: None for final
+    equity, the fold count for walk-forward, or the name of an analytics metric.
+    """
+    fitness = config.get("fitness")
+    if fitness == "walk_forward":
+        return config.get("folds")
+    return fitness if fitness in FITNESS_METRICS else None
+
+
+def bars_per_year(time):
+    """Annualization factor of bars `time` seconds apart (median spacing); None if it cannot be told."""
+    if len(time) < 2:
+        return None
+    spacing = np.median(np.diff(time))
+    return SECONDS_PER_YEAR / spacing if spacing > 0 else None
+
+
+def genome_key(genome):
+    """Canonical hashable form of a genome dict, in GENOME_KEYS order."""
+    return tuple(int(genome[key]) for key in GENOME_KEYS)
+
+
+def population_matrix(population):
+    """Pack a list of genome dicts into an (n_genomes, 5) int64 parameter matrix."""
+    params = np.empty((len(population), len(GENOME_KEYS)), dtype=np.int64)
+    for i, genome in enumerate(population):
+        params[i] = [genome[key] for key in GENOME_KEYS]
+    return params
+
+
+def evaluate_population(params, close, chunk_size=256, cache=None, version=0, scoring=None, freq_per_year=252):
+    """
+    Score every row of `params` against the Close series.
+    When an IndicatorCache is given, MA/RSI rows are looked up under `version`
+    (the historical data version) and only missing windows are computed.
+    `scoring` (see scoring_of) picks the fitness: None is the final equity, an int the
+    walk-forward score of fold_scores() with that many folds, and a FITNESS_METRICS
+    name that analytics metric of the whole equity curve; Sharpe and friends are
+    annualized with `freq_per_year` bars.
+
+    Returns (fitness, last_position): the final equity (or score) of each genome (-inf for
+    invalid genomes or too little data) and its position on the last bar (1 = long,
+    -1 = exit, 0 = flat), which the GA uses to emit the trade signal.
+    """
+    params = np.asarray(params, dtype=np.int64).reshape(-1, len(GENOME_KEYS))
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    fitness = np.full(len(params), -np.inf)
+    last_position = np.zeros(len(params), dtype=np.int64)
+
+    rows = _valid_rows(params, n)
+    if n == 0 or len(rows) == 0:
+        return fitness, last_position
+
+    # Shared indicator tables, one row per distinct window
+    ma_windows, ma_index = np.unique(params[rows][:, [FAST, SLOW]], return_inverse=True)
+    ma_index = ma_index.reshape(-1, 2)
+    rsi_windows, rsi_index = np.unique(params[rows, RSI_PERIOD], return_inverse=True)
+    if cache is not None:
+        ma_table = cache.table("ma", close, ma_windows, version)
+        rsi_table = cache.table("rsi", close, rsi_windows, version)
+    else:
+        ma_table = rolling_means(close, ma_windows)
+        rsi_table = rsis(close, rsi_windows)
+
+    returns = _bar_returns(close)
+    for start in range(0, len(rows), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        strategy_returns, signal = _chunk_returns(ma_table[ma_index[chunk, 0]], ma_table[ma_index[chunk, 1]],
+                                                  rsi_table[rsi_index[chunk]], params[rows[chunk], RSI_HIGH], returns)
+        if scoring is None:
+            fitness[rows[chunk]] = np.cumprod(1 + strategy_returns, axis=1)[:, -1]
+        elif isinstance(scoring, str):
+            fitness[rows[chunk]] = metric_scores(strategy_returns, scoring, freq_per_year)
+        else:
+            fitness[rows[chunk]] = fold_scores(strategy_returns, scoring, freq_per_year)
+        last_position[rows[chunk]] = signal[:, -1]
+
+    return fitness, last_position
+
+
+def _valid_rows(params, n):
+    # Same validity rules as calculate_fitness/generate_signals
+    valid = (params[:, FAST] < params[:, SLOW]) & (n > params[:, SLOW]) & (params[:, FAST] > 0)
+    return np.flatnonzero(valid)
+
+
+def _bar_returns(close):
+    # Bar-to-bar returns, same as Close.pct_change()
+    returns = np.full(len(close), np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
+    return returns
+
+
+def _chunk_returns(ma_fast, ma_slow, rsi_values, rsi_high, returns):
+    """Strategy returns (0 where undefined) and signals of a chunk of genomes, one row each."""
+    signal = np.where((ma_fast > ma_slow) & (rsi_values < rsi_high[:, None]), 1.0, 0.0)
+    signal[ma_fast < ma_slow] = -1.0
+
+    # Position is taken on the next bar: strategy return = return * position.shift(1)
+    strategy_returns = np.zeros_like(signal)
+    strategy_returns[:, 1:] = returns[1:] * signal[:, :-1]
+    strategy_returns[np.isnan(strategy_returns)] = 0.0
+    return strategy_returns, signal
+
+
+def metric_scores(strategy_returns, metric, freq_per_year=252):
+    """
+    One analytics metric of each row's equity curve; undefined values (NaN) score -inf,
+    and an overflowed cagr/calmar (inf) the largest float, so scores stay JSON numbers.
+    """
+    equity = np.cumprod(1 + strategy_returns, axis=1)
+    values = performance(equity, freq_per_year=freq_per_year, axis=1)[metric]
+    return np.where(np.isnan(values), -np.inf, np.minimum(values, np.finfo(np.float64).max))
+
+
+def fold_windows(n, folds):
+    """
+    Rolling walk-forward split of n bars: `folds` + 1 equal blocks ending at the last
+    bar (the oldest n % (folds + 1) bars are left out). Fold i trains on block i and
+    tests on block i + 1. Returns (first bar, block length); length 0 if the blocks
+    would be shorter than MIN_FOLD_BARS.
+    """
+    length = n // (folds + 1)
+    if length < MIN_FOLD_BARS:
+        return n, 0
+    return n - (folds + 1) * length, length
+
+
+def fold_scores(strategy_returns, folds, freq_per_year=252, weights=FOLD_WEIGHTS):
+    """
+    Walk-forward score of each row of a (genomes, bars) strategy return matrix.
+    All genomes and folds go through one analytics.performance call, as a
+    (genomes * folds, window) matrix; the train windows are only used to penalize
+    genomes that do worse out of sample. Per test window: growth (equity multiple),
+    Sharpe (annualized with `freq_per_year`) and max drawdown, each window starting
+    from the equity at the end of its train window.
+    Returns -inf for every row when there are not enough bars for the folds.
+    """
+    rows, n = strategy_returns.shape
+    first, length = fold_windows(n, folds)
+    if length == 0:
+        return np.full(rows, -np.inf)
+    curve = np.ones((rows, n - first + 1))
+    np.cumprod(1 + strategy_returns[:, first:], axis=1, out=curve[:, 1:])
+    bounds = curve[:, ::length]
+    growth = bounds[:, 1:] / bounds[:, :-1]
+    train, test = growth[:, :-1], growth[:, 1:]
+
+    # Test window j spans points j*length .. (j+1)*length: its train window's last equity, then its bars
+    points = np.arange(1, folds + 1)[:, None] * length + np.arange(length + 1)
+    windows = curve[:, points].reshape(rows * folds, length + 1)
+    perf = performance(windows, years=length / freq_per_year, freq_per_year=freq_per_year, axis=1)
+    sharpe = np.nan_to_num(perf["sharpe"].reshape(rows, folds))
+    drawdown = perf["max_drawdown"].reshape(rows, folds)
+
+    score = (weights["mean"] * test.mean(axis=1)
+             + weights["min"] * test.min(axis=1)
+             + weights["sharpe"] * sharpe.mean(axis=1)
+             + weights["drawdown"] * drawdown.mean(axis=1)
+             - weights["gap"] * np.maximum(train - test, 0).mean(axis=1))
+    return np.where(np.isfinite(score), score, -np.inf)
+
+
+def genome_performance(params, time, close, cache=None, version=0):
+    """
+    Full performance report (analytics.METRICS) of a few genomes, e.g. the GA's best.
+    Bars are `time` seconds apart; years and the annualization factor come from them
+    (bars per year from the median spacing). Returns one dict of floats per row of
+    `params`, or None for a genome that cannot be scored.
+    """
+    params = np.asarray(params, dtype=np.int64).reshape(-1, len(GENOME_KEYS))
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    reports = [None] * len(params)
+    rows = _valid_rows(params, n)
+    if len(rows) == 0:
+        return reports
+
+    windows = params[rows][:, [FAST, SLOW, RSI_PERIOD]]
+    if cache is not None:
+        ma_fast, ma_slow = (cache.table("ma", close, windows[:, i], version) for i in (0, 1))
+        rsi_values = cache.table("rsi", close, windows[:, 2], version)
+    else:
+        ma_fast, ma_slow = rolling_means(close, windows[:, 0]), rolling_means(close, windows[:, 1])
+        rsi_values = rsis(close, windows[:, 2])
+    strategy_returns, signal = _chunk_returns(ma_fast, ma_slow, rsi_values, params[rows, RSI_HIGH], _bar_returns(close))
+    equity = np.cumprod(1 + strategy_returns, axis=1)
+    held = np.zeros_like(signal)
+    held[:, 1:] = signal[:, :-1]
+
+    freq = bars_per_year(time)
+    if freq is None:
+        return reports
+    years = (time[-1] - time[0]) / SECONDS_PER_YEAR
+    perf = performance(equity, years=years, freq_per_year=freq, positions=held, axis=1)
+    for i, row in enumerate(rows):
+        reports[row] = {name: _plain(values[i]) for name, values in perf.items()}
+    return reports
+
+
+def _plain(value):
+    """JSON-friendly float: NaN and infinities become None."""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+class FitnessMemo:
+    """
+    Bounded LRU table of (fitness, last_position) keyed by (data version, genome key).
+    Elites and repeated children are scored once per data version. Entries for older
+    versions are dropped as soon as a newer version is stored, and so are all entries
+    when scores of another `scoring` (see scoring_of) are stored.
+    """
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self.version = None
+        self.scoring = None
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, version, keys, scoring=None):
+        """Return {key: (fitness, last_position)} for the keys already scored on `version`."""
+        found = {}
+        with self._lock:
+            if version == self.version and scoring == self.scoring:
+                for key in keys:
+                    score = self._scores.get(key)
+                    if score is not None:
+                        self._scores.move_to_end(key)
+                        found[key] = score
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, version, keys, fitness, last_position, scoring=None):
+        with self._lock:
+            if self.version is not None and version < self.version:
+                return
+            if version != self.version or scoring != self.scoring:
+                self._scores.clear()
+                self.version = version
+                self.scoring = scoring
+            for key, score, position in zip(keys, fitness, last_position):
+                self._scores[key] = (float(score), int(position))
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+    def entries(self, version, scoring=None):
+        """Copies of (keys, fitness, last_position) stored for `version`, least recently used first."""
+        with self._lock:
+            if version != self.version or scoring != self.scoring:
+                return [], [], []
+            keys = list(self._scores)
+            scores = list(self._scores.values())
+        return keys, [s[0] for s in scores], [s[1] for s in scores]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._scores),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
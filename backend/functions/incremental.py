@@ -0,0 +1,160 @@
+# Incremental fitness for genomes that survive from one generation to the next.
+# While the history only grows, a surviving genome's equity curve over the old
+# bars is already known. We keep its running equity together with streaming MA/RSI
+# states and extend them by the new bars only, instead of re-backtesting the
+# whole history every generation.
+
+import math
+
+import numpy as np
+
+from fitness import FAST, SLOW, RSI_PERIOD, RSI_HIGH, evaluate_population, genome_key, population_matrix
+from rolling import RollingMean, WilderRSI
+
+
+class IncrementalEvaluator:
+    """
+    Wraps a PopulationEvaluator. Genomes registered with retain() are carried
+    forward bar by bar; everything else (new children, or every genome once the
+    history has been revised) is scored with the batched evaluator.
+
+    States are committed up to `holdback` bars before the end of the history, so
+    that updates to the still-forming last bar do not count as a revision.
+    """
+
+    def __init__(self, evaluator, holdback=1):
+        self.evaluator = evaluator
+        self.holdback = holdback
+        self.version = None
+        self.length = 0  # number of bars the committed states cover
+        self.ma_states = {}
+        self.rsi_states = {}
+        # genome tuple -> [equity, signal] after `length` bars
+        self.genomes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, population, market, cache=None):
+        """Score the population on the snapshot. Returns (fitness, last_position)."""
+        params = population_matrix(population)
+        keys = [tuple(int(v) for v in row) for row in params]
+        self._advance(market)
+
+        fitness = np.full(len(params), -np.inf)
+        last_position = np.zeros(len(params), dtype=np.int64)
+        cached = [i for i, key in enumerate(keys) if key in self.genomes]
+        fresh = [i for i, key in enumerate(keys) if key not in self.genomes]
+        self.hits += len(cached)
+        self.misses += len(fresh)
+
+        if fresh:
+            fresh_fitness, fresh_position = self.evaluator.evaluate(
+                params[fresh], market.close, market.open, version=market.version, cache=cache
+            )
+            fitness[fresh] = fresh_fitness
+            last_position[fresh] = fresh_position
+
+        if cached:
+            # Score the uncommitted tail on copies of the committed states
+            tail = range(self.length, len(market))
+            ma = {w: state.copy() for w, state in self.ma_states.items()}
+            rsi = {w: state.copy() for w, state in self.rsi_states.items()}
+            ma_values, rsi_values = self._step_indicators(ma, rsi, market.close, tail)
+            for i in cached:
+                equity, signal = self._step_genome(
+                    keys[i], self.genomes[keys[i]], market.close, tail, ma_values, rsi_values
+                )
+                fitness[i] = equity
+                last_position[i] = signal
+        return fitness, last_position
+
+    def retain(self, genomes, market):
+        """Keep states for `genomes` (the survivors) and drop everything else."""
+        # The population may have been scored without us (e.g. from the fitness memo)
+        self._advance(market)
+        keep = {genome_key(genome) for genome in genomes}
+        self.genomes = {key: value for key, value in self.genomes.items() if key in keep}
+        missing = [key for key in keep if key not in self.genomes]
+        if not missing:
+            self._prune()
+            return
+
+        # New survivors: score them on the committed prefix and start carrying them
+        n = self.length
+        params = np.array(missing, dtype=np.int64)
+        equity, signal = evaluate_population(params, market.close[:n])
+        for key, eq, sig in zip(missing, equity, signal):
+            if np.isfinite(eq):
+                self.genomes[key] = [float(eq), int(sig)]
+                self._ensure_states(key, market.close[:n])
+        self._prune()
+
+    def _advance(self, market):
+        """Bring the committed states up to len(market) - holdback, or reset on a revision."""
+        target = max(len(market) - self.holdback, 0)
+        if self.version is None or market.common_prefix(self.version) < self.length or target < self.length:
+            self.ma_states, self.rsi_states, self.genomes = {}, {}, {}
+            self.length = target
+            self.version = market.version
+            return
+
+        bars = range(self.length, target)
+        ma_values, rsi_values = self._step_indicators(self.ma_states, self.rsi_states, market.close, bars)
+        for key, state in self.genomes.items():
+            state[:] = self._step_genome(key, state, market.close, bars, ma_values, rsi_values)
+        self.length = target
+        self.version = market.version
+
+    def _ensure_states(self, key, close):
+        for window in (key[FAST], key[SLOW]):
+            if window not in self.ma_states:
+                state = RollingMean(window)
+                for value in close:
+                    state.update(value)
+                self.ma_states[window] = state
+        period = key[RSI_PERIOD]
+        if period not in self.rsi_states:
+            state = WilderRSI(period)
+            for value in close:
+                state.update(value)
+            self.rsi_states[period] = state
+
+    def _prune(self):
+        """Drop indicator states no carried genome needs."""
+        windows = {w for key in self.genomes for w in (key[FAST], key[SLOW])}
+        periods = {key[RSI_PERIOD] for key in self.genomes}
+        self.ma_states = {w: s for w, s in self.ma_states.items() if w in windows}
+        self.rsi_states = {p: s for p, s in self.rsi_states.items() if p in periods}
+
+    @staticmethod
+    def _step_indicators(ma_states, rsi_states, close, bars):
+        """Advance the states over `bars`; returns per-window lists of the new values."""
+        ma_values = {w: [state.update(close[t]) for t in bars] for w, state in ma_states.items()}
+        rsi_values = {p: [state.update(close[t]) for t in bars] for p, state in rsi_states.items()}
+        return ma_values, rsi_values
+
+    @staticmethod
+    def _step_genome(key, state, close, bars, ma_values, rsi_values):
+        """
+        Extend one genome's equity over `bars`, using the same arithmetic as
+        evaluate_population so the result is identical to a full backtest.
+        """
+        equity, signal = state
+        fast = ma_values[key[FAST]]
+        slow = ma_values[key[SLOW]]
+        rsi = rsi_values[key[RSI_PERIOD]]
+        rsi_high = key[RSI_HIGH]
+        for j, t in enumerate(bars):
+            if t > 0:
+                strategy_return = (close[t] / close[t - 1] - 1) * float(signal)
+                if math.isnan(strategy_return):
+                    strategy_return = 0.0
+                equity = equity * (1 + strategy_return)
+            else:
+                equity = 1.0
+            signal = 0
+            if fast[j] > slow[j] and rsi[j] < rsi_high:
+                signal = 1
+            if fast[j] < slow[j]:
+                signal = -1
+        return [float(equity), signal]
@@ -0,0 +1,213 @@
+# Shared indicator kernels for the GA backend.
+# These operate on plain float64 NumPy arrays so that one computation can be
+# reused by every genome that asks for the same window. rolling.py has the
+# bar-by-bar versions that incremental and live scoring extend.
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def rolling_means(close, windows):
+    """
+    Compute several simple moving averages of one Close series.
+    Returns a (len(windows), len(close)) matrix, NaN where the window is not yet full.
+    """
+    # pandas' rolling mean keeps a compensated running sum rather than a plain
+    # cumulative sum; using the same kernel keeps ties between MAs bit-for-bit
+    # identical to generate_signals, so the GA sees exactly the same positions.
+    series = pd.Series(np.asarray(close, dtype=np.float64))
+    out = np.full((len(windows), len(series)), np.nan)
+    for i, window in enumerate(windows):
+        window = int(window)
+        if 0 < window <= len(series):
+            out[i] = series.rolling(window=window).mean().to_numpy()
+    return out
+
+
+def rsi(close, window):
+    """
+    Wilder RSI with the same output as `ta.momentum.RSIIndicator(close, window).rsi()`:
+    NaN for the first `window - 1` bars and 100 when there are no down moves.
+    """
+    close = pd.Series(np.asarray(close, dtype=np.float64))
+    diff = close.diff(1)
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    ema_up = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    ema_down = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative_strength = ema_up / ema_down
+        return np.where(ema_down == 0, 100, 100 - (100 / (1 + relative_strength)))
+
+
+def rsis(close, windows):
+    """Compute one RSI row per window. Returns a (len(windows), len(close)) matrix."""
+    out = np.full((len(windows), len(close)), np.nan)
+    for i, window in enumerate(windows):
+        out[i] = rsi(close, int(window))
+    return out
+
+
+class IndicatorCache:
+    """
+    LRU store of MA/RSI rows keyed by (namespace, data version, kind, window).
+    The GA only draws windows from small integer ranges, so after a few generations
+    nearly every lookup is a hit. Each namespace (one per market data series) has its
+    own version counter: rows from an older version of a series are dropped as soon
+    as a newer version is seen, and the total size over all series is capped at
+    `max_bytes`. stats() covers the whole cache and namespace_stats() one series.
+    """
+
+    KERNELS = {"ma": rolling_means, "rsi": rsis}
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.versions = {}  # namespace -> current data version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compute_seconds = 0.0  # time spent in the kernels on misses
+        self._counts = {}  # namespace -> its share of the counters above
+        self._rows = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def view(self, namespace):
+        """The same cache with `namespace` bound, for code that only knows about one series."""
+        return IndicatorCacheView(self, namespace)
+
+    def invalidate(self, version=None, namespace=None):
+        """Forget the rows of `namespace`. `version` becomes its current data version."""
+        with self._lock:
+            self._drop(namespace)
+            self.versions[namespace] = version
+
+    def forget(self, namespace):
+        """Drop a namespace altogether (its series is gone)."""
+        with self._lock:
+            self._drop(namespace)
+            self.versions.pop(namespace, None)
+            self._counts.pop(namespace, None)
+
+    def table(self, kind, close, windows, version=0, namespace=None):
+        """
+        Return a (len(windows), len(close)) matrix for `kind` ("ma" or "rsi"),
+        computing only the windows that are not cached yet. Lookups for a version
+        older than the namespace's current one are computed but not stored.
+        """
+        windows = [int(w) for w in windows]
+        out = np.empty((len(windows), len(close)))
+        missing = []
+        with self._lock:
+            # Versions only move forward; a newer one makes every cached row stale
+            current = self.versions.get(namespace)
+            if current is None or version > current:
+                self._drop(namespace)
+                self.versions[namespace] = version
+            for i, window in enumerate(windows):
+                key = (namespace, version, kind, window)
+                row = self._rows.get(key)
+                if row is None:
+                    missing.append(i)
+                    continue
+                self._rows.move_to_end(key)
+                out[i] = row
+            counts = self._namespace_counts(namespace)
+            self.hits += len(windows) - len(missing)
+            self.misses += len(missing)
+            counts["hits"] += len(windows) - len(missing)
+            counts["misses"] += len(missing)
+
+        if missing:
+            # Compute outside the lock so readers of other windows are not blocked
+            start = time.perf_counter()
+            computed = self.KERNELS[kind](close, [windows[i] for i in missing])
+            elapsed = time.perf_counter() - start
+            out[missing] = computed
+            with self._lock:
+                self.compute_seconds += elapsed
+                self._namespace_counts(namespace)["compute_seconds"] += elapsed
+                if version == self.versions.get(namespace):
+                    for i, row in zip(missing, computed):
+                        row = row.copy()
+                        row.setflags(write=False)
+                        self._put((namespace, version, kind, windows[i]), row)
+        return out
+
+    def _drop(self, namespace):
+        if len(self.versions) <= 1 and (not self.versions or namespace in self.versions):
+            # Only one series: clearing everything is cheaper than scanning
+            self._rows.clear()
+            self._bytes = 0
+            return
+        for key in [key for key in self._rows if key[0] == namespace]:
+            self._bytes -= self._rows.pop(key).nbytes
+
+    def _put(self, key, row):
+        if key in self._rows or row.nbytes > self.max_bytes:
+            return
+        self._rows[key] = row
+        self._bytes += row.nbytes
+        while self._bytes > self.max_bytes:
+            key, evicted = self._rows.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+            self._namespace_counts(key[0])["evictions"] += 1
+
+    def _namespace_counts(self, namespace):
+        counts = self._counts.get(namespace)
+        if counts is None:
+            counts = self._counts[namespace] = {"hits": 0, "misses": 0, "evictions": 0, "compute_seconds": 0.0}
+        return counts
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "namespaces": len(self.versions),
+                "entries": len(self._rows),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "compute_seconds": self.compute_seconds,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def namespace_stats(self, namespace):
+        """
+        stats() of one series: its rows, lookups and kernel time, and how many of its
+        rows were evicted (by any series, since the size cap is shared).
+        """
+        with self._lock:
+            counts = dict(self._counts.get(namespace) or {"hits": 0, "misses": 0, "evictions": 0,
+                                                          "compute_seconds": 0.0})
+            sizes = [row.nbytes for key, row in self._rows.items() if key[0] == namespace]
+            lookups = counts["hits"] + counts["misses"]
+            return {
+                "entries": len(sizes),
+                "bytes": sum(sizes),
+                **counts,
+                "hit_rate": counts["hits"] / lookups if lookups else None,
+            }
+
+
+class IndicatorCacheView:
+    """IndicatorCache bound to one namespace; table()/invalidate() as on the cache, stats() of the namespace."""
+
+    def __init__(self, cache, namespace):
+        self.cache = cache
+        self.namespace = namespace
+
+    def table(self, kind, close, windows, version=0):
+        return self.cache.table(kind, close, windows, version, namespace=self.namespace)
+
+    def invalidate(self, version=None):
+        self.cache.invalidate(version, namespace=self.namespace)
+
+    def stats(self):
+        return self.cache.namespace_stats(self.namespace)
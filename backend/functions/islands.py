@@ -0,0 +1,151 @@
+# Island model for the GA.
+# The population is split into K islands that select and breed independently and
+# only exchange their best genomes every few generations, which keeps diversity up
+# far better than one panmictic population. All islands are scored together in one
+# batched call, so they share indicator rows and the fitness memo; the evaluator
+# splits that batch into one pool task per worker (one per island when there are
+# as many workers as islands). Scoring is where the time goes, so adding islands
+# scales with the workers available. Selection and breeding stay in the GA thread:
+# they cost microseconds per island.
+
+import random
+
+import numpy as np
+
+from fitness import genome_key
+
+TOPOLOGIES = ("ring", "fully_connected", "random")
+
+
+def migration_targets(topology, count, source, rng=random):
+    """Islands that receive emigrants from island `source`; "random" draws from `rng`."""
+    if count < 2:
+        return []
+    if topology == "ring":
+        return [(source + 1) % count]
+    if topology == "fully_connected":
+        return [i for i in range(count) if i != source]
+    if topology == "random":
+        return [rng.choice([i for i in range(count) if i != source])]
+    raise ValueError(f"topology must be one of {TOPOLOGIES}")
+
+
+class Island:
+    def __init__(self, population):
+        self.population = population
+        self.best_fitness = -np.inf
+        self.best_genome = None
+        self.last_best = -np.inf
+        self.last_mean = None
+        self.immigrants = 0
+
+    def stats(self):
+        return {
+            "size": len(self.population),
+            "best_fitness": self.best_fitness if self.best_fitness != -np.inf else None,
+            "best_genome": self.best_genome,
+            "generation_best": self.last_best if self.last_best != -np.inf else None,
+            "generation_mean": self.last_mean,
+            # Share of distinct genomes; 1.0 means no duplicates on the island
+            "diversity": len({genome_key(g) for g in self.population}) / len(self.population) if self.population else None,
+            "immigrants": self.immigrants,
+        }
+
+
+class IslandModel:
+    """
+    K islands of `population_size` genomes each.
+      select(population, fitness, num_parents) -> parents (carried over as elites)
+      breed(parents, count) -> children
+    Every `migration_interval` generations each island sends copies of its top
+    `migrants` genomes to its targets in `topology`, where they replace the worst.
+    With one island this is exactly the single-population GA. `population` is a
+    flat list to start from (e.g. a checkpoint), dealt out island after island.
+    `rng` is the random.Random the random topology draws targets from.
+    """
+
+    def __init__(self, create, select, breed, islands=1, population_size=20, num_parents=10,
+                 migration_interval=5, migrants=2, topology="ring", population=None, rng=random):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"topology must be one of {TOPOLOGIES}")
+        self.create = create
+        self.select = select
+        self.breed = breed
+        self.population_size = population_size
+        self.num_parents = num_parents
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.rng = rng
+        if population is None:
+            population = [create() for _ in range(islands * population_size)]
+        self.islands = [Island(population[i * population_size:(i + 1) * population_size]) for i in range(islands)]
+
+    @property
+    def population(self):
+        """All genomes, island after island; the order scores are expected in."""
+        return [genome for island in self.islands for genome in island.population]
+
+    def reset(self):
+        for island in self.islands:
+            island.population = [self.create() for _ in range(self.population_size)]
+
+    def _split(self, values):
+        bounds = np.cumsum([len(island.population) for island in self.islands])[:-1]
+        return np.split(np.asarray(values), bounds)
+
+    def evolve(self, fitness_scores, generation):
+        """
+        Take the scores of `population`, migrate if it is time, then select and breed
+        every island. Returns the parents of all islands (the genomes that survive).
+        """
+        scores = [np.array(s, dtype=np.float64) for s in self._split(fitness_scores)]
+        for island, island_scores in zip(self.islands, scores):
+            valid = island_scores[np.isfinite(island_scores)]
+            island.last_best = float(valid.max()) if len(valid) else -np.inf
+            island.last_mean = float(valid.mean()) if len(valid) else None
+            if island.last_best > island.best_fitness:
+                island.best_fitness = island.last_best
+                island.best_genome = dict(island.population[int(np.argmax(island_scores))])
+
+        if len(self.islands) > 1 and self.migrants and self.migration_interval and generation % self.migration_interval == 0:
+            self._migrate(scores)
+
+        survivors = []
+        for island, island_scores in zip(self.islands, scores):
+            parents = self.select(island.population, island_scores, self.num_parents)
+            survivors += parents
+            island.population = list(parents) + self.breed(parents, self.population_size - len(parents))
+        return survivors
+
+    def _migrate(self, scores):
+        # Emigrants are picked before anything moves, so the order islands are visited in does not matter
+        outgoing = []
+        for island, island_scores in zip(self.islands, scores):
+            top = np.argsort(island_scores)[::-1][:self.migrants]
+            outgoing.append([(dict(island.population[i]), island_scores[i]) for i in top if np.isfinite(island_scores[i])])
+
+        incoming = [[] for _ in self.islands]
+        for source, emigrants in enumerate(outgoing):
+            for target in migration_targets(self.topology, len(self.islands), source, self.rng):
+                incoming[target] += emigrants
+
+        for island, island_scores, arrivals in zip(self.islands, scores, incoming):
+            present = {genome_key(g) for g in island.population}
+            unique = {}
+            for genome, fitness in arrivals:
+                key = genome_key(genome)
+                if key not in present:
+                    unique.setdefault(key, (genome, fitness))
+            arrivals = list(unique.values())
+            # Immigrants replace the worst genomes, but never the island's own best
+            worst = np.argsort(island_scores)[:min(len(arrivals), len(island.population) - 1)]
+            for slot, (genome, fitness) in zip(worst, sorted(arrivals, key=lambda a: -a[1])):
+                if fitness <= island_scores[slot]:
+                    continue
+                island.population[slot] = genome
+                island_scores[slot] = fitness
+                island.immigrants += 1
+
+    def stats(self):
+        return [dict(island=i, **island.stats()) for i, island in enumerate(self.islands)]
@@ -0,0 +1,64 @@
+# Live trade decisions for the current best genome.
+# The GA only emits a trade signal once per generation. To react to every
+# incoming kline, we keep streaming MA/RSI states for the best genome and extend
+# them by the new bars of each snapshot, so a decision costs O(new bars) instead
+# of recomputing the indicators over the whole history.
+
+from fitness import FAST, SLOW, RSI_PERIOD, RSI_HIGH, genome_key
+from rolling import RollingMean, WilderRSI
+
+
+class LiveSignal:
+    """
+    Streaming signal of one genome. update(market) returns the position on the
+    snapshot's last bar (1 = long, -1 = exit, 0 = flat), the same value
+    evaluate_population reports as last_position.
+
+    As in IncrementalEvaluator, states are committed up to `holdback` bars before
+    the end, so updates to the still-forming last bar are applied to copies, and
+    a revision of committed bars rebuilds the states from the snapshot.
+    """
+
+    def __init__(self, genome, holdback=1):
+        self.key = genome_key(genome)
+        self.holdback = holdback
+        self.version = None
+        self.length = 0  # number of bars the committed states cover
+        self._reset()
+
+    def _reset(self):
+        self.fast = RollingMean(self.key[FAST])
+        self.slow = RollingMean(self.key[SLOW])
+        self.rsi = WilderRSI(self.key[RSI_PERIOD])
+        self.length = 0
+
+    def update(self, market):
+        n = len(market)
+        target = max(n - self.holdback, 0)
+        if self.version is not None and (market.common_prefix(self.version) < self.length or target < self.length):
+            self._reset()
+        for t in range(self.length, target):
+            self._step(self.fast, self.slow, self.rsi, market.close[t])
+        self.length = target
+        self.version = market.version
+
+        fast, slow, rsi = self.fast.copy(), self.slow.copy(), self.rsi.copy()
+        for t in range(target, n):
+            self._step(fast, slow, rsi, market.close[t])
+
+        # Same validity rules as evaluate_population
+        if not (0 < self.key[FAST] < self.key[SLOW] < n):
+            return 0
+        ma_fast, ma_slow = fast.value(), slow.value()
+        signal = 0
+        if ma_fast > ma_slow and rsi.value() < self.key[RSI_HIGH]:
+            signal = 1
+        if ma_fast < ma_slow:
+            signal = -1
+        return signal
+
+    @staticmethod
+    def _step(fast, slow, rsi, close):
+        fast.update(close)
+        slow.update(close)
+        rsi.update(close)
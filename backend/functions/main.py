@@ -3,58 +3,224 @@
 # Deploy with `firebase deploy --only functions`
 
 from firebase_functions import https_fn
-from firebase_admin import initialize_app
-import pandas as pd
-import numpy as np
-from ta.momentum import RSIIndicator
 import time
 import threading
-from flask import jsonify, Flask, request
+from flask import jsonify, Flask, request, Response, abort, make_response
 from flask_cors import CORS
 import werkzeug.wrappers
 import random
+import os
+import json
+import traceback
+
+# Only dependency-free modules are imported here; the numeric stack is loaded by
+# _load_numeric() below, in the background, so that a cold start can answer
+# /status and /stop before numpy and pandas are in.
+from events import EventLog
+from metrics import InstrumentedLock, Metrics, SamplingProfiler
+from scheduler import GenerationScheduler
+from contextlib import nullcontext
 
-initialize_app()
 flask_app = Flask(__name__)
 CORS(flask_app)
 
 
+# --- GA Configuration ---
+# Defaults for a run; /start can override any of these with a JSON body.
+DEFAULT_CONFIG = {
+    "population_size": 20,
+    "num_parents": 10,
+    # Island model: population_size and num_parents are per island. Every
+    # migration_interval generations each island sends its top `migrants` genomes
+    # to its neighbours in `topology` ("ring", "fully_connected" or "random").
+    "islands": 1,
+    "migration_interval": 5,
+    "migrants": 2,
+    "topology": "ring",
+    # Parent selection: "truncation" keeps the num_parents best, "tournament" keeps
+    # the best plus winners of tournament_size-way tournaments
+    "selection": "truncation",
+    "tournament_size": 3,
+    # Fitness: "equity" is the final equity over the whole history, "walk_forward"
+    # scores `folds` rolling train/test windows out of sample (see fitness.fold_scores),
+    # and any of fitness.FITNESS_METRICS ("sharpe", "calmar", ...) is that metric of
+    # the whole history
+    "fitness": "equity",
+    "folds": 4,
+    # How the population is scored: "serial", "thread" or "process"
+    "executor": os.environ.get("GA_EXECUTOR", "serial"),
+    "workers": int(os.environ.get("GA_WORKERS", "0")) or None,
+    # Generation scheduling (seconds): a new bar starts a generation once min_interval
+    # has passed; without new data one runs every max_interval. burst runs back-to-back.
+    "min_interval": 1.0,
+    "max_interval": 120.0,
+    "burst": False,
+    # Extend surviving elites by the new bars instead of re-backtesting them
+    # (final equity fitness only)
+    "incremental": True,
+    # Re-draw children that duplicate a genome already in the next generation
+    "resample_duplicates": True,
+    # Turn every /update_data into a trade decision of the current best genome
+    "live_signals": True,
+    # Save a checkpoint every N generations (0 disables), but no more than once per
+    # checkpoint_seconds so burst runs do not flood the store, and resume from the
+    # newest one matching the current data on /start
+    "checkpoint_every": int(os.environ.get("GA_CHECKPOINT_EVERY", "10")),
+    "checkpoint_seconds": float(os.environ.get("GA_CHECKPOINT_SECONDS", "30")),
+    "resume": True,
+}
+
+
 # --- Global State for the GA ---
 # Using a class to hold state makes it cleaner to manage
 # This global instance will persist across invocations on the same function instance.
+# Named sessions (/sessions/<SYMBOL>-<interval>/...) get their own GAState from the
+# session manager; the plain routes keep using the default `ga_state`.
 class GAState:
-    def __init__(self):
+    def __init__(self, key=None, capacity=None):
+        # Session id, also the namespace of this market in the shared cache and pools
+        self.key = key
         self.running = False
         self.generation = 0
         self.best_fitness = -np.inf
         self.best_genome = None
+        # analytics.METRICS of best_genome on the data it was found on (None until the
+        # run finds a best, also after a resume)
+        self.best_performance = None
         self.last_trade = None
-        self.lock = threading.Lock()
+        # Stage timers, counters and histograms for /metrics; the GA lock reports
+        # acquisitions and wait time per calling function
+        self.metrics = Metrics()
+        self.lock = InstrumentedLock(self.metrics, "ga")
         self.thread = None
-        self.historical_data = pd.DataFrame()
+        # Immutable, versioned market data. /update_data publishes a new snapshot and
+        # readers just take a reference; snapshot.version keys the indicator cache.
+        self.market = MarketSnapshot.empty()
+        self.indicators = sessions.indicators.view(key)
+        # Columnar bar store the snapshots are built from. Writers hold ingest_lock so
+        # that parsing and merging never block the GA lock.
+        self.klines = KlineBuffer(capacity) if capacity else KlineBuffer()
+        self.ingest_lock = threading.Lock()
+        self.config = dict(DEFAULT_CONFIG)
+        # Wakes the evolution loop on new data or stop; replaced on every /start
+        self.scheduler = GenerationScheduler()
+        # Recent generation/best/trade events for /events and /events/stream
+        self.events = EventLog()
+        # Scores keyed by (data version, genome); shared across runs on this instance
+        self.memo = FitnessMemo(MEMO_ENTRIES)
+        # Streaming signal of best_genome; only touched by writers holding ingest_lock
+        self.live = None
+        # Incremental evaluator of the current run, for its hit/miss counters
+        self.incremental = None
+        # Per-island stats of the current run (None until its first generation)
+        self.islands = None
+        # Checkpoints of this session and what the current run resumed from
+        self.checkpointer = Checkpointer(checkpoints, key)
+        self.resumed = None
+        # Why the last run stopped on its own, if it failed
+        self.error = None
+        # The GA's random sources; per session so that concurrent runs (and a resumed
+        # checkpoint) never touch each other's sequences
+        self.rng = random.Random()
+        self.np_rng = np.random.Generator(np.random.MT19937())
+
+    def get_evaluator(self):
+        """Evaluator for the current config; worker pools are shared by all sessions and survive /stop."""
+        evaluator = sessions.evaluator(self.config["executor"], self.config["workers"])
+        return evaluator.bind(self.key)
 
     def reset(self):
-        with self.lock:
-            self.running = False
-            self.generation = 0
-            self.best_fitness = -np.inf
-            self.best_genome = None
-            self.last_trade = None
-            print("GA state has been reset.")
+        """Reset the run state. The caller must hold self.lock (it is not re-entrant)."""
+        self.running = False
+        self.generation = 0
+        self.best_fitness = -np.inf
+        self.best_genome = None
+        self.best_performance = None
+        self.last_trade = None
+        self.islands = None
+        self.resumed = None
+        self.error = None
+        print("GA state has been reset.")
+
+# Shared by every session: worker pools, the indicator cache, generation slots and the memory budget
+sessions = None
+# Local directory by default; GA_CHECKPOINT_BUCKET keeps them in Cloud Storage across instances
+checkpoints = None
+ga_state = None
+# Samples every thread, so one profiler serves all sessions
+profiler = SamplingProfiler()
+
+
+# --- Lazy numeric stack ---
+# numpy, pandas, the GA modules and firebase_admin are most of a cold start. They
+# are imported by a background thread started at module load, together with the
+# shared state built on them. Routes that need them call numeric(), which waits
+# for that thread; until it is done no GA can be running, so /status and /stop
+# answer straight away without it.
+_numeric_ready = threading.Event()
+_numeric_error = None
+
+
+def _load_numeric():
+    global np, Checkpoint, Checkpointer, default_store, resize_population, restore_memo
+    global EXECUTOR_MODES, FITNESS_METRICS, FitnessMemo, MIN_FOLD_BARS, bars_per_year, fold_windows, genome_key
+    global genome_performance, population_matrix, scoring_of, IncrementalEvaluator
+    global TOPOLOGIES, IslandModel, LiveSignal, rsi
+    global BINARY_KLINE_TYPES, MAX_PAYLOAD_BYTES, KlineBuffer, MarketSnapshot, PayloadTooLarge
+    global decode_klines, maybe_gunzip, parse_klines
+    global MEMO_ENTRIES, SessionLimitError, SessionManager, parse_session_id, session_id
+    global sessions, checkpoints, ga_state
+    import numpy as np
+    from firebase_admin import initialize_app
+    from checkpoint import Checkpoint, Checkpointer, default_store, resize_population, restore_memo
+    from executor import EXECUTOR_MODES
+    from fitness import (FITNESS_METRICS, FitnessMemo, MIN_FOLD_BARS, bars_per_year, fold_windows, genome_key,
+                         genome_performance, population_matrix, scoring_of)
+    from incremental import IncrementalEvaluator
+    from indicators import rsi
+    from islands import TOPOLOGIES, IslandModel
+    from live import LiveSignal
+    from market_data import (BINARY_KLINE_TYPES, MAX_PAYLOAD_BYTES, KlineBuffer, MarketSnapshot, PayloadTooLarge,
+                             decode_klines, maybe_gunzip, parse_klines)
+    from sessions import MEMO_ENTRIES, SessionLimitError, SessionManager, parse_session_id, session_id
+
+    initialize_app()
+    sessions = SessionManager(GAState)
+    checkpoints = default_store()
+    ga_state = GAState()
+
+
+def _warm_up():
+    global _numeric_error
+    start = time.perf_counter()
+    try:
+        _load_numeric()
+        print(f"Numeric stack loaded in {time.perf_counter() - start:.2f}s.")
+    except BaseException as e:
+        _numeric_error = e
+        print(f"Loading the numeric stack failed: {e}")
+    finally:
+        _numeric_ready.set()
+
+
+def numeric():
+    """Wait until the numeric stack and the shared GA state are loaded."""
+    _numeric_ready.wait()
+    if _numeric_error is not None:
+        raise _numeric_error
 
-ga_state = GAState()
 
 
 # --- Genetic Algorithm Components ---
 
-def create_individual():
-    """Create a random individual (genome)."""
+def create_individual(np_rng):
+    """Create a random individual (genome), drawing from the numpy Generator `np_rng`."""
     return {
-        "fast_ma": np.random.randint(5, 25),
-        "slow_ma": np.random.randint(30, 80),
-        "rsi_period": np.random.randint(10, 25),
-        "rsi_low": np.random.randint(20, 40),
-        "rsi_high": np.random.randint(60, 85),
+        "fast_ma": int(np_rng.integers(5, 25)),
+        "slow_ma": int(np_rng.integers(30, 80)),
+        "rsi_period": int(np_rng.integers(10, 25)),
+        "rsi_low": int(np_rng.integers(20, 40)),
+        "rsi_high": int(np_rng.integers(60, 85)),
     }
 
 def calculate_fitness(genome, df):
@@ -86,8 +252,7 @@ def generate_signals(df, genome):
     try:
         df["ma_fast"] = df["Close"].rolling(window=genome['fast_ma']).mean()
         df["ma_slow"] = df["Close"].rolling(window=genome['slow_ma']).mean()
-        rsi_indicator = RSIIndicator(close=df["Close"], window=genome['rsi_period'])
-        df["rsi"] = rsi_indicator.rsi()
+        df["rsi"] = rsi(df["Close"].to_numpy(dtype=np.float64), genome['rsi_period'])
     except Exception as e:
         print(f"Error calculating indicators for genome {genome}: {e}")
         return None # Return None to signal failure
@@ -119,24 +284,42 @@ def select_parents(population, fitness_scores, num_parents):
         
     return parents
 
-def crossover(parent1, parent2):
+def tournament_select(population, fitness_scores, num_parents, rng, size=3):
+    """
+    Select parents by tournaments: the best individual always survives, the rest are
+    winners of `size`-way tournaments among those not yet picked, drawn with the
+    random.Random `rng`. Weaker genomes keep a chance to breed, which holds
+    diversity up better than truncation.
+    """
+    fitness_scores = np.asarray(fitness_scores, dtype=np.float64)
+    best = int(np.argmax(fitness_scores))
+    chosen = [best]
+    remaining = [i for i in range(len(population)) if i != best]
+    while len(chosen) < min(num_parents, len(population)):
+        entrants = rng.sample(remaining, min(size, len(remaining)))
+        winner = max(entrants, key=lambda i: fitness_scores[i])
+        chosen.append(winner)
+        remaining.remove(winner)
+    return [population[i] for i in chosen]
+
+def crossover(parent1, parent2, rng):
     """Create a new individual by combining genes from two parents."""
     child = {}
     for key in parent1.keys():
-        if random.random() < 0.5:
+        if rng.random() < 0.5:
             child[key] = parent1[key]
         else:
             child[key] = parent2[key]
     return child
 
-def mutate(individual, mutation_rate=0.1):
+def mutate(individual, rng, np_rng, mutation_rate=0.1):
     """Randomly change a gene in an individual."""
     for key in individual.keys():
-        if random.random() < mutation_rate:
+        if rng.random() < mutation_rate:
             if 'ma' in key:
-                change = np.random.randint(-5, 6)
+                change = int(np_rng.integers(-5, 6))
             else:
-                change = np.random.randint(-2, 3)
+                change = int(np_rng.integers(-2, 3))
             individual[key] += change
 
             # Apply strict validation after mutation
@@ -158,137 +341,421 @@ def mutate(individual, mutation_rate=0.1):
 
     return individual
 
+def make_children(parents, count, rng, np_rng, resample_duplicates=False, max_tries=10):
+    """
+    Breed `count` children from `parents` with crossover and mutation, drawing from
+    the session's `rng` (random.Random) and `np_rng` (numpy Generator).
+    With `resample_duplicates`, a child identical to a parent or an earlier child is
+    re-drawn (up to `max_tries` times) so evaluation budget goes to new genomes.
+    """
+    seen = {genome_key(parent) for parent in parents}
+    children = []
+    for _ in range(count):
+        for _ in range(max_tries if resample_duplicates else 1):
+            parent1 = rng.choice(parents)
+            parent2 = rng.choice(parents)
+            child = crossover(parent1, parent2, rng)
+            child = mutate(child, rng, np_rng)
+            if genome_key(child) not in seen:
+                break
+        seen.add(genome_key(child))
+        children.append(child)
+    return children
+
 
 # --- Main GA Loop ---
 
-def evolution_loop():
-    """The main loop for the genetic algorithm. This runs in a background thread."""
-    population_size = 20
-    num_parents = 10
+def score_population(population, market, evaluator, incremental=None, memo=None, cache=None, metrics=None,
+                     scoring=None):
+    """
+    Fitness and last-bar position for every genome. Each distinct genome is scored
+    once; genomes already in the memo for this data version are not scored at all.
+    `scoring` picks the fitness (see fitness.scoring_of); only final equity (None)
+    can use the incremental evaluator.
+    """
+    timer = metrics.timer if metrics is not None else (lambda stage: nullcontext())
+    keys = [genome_key(genome) for genome in population]
+    unique = list(dict.fromkeys(keys))
+    with timer("memo_lookup"):
+        scores = memo.lookup(market.version, unique, scoring) if memo is not None else {}
+
+    pending = [key for key in unique if key not in scores]
+    if pending:
+        first = {}
+        for genome, key in zip(population, keys):
+            first.setdefault(key, genome)
+        genomes = [first[key] for key in pending]
+        start = time.perf_counter()
+        with timer("evaluate"):
+            if incremental is not None:
+                fitness, positions = incremental.evaluate(genomes, market, cache=cache)
+            else:
+                fitness, positions = evaluator.evaluate(
+                    population_matrix(genomes), market.close, market.open, version=market.version, cache=cache,
+                    scoring=scoring, freq_per_year=bars_per_year(market.time) or 252,
+                )
+        if metrics is not None:
+            elapsed = time.perf_counter() - start
+            metrics.inc("ga_evaluations_total", len(pending), "Genomes backtested (memo hits excluded).")
+            if elapsed > 0:
+                metrics.set("ga_evaluations_per_second", len(pending) / elapsed,
+                            "Backtest throughput of the most recent generation.")
+        if memo is not None:
+            memo.store(market.version, pending, fitness, positions, scoring)
+        scores.update(zip(pending, zip(fitness, positions)))
+
+    fitness_scores = np.array([scores[key][0] for key in keys], dtype=np.float64)
+    last_positions = np.array([scores[key][1] for key in keys], dtype=np.int64)
+    return fitness_scores, last_positions
+
+
+def save_checkpoint(state, population, market):
+    """Write a checkpoint of the run; failures are logged and the GA carries on."""
+    with state.metrics.timer("checkpoint"):
+        try:
+            name, size = state.checkpointer.save(Checkpoint.capture(state, population, market, market.version))
+        except Exception as e:
+            print(f"Checkpoint failed: {e}")
+            state.metrics.inc("ga_checkpoint_failures_total", 1, "Checkpoints that could not be written.")
+            return
+    state.metrics.inc("ga_checkpoints_total", 1, "Checkpoints written.")
+    state.metrics.set("ga_checkpoint_bytes", size, "Size of the last checkpoint.")
+    print(f"Saved checkpoint {name} ({size} bytes).")
+
+
+def evolution_loop(state=None, population=None):
+    """
+    The main loop for the genetic algorithm. This runs in a background thread.
+    `population` continues a resumed run; otherwise it starts from random genomes.
+    If a generation fails, the run stops and the error is reported by /status.
+    """
+    state = state or ga_state
+    try:
+        run_generations(state, population)
+    except Exception as e:
+        traceback.print_exc()
+        with state.lock:
+            state.running = False
+            state.error = f"{type(e).__name__}: {e}"
+            state.scheduler.stop()
+        state.metrics.inc("ga_loop_errors_total", 1, "Runs stopped by an error in the evolution loop.")
+        state.events.publish("error", {"generation": state.generation, "error": state.error})
+
+
+def run_generations(state, population=None):
+    with state.lock:
+        config = dict(state.config)
+        scheduler = state.scheduler
+    rng, np_rng = state.rng, state.np_rng
+    if config["selection"] == "tournament":
+        select = lambda population, scores, count: tournament_select(population, scores, count, rng,
+                                                                     config["tournament_size"])
+    else:
+        select = select_parents
+    model = IslandModel(
+        create=lambda: create_individual(np_rng),
+        select=select,
+        breed=lambda parents, count: make_children(parents, count, rng, np_rng, config["resample_duplicates"]),
+        islands=config["islands"],
+        population_size=config["population_size"],
+        num_parents=config["num_parents"],
+        migration_interval=config["migration_interval"],
+        migrants=config["migrants"],
+        topology=config["topology"],
+        population=population,
+        rng=rng,
+    )
+    evaluator = state.get_evaluator()
+    score_mode = scoring_of(config)
+    folds = config["folds"] if config["fitness"] == "walk_forward" else None
+    # Incremental extension only tracks final equity
+    incremental = IncrementalEvaluator(evaluator) if config["incremental"] and score_mode is None else None
+    metrics = state.metrics
+    with state.lock:
+        state.incremental = incremental
     
     print("Evolution loop started.")
     
-    population = [create_individual() for _ in range(population_size)]
+    checkpoint_every = config["checkpoint_every"]
+    checkpoint_seconds = config["checkpoint_seconds"]
+    # Generation, time and data of the last checkpoint, so /stop only saves unsaved progress
+    saved_generation, saved_at, scored_market = state.generation, time.monotonic(), None
 
     while True:
         # Check for stop signal at the very beginning of the loop
-        with ga_state.lock:
-            if not ga_state.running:
+        with state.lock:
+            if not state.running:
                 print("Detected stop signal. Exiting evolution loop.")
                 break
         
-        with ga_state.lock:
-            ga_state.generation += 1
-            current_generation = ga_state.generation
-            df_hist = ga_state.historical_data.copy()
+        generation_start = time.monotonic()
+        with state.lock:
+            state.generation += 1
+            current_generation = state.generation
+            market = state.market
             # Clear the trade signal at the start of a generation
-            ga_state.last_trade = None
+            state.last_trade = None
 
         print(f"--- Starting Generation {current_generation} ---")
 
         # Robustness: Ensure we have enough data before proceeding
-        if df_hist.empty or len(df_hist) < 100:
-            print("Historical data is empty or insufficient, skipping generation. Sleeping for 10s.")
-            time.sleep(10)
-            with ga_state.lock:
-                ga_state.generation -=1 # Don't count this as a real generation
+        if len(market) < 100 or (folds and not fold_windows(len(market), folds)[1]):
+            print("Historical data is empty or insufficient, skipping generation. Waiting for new data.")
+            with state.lock:
+                state.generation -=1 # Don't count this as a real generation
+            scheduler.wait(market.version, generation_start, require_data=True)
             continue
             
-        fitness_scores = []
-        signal_dfs = []
-
-        # Calculate fitness for the entire population
-        for ind in population:
-            fitness, signal_df = calculate_fitness(ind, df_hist)
-            fitness_scores.append(fitness)
-            signal_dfs.append(signal_df)
+        # Calculate fitness for the entire population in one batched pass. Sessions take
+        # turns for a generation slot so that one busy market cannot starve the others.
+        with sessions.gate.turn(cancelled=lambda: scheduler.stopped) as admitted:
+            if not admitted:
+                with state.lock:
+                    state.generation -= 1
+                continue
+            population = model.population
+            with metrics.timer("score"):
+                fitness_scores, last_positions = score_population(
+                    population, market, evaluator, incremental, memo=state.memo, cache=state.indicators,
+                    metrics=metrics, scoring=score_mode
+                )
 
         # Check if any individuals were successfully evaluated
-        if not any(s > -np.inf for s in fitness_scores):
+        if not np.any(fitness_scores > -np.inf):
             print("No individuals in the population were fit. This may be due to data issues or invalid genomes. Creating new random population.")
-            population = [create_individual() for _ in range(population_size)] # Re-initialize
-            time.sleep(5) # Brief pause before next attempt
+            model.reset() # Re-initialize
+            scheduler.wait(market.version, generation_start) # Pause until the next trigger
             continue
 
-        best_gen_idx = np.argmax(fitness_scores)
-        best_gen_fitness = fitness_scores[best_gen_idx]
+        best_gen_idx = int(np.argmax(fitness_scores))
+        best_gen_fitness = float(fitness_scores[best_gen_idx])
         best_gen_genome = population[best_gen_idx]
-        best_signals_df = signal_dfs[best_gen_idx]
+        # Only the loop thread raises best_fitness, so the report can be built before taking the lock
+        best_report = None
+        if best_gen_fitness > state.best_fitness:
+            with metrics.timer("best_performance"):
+                best_report = genome_performance(population_matrix([best_gen_genome]), market.time, market.close,
+                                                 cache=state.indicators, version=market.version)[0]
         
-        with ga_state.lock:
-            if not ga_state.running: # Double-check before writing state
+        scored_market = market
+        with state.lock:
+            if not state.running: # Double-check before writing state
                 break
 
+            new_events = []
             # Update the global best if this generation's best is better
-            if best_gen_fitness > ga_state.best_fitness:
-                ga_state.best_fitness = best_gen_fitness
-                ga_state.best_genome = best_gen_genome
+            if best_gen_fitness > state.best_fitness:
+                state.best_fitness = best_gen_fitness
+                state.best_genome = best_gen_genome
+                state.best_performance = best_report
                 print(f"New global best found in Gen {current_generation}! Fitness: {best_gen_fitness:.4f}, Genome: {best_gen_genome}")
+                new_events.append(("best", {
+                    "generation": current_generation,
+                    "fitness": best_gen_fitness,
+                    "genome": genome_payload(best_gen_genome),
+                    "performance": best_report,
+                }))
 
             # Generate the trade signal for this generation based on its best individual
-            if best_signals_df is not None and not best_signals_df.empty and 'position' in best_signals_df.columns:
-                last_signal = best_signals_df['position'].iloc[-1]
-                trade_action = None
-                if last_signal == 1:
-                    trade_action = 'buy'
-                elif last_signal == -1:
-                    trade_action = 'sell'
-
-                if trade_action:
-                    # Set the trade signal to be picked up by the frontend
-                    ga_state.last_trade = {
-                        "action": trade_action,
-                        "price": df_hist['Close'].iloc[-1],
-                        "generation": current_generation
-                    }
-                    print(f"Trade signal for Gen {current_generation}: {trade_action.upper()} at ${ga_state.last_trade['price']:.2f}")
+            last_signal = last_positions[best_gen_idx]
+            trade_action = None
+            if last_signal == 1:
+                trade_action = 'buy'
+            elif last_signal == -1:
+                trade_action = 'sell'
+
+            if trade_action:
+                # Set the trade signal to be picked up by the frontend
+                state.last_trade = {
+                    "action": trade_action,
+                    "price": float(market.close[-1]),
+                    "generation": current_generation
+                }
+                print(f"Trade signal for Gen {current_generation}: {trade_action.upper()} at ${state.last_trade['price']:.2f}")
+                new_events.append(("trade", dict(state.last_trade)))
+
+        # Publish outside the GA lock; the generation event goes last so clients
+        # can treat it as the end of a generation's batch
+        new_events.append(("generation", {
+            "generation": current_generation,
+            "best_fitness": best_gen_fitness,
+            "data_version": market.version,
+            "bars": len(market),
+        }))
+        with metrics.timer("publish"):
+            for event_type, data in new_events:
+                state.events.publish(event_type, data)
 
         # --- EVOLVE: Create the next generation ---
-        parents = select_parents(population, fitness_scores, num_parents)
-        
-        # Keep the best individuals (elitism)
-        next_generation = list(parents)
-        
-        # Create children through crossover and mutation
-        num_children_to_create = population_size - len(next_generation)
-        for _ in range(num_children_to_create):
-            parent1 = random.choice(parents)
-            parent2 = random.choice(parents)
-            child = crossover(parent1, parent2)
-            child = mutate(child)
-            next_generation.append(child)
-            
-        population = next_generation
+        # Each island keeps its best individuals (elitism) and breeds children from
+        # them with crossover and mutation; migration happens first when it is due
+        with metrics.timer("breeding"):
+            parents = model.evolve(fitness_scores, current_generation)
+        if incremental is not None:
+            # Survivors are carried forward and only extended by new bars next time
+            with metrics.timer("retain"):
+                incremental.retain(parents, market)
+        population = model.population
+        with state.lock:
+            state.islands = model.stats()
 
-        print(f"--- Finished Generation {current_generation}. Waiting 120s... ---")
-        time.sleep(120)
+        if (checkpoint_every and current_generation - saved_generation >= checkpoint_every
+                and time.monotonic() - saved_at >= checkpoint_seconds):
+            save_checkpoint(state, population, market)
+            saved_generation, saved_at = current_generation, time.monotonic()
+
+        metrics.observe("ga_generation_duration_seconds", time.monotonic() - generation_start,
+                        "Time from the start of a generation to the end of breeding.")
+        metrics.inc("ga_generations_total", 1, "Completed generations.")
+        print(f"--- Finished Generation {current_generation}. Waiting for new data or the next interval... ---")
+        with metrics.timer("wait"):
+            scheduler.wait(market.version, generation_start)
+
+    if checkpoint_every and scored_market is not None and saved_generation != state.generation:
+        save_checkpoint(state, population, scored_market)
 
 
 # --- Flask API Endpoints ---
+def session_state(session, create=False):
+    """
+    GAState a route works on: the default one for the plain routes, otherwise the
+    named session (created on demand by /start and /update_data).
+    """
+    numeric()
+    if session is None:
+        return ga_state
+    parsed = parse_session_id(session)
+    if parsed is None:
+        abort(make_response(jsonify({"error": f"Invalid session id '{session}', expected <SYMBOL>-<interval>"}), 400))
+    key = session_id(*parsed)
+    if not create:
+        state = sessions.get(key)
+        if state is None:
+            abort(make_response(jsonify({"error": f"Unknown session '{key}'"}), 404))
+        return state
+    try:
+        return sessions.get_or_create(key)
+    except SessionLimitError as e:
+        abort(make_response(jsonify({"error": str(e)}), 503))
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def config_error(config):
+    """
+    Why a /start config (defaults plus overrides) cannot run, or None. Checked before
+    any state is touched, so a bad request leaves the previous run as it was.
+    """
+    minimums = {"population_size": 1, "num_parents": 1, "islands": 1, "tournament_size": 1,
+                "migration_interval": 0, "migrants": 0, "checkpoint_every": 0, "folds": 2}
+    for key, minimum in minimums.items():
+        if not _is_int(config[key]) or config[key] < minimum:
+            return f"{key} must be an integer of at least {minimum}"
+    if config["num_parents"] > config["population_size"]:
+        return "num_parents must not exceed population_size"
+    if config["workers"] is not None and (not _is_int(config["workers"]) or config["workers"] < 1):
+        return "workers must be a positive integer"
+    for key in ("min_interval", "max_interval", "checkpoint_seconds"):
+        if not _is_number(config[key]) or config[key] < 0:
+            return f"{key} must be a non-negative number"
+    if config["min_interval"] > config["max_interval"]:
+        return "min_interval must not exceed max_interval"
+    for key in ("burst", "incremental", "resample_duplicates", "live_signals", "resume"):
+        if not isinstance(config[key], bool):
+            return f"{key} must be true or false"
+    if config["executor"] not in EXECUTOR_MODES:
+        return f"executor must be one of {list(EXECUTOR_MODES)}"
+    if config["topology"] not in TOPOLOGIES:
+        return f"topology must be one of {list(TOPOLOGIES)}"
+    if config["selection"] not in ("truncation", "tournament"):
+        return "selection must be 'truncation' or 'tournament'"
+    if config["fitness"] not in ("equity", "walk_forward") + FITNESS_METRICS:
+        return f"fitness must be one of {['equity', 'walk_forward', *FITNESS_METRICS]}"
+    return None
+
+
 @flask_app.route('/start', methods=['POST'])
-def start_ga():
-    with ga_state.lock:
-        if ga_state.running:
+@flask_app.route('/sessions/<session>/start', methods=['POST'])
+def start_ga(session=None):
+    numeric()
+    overrides = request.get_json(silent=True) or {}
+    if not isinstance(overrides, dict):
+        return jsonify({"error": "Expected a JSON object of config overrides"}), 400
+    unknown = set(overrides) - set(DEFAULT_CONFIG)
+    if unknown:
+        return jsonify({"error": f"Unknown config keys: {sorted(unknown)}"}), 400
+    config = {**DEFAULT_CONFIG, **overrides}
+    error = config_error(config)
+    if error:
+        return jsonify({"error": error}), 400
+
+    state = session_state(session, create=True)
+    # Look for a checkpoint before taking the lock; reading it may hit the network
+    market = state.market
+    folds = config["folds"] if config["fitness"] == "walk_forward" else None
+    if folds and len(market) and not fold_windows(len(market), folds)[1]:
+        return jsonify({"error": f"folds={folds} needs at least {(folds + 1) * MIN_FOLD_BARS} bars "
+                                 f"({MIN_FOLD_BARS} per window); the session has {len(market)}"}), 400
+    checkpoint, how = None, None
+    if config["resume"] and not state.running:
+        checkpoint, how = state.checkpointer.latest(market)
+
+    with state.lock:
+        if state.running:
              print("GA already running.")
-             return jsonify({"message": "Genetic Algorithm already running.", "status": get_status_payload(locked=True)})
+             return jsonify({"message": "Genetic Algorithm already running.", "status": get_status_payload(locked=True, state=state)})
 
-        ga_state.reset() # Reset state for a clean start
-        ga_state.running = True
+        state.reset() # Reset state for a clean start
+        state.config = config
+        population = None
+        if checkpoint is not None:
+            population = resize_population(checkpoint.genomes(), config["population_size"] * config["islands"],
+                                           lambda: create_individual(state.np_rng))
+            state.generation = checkpoint.generation
+            if scoring_of(checkpoint.config) == scoring_of(config):
+                # Best fitness of another fitness mode is not comparable
+                state.best_fitness = checkpoint.best_fitness
+                state.best_genome = checkpoint.best_genome
+            checkpoint.restore_rng(state)
+            # Scores only carry over when the bars are exactly the ones they were computed on
+            restored = restore_memo(state.memo, checkpoint, market.version, config) if how == "exact" else 0
+            state.resumed = {"generation": checkpoint.generation, "match": how,
+                             "created": checkpoint.created, "memo_entries": restored}
+            print(f"Resuming from checkpoint at generation {checkpoint.generation} ({how} data match).")
+        state.scheduler = GenerationScheduler(
+            min_interval=state.config["min_interval"],
+            max_interval=state.config["max_interval"],
+            burst=state.config["burst"],
+        )
+        state.scheduler.notify_data(state.market.version)
+        state.running = True
         # IMPORTANT: Ensure the thread is created correctly
-        ga_state.thread = threading.Thread(target=evolution_loop, daemon=True)
-        ga_state.thread.start()
+        state.thread = threading.Thread(target=evolution_loop, args=(state, population), daemon=True)
+        state.thread.start()
         print("GA thread started successfully.")
             
     # Always return a fresh status payload to confirm the state
-    return jsonify({"message": "Genetic Algorithm started.", "status": get_status_payload()})
+    return jsonify({"message": "Genetic Algorithm started.", "status": get_status_payload(state=state)})
 
 @flask_app.route('/stop', methods=['POST'])
-def stop_ga():
+@flask_app.route('/sessions/<session>/stop', methods=['POST'])
+def stop_ga(session=None):
+    if session is None and not _numeric_ready.is_set():
+        return jsonify({"message": "Genetic Algorithm stopped.", "status": idle_status_payload()})
+    state = session_state(session)
     thread_to_join = None
-    with ga_state.lock:
-        if ga_state.running:
-            ga_state.running = False
-            thread_to_join = ga_state.thread
+    with state.lock:
+        if state.running:
+            state.running = False
+            thread_to_join = state.thread
+            # Wake the loop if it is waiting for the next generation
+            state.scheduler.stop()
             print("Stop signal sent to GA loop.")
         else:
             print("GA already stopped.")
@@ -299,76 +766,326 @@ def stop_ga():
         print("GA thread joined.")
     
     # Clean up the thread object after it's stopped
-    with ga_state.lock:
-        ga_state.thread = None
+    with state.lock:
+        state.thread = None
 
-    return jsonify({"message": "Genetic Algorithm stopped.", "status": get_status_payload()})
+    return jsonify({"message": "Genetic Algorithm stopped.", "status": get_status_payload(state=state)})
 
 @flask_app.route('/status', methods=['GET'])
-def status_ga():
-    return jsonify(get_status_payload())
+@flask_app.route('/sessions/<session>/status', methods=['GET'])
+def status_ga(session=None):
+    if session is None and not _numeric_ready.is_set():
+        return jsonify(idle_status_payload())
+    return jsonify(get_status_payload(state=session_state(session)))
 
 @flask_app.route('/update_data', methods=['POST'])
-def update_data():
-    json_data = request.get_json()
-    if not json_data or 'klines' not in json_data:
-        return jsonify({"error": "Missing klines data"}), 400
+@flask_app.route('/sessions/<session>/update_data', methods=['POST'])
+def update_data(session=None):
+    """
+    Replace or extend the bar history. The body is either JSON
+    ({"klines": [{time, open, high, low, close, volume}, ...], "mode": ...}) or, with
+    Content-Type application/x-klines, the binary columnar format of market_data.py.
+    Either may be gzipped (Content-Encoding: gzip, or recognized by its magic bytes).
+    Bodies over MAX_PAYLOAD_BYTES, compressed or decompressed, get a 413.
+    """
+    numeric()
+    binary = request.mimetype in BINARY_KLINE_TYPES
+    encoding = (request.content_encoding or "").lower()
+    if encoding not in ("", "identity", "gzip"):
+        return jsonify({"error": f"Unsupported Content-Encoding '{request.content_encoding}'"}), 415
+    if (request.content_length or 0) > MAX_PAYLOAD_BYTES:
+        return jsonify({"error": f"Request body is larger than {MAX_PAYLOAD_BYTES} bytes"}), 413
+    try:
+        body = maybe_gunzip(request.get_data(cache=False), gzipped=True if encoding == "gzip" else None)
+        if not binary:
+            json_data = json.loads(body) if body else None
+    except PayloadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": f"Invalid request body: {e}"}), 400
+    if not binary:
+        if not isinstance(json_data, dict) or 'klines' not in json_data:
+            return jsonify({"error": "Missing klines data"}), 400
+        # 'replace' swaps in the posted window as-is; 'append' upserts bars by time
+        mode = json_data.get('mode', 'replace')
+        if mode not in ('replace', 'append'):
+            return jsonify({"error": f"Unknown mode '{mode}'"}), 400
+    state = session_state(session, create=True)
+    metrics = state.metrics
 
-    klines = json_data['klines']
-    
+    # Parse and merge outside the GA lock; only the final publish takes it
     try:
-        with ga_state.lock:
-            # Correctly handle capitalization from the frontend
-            df = pd.DataFrame(klines)
-            df.rename(columns={
-                'time': 'time',
-                'open': 'Open',
-                'high': 'High',
-                'low': 'Low',
-                'close': 'Close',
-                'volume': 'Volume'
-            }, inplace=True)
-            
-            # Ensure correct data types
-            df = df.astype({'time': 'int64', 'Open': 'float64', 'High': 'float64', 'Low': 'float64', 'Close': 'float64', 'Volume': 'float64'})
-            df['time'] = pd.to_datetime(df['time'], unit='s')
+        with metrics.timer("ingest_parse"):
+            if binary:
+                time_col, values, append = decode_klines(body)
+                mode = 'append' if append else 'replace'
+            else:
+                time_col, values = parse_klines(json_data['klines'])
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": f"Invalid klines payload: {e}"}), 400
+    metrics.inc("ga_ingest_bytes_total", request.content_length or 0, "Request bytes received by /update_data.",
+                wire="binary" if binary else "json")
+
+    try:
+        with state.ingest_lock:
+            with metrics.timer("ingest_merge"):
+                if mode == 'replace':
+                    state.klines.replace(time_col, values)
+                    merge = {"appended": len(time_col), "updated": 0, "evicted": 0, "rebuilt": True}
+                else:
+                    merge = state.klines.upsert(time_col, values)
 
-            # CRITICAL FIX: DO NOT set a DatetimeIndex. The algorithm expects a simple integer index.
-            ga_state.historical_data = df
-            print(f"Successfully updated historical data with {len(df)} records.")
+            if not (merge["appended"] or merge["updated"] or merge["rebuilt"]):
+                return jsonify({"message": "No new or changed bars.", **merge})
+
+            # Only writers change the version, and they are serialized by ingest_lock
+            with metrics.timer("ingest_publish"):
+                market = state.klines.snapshot(state.market.version + 1)
+            with state.lock:
+                state.market = market
+                scheduler = state.scheduler
+                live = state.running and state.config["live_signals"]
+                best_genome = state.best_genome if live else None
+                generation = state.generation
+            state.indicators.invalidate(market.version)
+            scheduler.notify_data(market.version)
+            print(f"Successfully updated historical data ({mode}) with {len(market)} records.")
+            with metrics.timer("live_signal"):
+                trade = live_trade(state, best_genome, market, generation)
+            metrics.inc("ga_ingested_bars_total", len(time_col), "Bars received by /update_data.", mode=mode)
         
-        return jsonify({"message": f"Data updated with {len(klines)} records."})
+        return jsonify({"message": f"Data updated with {len(time_col)} records.", "records": len(market),
+                        "trade": trade, **merge})
     except Exception as e:
         print(f"Error processing data update: {e}")
         return jsonify({"error": f"Failed to process data: {e}"}), 500
 
 
-def get_status_payload(locked=False):
+def live_trade(state, genome, market, generation):
+    """
+    Trade decision of the best genome on the newest bar, published right away instead
+    of at the next generation. The caller must hold state.ingest_lock.
+    """
+    if genome is None:
+        state.live = None
+        return None
+    if state.live is None or state.live.key != genome_key(genome):
+        state.live = LiveSignal(genome)
+    signal = state.live.update(market)
+    trade_action = {1: 'buy', -1: 'sell'}.get(signal)
+    if not trade_action:
+        return None
+
+    trade = {
+        "action": trade_action,
+        "price": float(market.close[-1]),
+        "generation": generation,
+        "data_version": market.version,
+        "live": True,
+    }
+    with state.lock:
+        state.last_trade = trade
+    state.events.publish("trade", dict(trade))
+    print(f"Live trade signal on data v{market.version}: {trade_action.upper()} at ${trade['price']:.2f}")
+    return trade
+
+
+@flask_app.route('/events', methods=['GET'])
+@flask_app.route('/sessions/<session>/events', methods=['GET'])
+def poll_events(session=None):
+    """
+    Long-poll for events after `cursor`. Waits up to `timeout` seconds (max 30)
+    for something new. `missed` is true if older events were already dropped.
+    """
+    state = session_state(session)
+    cursor = request.args.get('cursor', default=0, type=int)
+    timeout = min(max(request.args.get('timeout', default=25.0, type=float), 0.0), 30.0)
+    events, missed = state.events.wait(cursor, timeout)
+    next_cursor = events[-1]["id"] if events else max(cursor, 0)
+    return jsonify({"events": events, "cursor": next_cursor, "missed": missed})
+
+@flask_app.route('/events/stream', methods=['GET'])
+@flask_app.route('/sessions/<session>/events/stream', methods=['GET'])
+def stream_events(session=None):
+    """
+    Server-Sent Events stream. Resumes after the `Last-Event-ID` header or the
+    `cursor` query parameter, and closes after `duration` seconds so the client
+    reconnects (EventSource does this automatically).
+    """
+    state = session_state(session)
+    cursor = request.headers.get('Last-Event-ID', type=int)
+    if cursor is None:
+        cursor = request.args.get('cursor', default=state.events.cursor, type=int)
+    duration = min(request.args.get('duration', default=300.0, type=float), 3600.0)
+    events_log = state.events
+
+    def generate(cursor):
+        deadline = time.monotonic() + duration
+        yield "retry: 1000\n\n"
+        while time.monotonic() < deadline:
+            events, missed = events_log.wait(cursor, min(15.0, max(deadline - time.monotonic(), 0.0)))
+            if missed:
+                yield "event: missed\ndata: {}\n\n"
+            if not events:
+                # A cursor from a previous instance is reset so it is only reported once
+                cursor = min(cursor, events_log.cursor)
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            cursor = events[-1]["id"]
+
+    return Response(generate(cursor), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@flask_app.route('/metrics', methods=['GET'])
+@flask_app.route('/sessions/<session>/metrics', methods=['GET'])
+def metrics_endpoint(session=None):
+    """Prometheus text-format metrics: stage timers, lock contention, throughput and cache stats."""
+    state = session_state(session)
+    with state.lock:
+        run = {
+            "ga_running": ("Whether the GA loop is running.", int(state.running)),
+            "ga_generation": ("Current generation number.", state.generation),
+            "ga_best_fitness": ("Best fitness of the run (final equity multiple or walk-forward score).",
+                                state.best_fitness if state.best_fitness != -np.inf else None),
+            "ga_data_version": ("Version of the published market snapshot.", state.market.version),
+            "ga_data_bars": ("Bars in the published market snapshot.", len(state.market)),
+        }
+        incremental = state.incremental
+
+    extra = [(name, "gauge", help_text, {(): value}) for name, (help_text, value) in run.items()]
+    sources = [("indicator_cache", state.indicators.stats()), ("fitness_memo", state.memo.stats())]
+    if incremental is not None:
+        sources.append(("incremental", {"hits": incremental.hits, "misses": incremental.misses}))
+    for prefix, stats in sources:
+        for key, value in stats.items():
+            kind = "counter" if key in ("hits", "misses", "evictions", "compute_seconds") else "gauge"
+            name = f"ga_{prefix}_{key}" + ("_total" if kind == "counter" else "")
+            extra.append((name, kind, f"{prefix} {key}.", {(): value}))
+    extra.append(("ga_profiler_samples_total", "counter", "Stack samples taken by the sampling profiler.",
+                  {(): profiler.stats()["samples"]}))
+    gate = sessions.gate.stats()
+    extra.append(("ga_sessions", "gauge", "Named GA sessions on this instance.", {(): len(sessions.sessions())}))
+    extra.append(("ga_generation_slots_active", "gauge", "Sessions currently scoring a generation.", {(): gate["active"]}))
+    extra.append(("ga_generation_slots_waiting", "gauge", "Sessions waiting for a generation slot.", {(): gate["waiting"]}))
+    extra.append(("ga_events_cursor", "gauge", "Id of the most recent event.", {(): state.events.cursor}))
+
+    return Response(state.metrics.render(extra), mimetype='text/plain; version=0.0.4')
+
+@flask_app.route('/profile', methods=['GET', 'POST'])
+def profile():
+    """
+    GET: collapsed stacks from the sampling profiler (flame graph input).
+    POST {"enabled": bool, "interval": seconds, "reset": bool} switches it on or off.
+    """
+    if request.method == 'GET':
+        return Response(profiler.collapsed(request.args.get('limit', type=int)), mimetype='text/plain')
+
+    body = request.get_json(silent=True) or {}
+    if body.get("reset"):
+        profiler.reset()
+    if "enabled" in body:
+        if body["enabled"]:
+            interval = body.get("interval")
+            if interval is not None and not (isinstance(interval, (int, float)) and 0.001 <= interval <= 1.0):
+                return jsonify({"error": "interval must be between 0.001 and 1 seconds"}), 400
+            profiler.start(interval)
+        else:
+            profiler.stop()
+    return jsonify(profiler.stats())
+
+
+@flask_app.route('/sessions', methods=['GET'])
+def list_sessions():
+    """Named sessions with their run state, plus the instance-wide memory budget."""
+    numeric()
+    listing = []
+    for key, state in sessions.sessions():
+        with state.lock:
+            listing.append({
+                "id": key,
+                "running": state.running,
+                "generation": state.generation,
+                "bars": len(state.market),
+                "data_version": state.market.version,
+                "memory_bytes": sessions.state_bytes(state),
+            })
+    return jsonify({
+        "sessions": listing,
+        "memory_bytes": sessions.memory_bytes(),
+        "max_memory_bytes": sessions.max_bytes,
+        "generation_slots": sessions.gate.stats(),
+        # Shared by all sessions; each session's /metrics reports its own share
+        "indicator_cache": sessions.indicators.stats(),
+    })
+
+@flask_app.route('/sessions/<session>', methods=['DELETE'])
+def delete_session(session):
+    """Stop a session and free its data, cache rows and shared-memory blocks."""
+    state = session_state(session)
+    stop_ga(session)
+    sessions.remove(state.key)
+    return jsonify({"message": f"Session {state.key} removed."})
+
+
+def genome_payload(genome):
+    """Genome with plain ints so it can be JSON-encoded outside Flask."""
+    return {key: int(value) for key, value in genome.items()}
+
+def idle_status_payload():
+    """Status of a GA that has not been started on this instance; needs no numeric imports."""
+    return {
+        "running": False,
+        "generation": 0,
+        "best_fitness": None,
+        "best_genome": None,
+        "best_performance": None,
+        "last_trade": None,
+        "fitness_memo": {"entries": 0, "hits": 0, "misses": 0, "hit_rate": None},
+        "islands": None,
+        "resumed": None,
+        "error": None,
+    }
+
+def get_status_payload(locked=False, state=None):
     """Helper to get a consistent status object. The `locked` parameter avoids deadlocks."""
+    state = state or ga_state
     if locked: # This block is for when the function is called from within an existing lock
         status_dict = {
-            "running": ga_state.running,
-            "generation": ga_state.generation,
-            "best_fitness": ga_state.best_fitness if ga_state.best_fitness != -np.inf else None,
-            "best_genome": ga_state.best_genome,
-            "last_trade": ga_state.last_trade
+            "running": state.running,
+            "generation": state.generation,
+            "best_fitness": state.best_fitness if state.best_fitness != -np.inf else None,
+            "best_genome": state.best_genome,
+            "best_performance": state.best_performance,
+            "last_trade": state.last_trade,
+            "fitness_memo": state.memo.stats(),
+            "islands": state.islands,
+            "resumed": state.resumed,
+            "error": state.error,
         }
         # Consume the trade signal after reading it
-        if ga_state.last_trade:
-            ga_state.last_trade = None
+        if state.last_trade:
+            state.last_trade = None
         return status_dict
     else: # This block is for external calls, acquiring the lock is necessary
-        with ga_state.lock:
+        with state.lock:
             status_dict = {
-                "running": ga_state.running,
-                "generation": ga_state.generation,
-                "best_fitness": ga_state.best_fitness if ga_state.best_fitness != -np.inf else None,
-                "best_genome": ga_state.best_genome,
-                "last_trade": ga_state.last_trade
+                "running": state.running,
+                "generation": state.generation,
+                "best_fitness": state.best_fitness if state.best_fitness != -np.inf else None,
+                "best_genome": state.best_genome,
+                "best_performance": state.best_performance,
+                "last_trade": state.last_trade,
+                "fitness_memo": state.memo.stats(),
+                "islands": state.islands,
+                "resumed": state.resumed,
+                "error": state.error,
             }
             # Consume the trade signal after reading it
-            if ga_state.last_trade:
-                ga_state.last_trade = None
+            if state.last_trade:
+                state.last_trade = None
             return status_dict
 
 # This is a wrapper to integrate Flask with Firebase Cloud Functions
@@ -379,4 +1096,8 @@ def api(req: https_fn.Request) -> https_fn.Response:
         # This is the key change: letting Flask's routing handle the request
         return flask_app.full_dispatch_request()
 
-    
\ No newline at end of file
+    
+
+
+# Started last so that defining the routes above does not compete with the imports
+threading.Thread(target=_warm_up, name="numeric-warm-up", daemon=True).start()
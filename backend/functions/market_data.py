@@ -0,0 +1,323 @@
+# Kline ingestion for the GA backend.
+# Incoming klines are parsed straight into columnar NumPy arrays and merged by
+# `time` into a preallocated ring buffer, so merging costs O(new bars) instead
+# of rebuilding a whole DataFrame. Readers never see the buffer itself: each
+# update publishes an immutable MarketSnapshot (one contiguous copy of the live
+# bars) that can then be shared without further copies.
+#
+# Besides JSON, bars can arrive in a columnar binary format (optionally gzipped):
+#   header  <4s B B H I>  magic b"KLNS", format version, flags, reserved, bar count n
+#   time    n x int64     seconds, little-endian
+#   values  5n x float64  open[n], high[n], low[n], close[n], volume[n], little-endian
+# Every array starts on an 8-byte boundary, so decoding is np.frombuffer views.
+
+import gzip
+import os
+import struct
+import zlib
+
+import numpy as np
+
+# Frontend field name -> DataFrame column name
+KLINE_FIELDS = {
+    'open': 'Open',
+    'high': 'High',
+    'low': 'Low',
+    'close': 'Close',
+    'volume': 'Volume',
+}
+PRICE_COLUMNS = tuple(KLINE_FIELDS.values())
+# How many past versions a snapshot remembers for common_prefix()
+LINEAGE_DEPTH = 32
+
+BINARY_MAGIC = b"KLNS"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sBBHI")
+# Header flag: upsert the bars instead of replacing the window
+FLAG_APPEND = 1
+GZIP_MAGIC = b"\x1f\x8b"
+# Content types /update_data treats as the binary format
+BINARY_KLINE_TYPES = ("application/x-klines", "application/octet-stream")
+# Largest /update_data body accepted, after decompression
+MAX_PAYLOAD_BYTES = int(os.environ.get("GA_MAX_PAYLOAD_MB", "64")) * 2**20
+
+
+def parse_klines(klines):
+    """
+    Parse a list of kline dicts ({time, open, high, low, close, volume}) into
+    columnar arrays sorted by time, keeping the last copy of any duplicated bar.
+    Returns (time, values) with `time` int64 seconds and `values` a (5, n) float64
+    matrix in PRICE_COLUMNS order.
+    """
+    n = len(klines)
+    time = np.array([k['time'] for k in klines]).astype(np.int64)
+    values = np.empty((len(KLINE_FIELDS), n), dtype=np.float64)
+    for row, field in enumerate(KLINE_FIELDS):
+        values[row] = [k[field] for k in klines]
+    return _sorted_unique(time, values)
+
+
+def _sorted_unique(time, values):
+    if len(time) > 1 and not np.all(time[1:] > time[:-1]):
+        # Stable sort, then keep the last occurrence of each time
+        order = np.argsort(time, kind='stable')
+        time, values = time[order], values[:, order]
+        keep = np.append(time[1:] != time[:-1], True)
+        time, values = time[keep], values[:, keep]
+    return time, values
+
+
+def encode_klines(time, values, append=False, compress=False):
+    """Pack (time, values) into the binary kline format; values in PRICE_COLUMNS order."""
+    time = np.ascontiguousarray(time, dtype='<i8')
+    values = np.ascontiguousarray(values, dtype='<f8').reshape(len(PRICE_COLUMNS), len(time))
+    flags = FLAG_APPEND if append else 0
+    payload = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags, 0, len(time)) + time.tobytes() + values.tobytes()
+    return gzip.compress(payload, compresslevel=6) if compress else payload
+
+
+def decode_klines(payload):
+    """
+    Decode a binary kline payload (gzipped or not) without copying the columns.
+    Returns (time, values, append) like parse_klines plus the append flag; the
+    arrays are read-only views unless bars had to be sorted. Raises ValueError
+    on malformed input.
+    """
+    payload = maybe_gunzip(payload)
+    if len(payload) < BINARY_HEADER.size:
+        raise ValueError("Binary klines payload is shorter than its header")
+    magic, version, flags, _, n = BINARY_HEADER.unpack_from(payload)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary klines payload")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary klines version {version}")
+    expected = BINARY_HEADER.size + 8 * n * (1 + len(PRICE_COLUMNS))
+    if len(payload) != expected:
+        raise ValueError(f"Binary klines payload has {len(payload)} bytes, expected {expected} for {n} bars")
+    time = np.frombuffer(payload, dtype='<i8', count=n, offset=BINARY_HEADER.size)
+    values = np.frombuffer(payload, dtype='<f8', count=n * len(PRICE_COLUMNS),
+                           offset=BINARY_HEADER.size + 8 * n).reshape(len(PRICE_COLUMNS), n)
+    time, values = _sorted_unique(time, values)
+    return time, values, bool(flags & FLAG_APPEND)
+
+
+class PayloadTooLarge(ValueError):
+    """A request body that is, or decompresses to, more than MAX_PAYLOAD_BYTES."""
+
+
+def maybe_gunzip(payload, gzipped=None, max_size=MAX_PAYLOAD_BYTES):
+    """
+    Decompress a gzip body. gzipped says whether it is compressed (Content-Encoding);
+    None recognizes gzip by its magic bytes. Decompression stops as soon as the output
+    passes max_size, raising PayloadTooLarge, so a small bomb cannot inflate into
+    memory. Raises ValueError on corrupt data; anything else is returned as is.
+    """
+    if gzipped is None:
+        gzipped = payload[:2] == GZIP_MAGIC
+    if not gzipped:
+        if len(payload) > max_size:
+            raise PayloadTooLarge(f"Body is larger than {max_size} bytes")
+        return payload
+    chunks, size = [], 0
+    rest = payload
+    try:
+        while True:  # one decoder per gzip member, as gzip.decompress does
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            chunk = decoder.decompress(rest, max_size - size + 1)
+            size += len(chunk)
+            if size > max_size:
+                raise PayloadTooLarge(f"Body decompresses to more than {max_size} bytes")
+            if not decoder.eof:
+                raise ValueError("Invalid gzip body: truncated stream")
+            chunks.append(chunk)
+            rest = decoder.unused_data
+            if not rest:
+                return b"".join(chunks)
+            if rest[:2] != GZIP_MAGIC:
+                raise ValueError("Invalid gzip body: trailing data after the stream")
+    except zlib.error as e:
+        raise ValueError(f"Invalid gzip body: {e}") from None
+
+
+class MarketSnapshot:
+    """
+    Immutable, versioned view of the bar history.
+    Every array is read-only, so readers can hold a reference for as long as they
+    like while newer snapshots are published.
+    """
+
+    def __init__(self, version, time, values, lineage=()):
+        self.version = version
+        # ((version, bars shared with version - 1), ...) for the most recent versions
+        self.lineage = lineage
+        self.time = time
+        self.open, self.high, self.low, self.close, self.volume = values
+        for array in (self.time, self.open, self.high, self.low, self.close, self.volume):
+            array.setflags(write=False)
+
+    @classmethod
+    def empty(cls):
+        return cls(0, np.zeros(0, dtype=np.int64), np.zeros((len(PRICE_COLUMNS), 0)))
+
+    def __len__(self):
+        return len(self.time)
+
+    def common_prefix(self, version):
+        """
+        Number of leading bars that are identical in this snapshot and in snapshot
+        `version`, or 0 if that version is too old to tell.
+        """
+        if version == self.version:
+            return len(self)
+        prefix = len(self)
+        for entry_version, shared in reversed(self.lineage):
+            if entry_version <= version:
+                break
+            prefix = min(prefix, shared)
+            if entry_version == version + 1:
+                return prefix
+        return 0
+
+
+class KlineBuffer:
+    """
+    Fixed-capacity ring buffer of bars kept in time order.
+    Not thread-safe: callers serialize writers (see GAState.ingest_lock).
+    """
+
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.time = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((len(PRICE_COLUMNS), capacity), dtype=np.float64)
+        self.start = 0  # physical index of the oldest bar
+        self.size = 0
+        # Lineage tracking: first logical index changed since the last snapshot
+        self._dirty_from = 0
+        self._published_size = 0
+        self._lineage = ()
+
+    def __len__(self):
+        return self.size
+
+    def _segments(self):
+        """Physical slices of the buffer in logical (oldest to newest) order."""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return [slice(self.start, end)]
+        return [slice(self.start, self.capacity), slice(0, end - self.capacity)]
+
+    def _locate(self, times):
+        """Physical index of each of `times` in the buffer, or -1 if the bar is not present."""
+        found = np.full(len(times), -1, dtype=np.int64)
+        for seg in self._segments():
+            seg_time = self.time[seg]
+            pos = np.searchsorted(seg_time, times)
+            inside = pos < len(seg_time)
+            match = np.zeros(len(times), dtype=bool)
+            match[inside] = seg_time[pos[inside]] == times[inside]
+            found[match] = seg.start + pos[match]
+        return found
+
+    def _mark_dirty(self, index):
+        self._dirty_from = min(self._dirty_from, int(index))
+
+    def _common_prefix(self, time, values):
+        """Number of leading bars of (time, values) that match the current contents."""
+        cur_time, cur_values = self.ordered()
+        m = min(len(cur_time), len(time))
+        same = (cur_time[:m] == time[:m]) & np.all(cur_values[:, :m] == values[:, :m], axis=0)
+        return m if same.all() else int(np.argmin(same))
+
+    def replace(self, time, values):
+        """Drop everything and load the given bars, growing the buffer if needed."""
+        self._mark_dirty(self._common_prefix(time, values))
+        if len(time) > self.capacity:
+            self.capacity = len(time)
+            self.time = np.zeros(self.capacity, dtype=np.int64)
+            self.values = np.zeros((len(PRICE_COLUMNS), self.capacity), dtype=np.float64)
+        self.start = 0
+        self.size = len(time)
+        self.time[:self.size] = time
+        self.values[:, :self.size] = values
+
+    def upsert(self, time, values):
+        """
+        Merge sorted bars by time: bars newer than the last one are appended (evicting
+        the oldest when full) and bars already present are overwritten in place.
+        Bars that would land between or before existing ones force a full rebuild.
+        Returns a dict with the number of appended, updated and evicted bars.
+        """
+        stats = {"appended": 0, "updated": 0, "evicted": 0, "rebuilt": False}
+        if len(time) == 0:
+            return stats
+        if self.size == 0:
+            self.replace(time[-self.capacity:], values[:, -self.capacity:])
+            stats["appended"] = self.size
+            return stats
+
+        last = self.time[(self.start + self.size - 1) % self.capacity]
+        is_new = time > last
+        old_time, old_values = time[~is_new], values[:, ~is_new]
+
+        if len(old_time):
+            idx = self._locate(old_time)
+            if np.any(idx < 0):
+                self._rebuild(time, values)
+                stats["rebuilt"] = True
+                return stats
+            changed = np.any(self.values[:, idx] != old_values, axis=0)
+            if changed.any():
+                self._mark_dirty(np.min((idx[changed] - self.start) % self.capacity))
+            self.values[:, idx[changed]] = old_values[:, changed]
+            stats["updated"] = int(np.count_nonzero(changed))
+
+        new_time, new_values = time[is_new], values[:, is_new]
+        if len(new_time) > self.capacity:
+            new_time, new_values = new_time[-self.capacity:], new_values[:, -self.capacity:]
+        count = len(new_time)
+        if count:
+            slots = (self.start + self.size + np.arange(count)) % self.capacity
+            self.time[slots] = new_time
+            self.values[:, slots] = new_values
+            overflow = max(0, self.size + count - self.capacity)
+            if overflow:
+                # Every bar shifts when the oldest ones are evicted
+                self._mark_dirty(0)
+            self.start = (self.start + overflow) % self.capacity
+            self.size += count - overflow
+            stats["appended"] = count
+            stats["evicted"] = overflow
+        return stats
+
+    def _rebuild(self, time, values):
+        """Slow path for out-of-order bars: merge both sets and reload the buffer."""
+        cur_time, cur_values = self.ordered()
+        merged_time = np.concatenate([cur_time, time])
+        merged_values = np.concatenate([cur_values, values], axis=1)
+        order = np.argsort(merged_time, kind='stable')
+        merged_time, merged_values = merged_time[order], merged_values[:, order]
+        keep = np.append(merged_time[1:] != merged_time[:-1], True)
+        merged_time, merged_values = merged_time[keep], merged_values[:, keep]
+        keep_n = min(len(merged_time), self.capacity)
+        self.replace(merged_time[-keep_n:], merged_values[:, -keep_n:])
+
+    def ordered(self):
+        """Copies of (time, values) in time order."""
+        segments = self._segments()
+        time = np.concatenate([self.time[seg] for seg in segments])
+        values = np.concatenate([self.values[:, seg] for seg in segments], axis=1)
+        return time, values
+
+    def snapshot(self, version):
+        """
+        Publishable MarketSnapshot of the current contents. Versions must be
+        consecutive so that the snapshot's lineage can describe what changed.
+        The live bars are copied (not the spare capacity): the ring is overwritten
+        in place, while readers keep older snapshots across publishes.
+        """
+        time, values = self.ordered()
+        shared = min(self._dirty_from, self._published_size)
+        self._lineage = self._lineage[-(LINEAGE_DEPTH - 1):] + ((version, shared),)
+        self._dirty_from = self.size
+        self._published_size = self.size
+        return MarketSnapshot(version, time, values, self._lineage)
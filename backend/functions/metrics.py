@@ -0,0 +1,254 @@
+# Instrumentation for the GA backend.
+# Stage timers, counters, gauges and a generation-duration histogram are kept in
+# one registry and rendered in the Prometheus text exposition format by /metrics.
+# The GA lock is wrapped so that every acquisition is counted per call site, and
+# an optional sampling profiler can be switched on at runtime.
+
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+# Generation durations span sub-millisecond (memo hits) to minutes (huge populations)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in sorted(labels))
+    return "{" + body + "}"
+
+
+def _number(value):
+    if value is None:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    Thread-safe registry. Metric names are declared on first use with a help text;
+    label sets are passed as keyword arguments.
+    """
+
+    def __init__(self, recent=100):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._types = {}
+        self._values = defaultdict(dict)  # name -> {labels: value}
+        self._histograms = {}  # name -> {labels: [bucket counts, sum, count]}
+        self._recent = defaultdict(lambda: deque(maxlen=recent))
+
+    def _declare(self, name, kind, help_text):
+        if name not in self._types:
+            self._types[name] = kind
+            self._help[name] = help_text
+
+    def inc(self, name, value=1, help_text="", **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._declare(name, "counter", help_text)
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, help_text="", **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._declare(name, "gauge", help_text)
+            self._values[name][key] = value
+
+    def observe(self, name, value, help_text="", buckets=DURATION_BUCKETS, **labels):
+        """Add an observation to a histogram (and to its window of recent values)."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._declare(name, "histogram", help_text)
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = [buckets, [0] * len(buckets), 0.0, 0]
+            bounds, counts, _, _ = entry = series[key]
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    counts[i] += 1
+            entry[2] += value
+            entry[3] += 1
+            self._recent[(name, key)].append(value)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time a block into ga_stage_seconds_total / ga_stage_calls_total for `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.inc("ga_stage_seconds_total", elapsed, "Wall time spent in each stage.", stage=stage)
+            self.inc("ga_stage_calls_total", 1, "Number of times each stage ran.", stage=stage)
+
+    def render(self, extra=()):
+        """
+        Prometheus text format. `extra` is an iterable of (name, kind, help, {labels: value})
+        for values read from elsewhere at scrape time (cache stats and the like).
+        """
+        lines = []
+        with self._lock:
+            families = [(name, self._types[name], self._help[name], dict(series))
+                        for name, series in self._values.items()]
+            histograms = [(name, self._help[name], {k: (b, list(c), s, n) for k, (b, c, s, n) in series.items()})
+                          for name, series in self._histograms.items()]
+            recent = {key: list(values) for key, values in self._recent.items()}
+
+        for name, kind, help_text, series in list(families) + list(extra):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+
+        for name, help_text, series in histograms:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, (bounds, counts, total, count) in sorted(series.items()):
+                for bound, bucket in zip(bounds, counts):
+                    lines.append(f"{name}_bucket{_labels(key + (('le', _number(float(bound))),))} {bucket}")
+                lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_labels(key)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(key)} {count}")
+            # Quantiles over the recent window, for dashboards that want "now" rather than since-start
+            lines.append(f"# HELP {name}_recent {help_text} Quantiles over the most recent observations.")
+            lines.append(f"# TYPE {name}_recent summary")
+            for key in sorted(series):
+                values = sorted(recent.get((name, key), ()))
+                for q in (0.5, 0.9, 0.99):
+                    value = values[min(int(q * len(values)), len(values) - 1)] if values else None
+                    lines.append(f"{name}_recent{_labels(key + (('quantile', str(q)),))} {_number(value)}")
+                lines.append(f"{name}_recent_sum{_labels(key)} {_number(float(sum(values)))}")
+                lines.append(f"{name}_recent_count{_labels(key)} {len(values)}")
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedLock:
+    """
+    Drop-in replacement for threading.Lock used as a context manager. Each
+    acquisition is counted under the name of the calling function, together with
+    whether it had to wait, how long it waited and how long the lock was held.
+    """
+
+    def __init__(self, metrics, name):
+        self._lock = threading.Lock()
+        self._metrics = metrics
+        self._name = name
+        self._held_since = None
+        self._site = None
+
+    def acquire(self, blocking=True, timeout=-1, site=None):
+        site = site or sys._getframe(1).f_code.co_name
+        if self._lock.acquire(False):
+            waited = 0.0
+        else:
+            start = time.perf_counter()
+            if not self._lock.acquire(blocking, timeout):
+                return False
+            waited = time.perf_counter() - start
+            self._metrics.inc("ga_lock_contended_total", 1,
+                              "Acquisitions that had to wait for the lock.", lock=self._name, site=site)
+            self._metrics.inc("ga_lock_wait_seconds_total", waited,
+                              "Time spent waiting for the lock.", lock=self._name, site=site)
+        self._metrics.inc("ga_lock_acquisitions_total", 1, "Lock acquisitions.", lock=self._name, site=site)
+        self._held_since = time.perf_counter()
+        self._site = site
+        return True
+
+    def release(self):
+        held = time.perf_counter() - self._held_since
+        site = self._site
+        self._lock.release()
+        self._metrics.inc("ga_lock_held_seconds_total", held, "Time the lock was held.", lock=self._name, site=site)
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire(site=sys._getframe(1).f_code.co_name)
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background thread samples the stacks of all other
+    threads every `interval` seconds and counts them in collapsed form
+    ("outer;inner;leaf count"), which flame graph tools read directly.
+    """
+
+    def __init__(self, interval=0.01, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._stacks = Counter()
+        self._samples = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None):
+        if interval:
+            self.interval = interval
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            names.update({t.ident: t.name for t in threading.enumerate()})
+            frames = sys._current_frames()
+            sampled = []
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                sampled.append(";".join(reversed(stack)))
+            del frames
+            with self._lock:
+                self._stacks.update(sampled)
+                self._samples += 1
+
+    def collapsed(self, limit=None):
+        """Collapsed stacks, most frequent first."""
+        with self._lock:
+            items = self._stacks.most_common(limit)
+        return "\n".join(f"{stack} {count}" for stack, count in items) + "\n"
+
+    def stats(self):
+        with self._lock:
+            return {"running": self.running, "interval": self.interval,
+                    "samples": self._samples, "stacks": len(self._stacks)}
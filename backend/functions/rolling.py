@@ -0,0 +1,144 @@
+# src/rolling.py
+# Streaming MA / RSI kernels that match the batch indicators bit for bit, fed one
+# value at a time with O(window) state.
+# backend/functions/rolling.py is a copy of this file (the Cloud Function is deployed
+# on its own); tests/test_shared_modules.py fails when the two differ.
+import math
+from collections import deque
+
+
+class RollingMean:
+    """
+    Streaming moving average equal to Series.rolling(window, min_periods).mean().
+    pandas keeps a compensated running sum, with separate compensation terms for values
+    entering and leaving the window and special cases for flat and single-signed windows;
+    the same arithmetic is repeated here so every value matches bit for bit.
+    """
+
+    __slots__ = ("window", "min_periods", "values", "nobs", "sum", "neg_count", "comp_add", "comp_remove",
+                 "same_count", "prev_value")
+
+    def __init__(self, window: int, min_periods: int = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque()
+        self.nobs = 0
+        self.sum = 0.0
+        self.neg_count = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_count = 0
+        self.prev_value = None
+
+    def copy(self) -> "RollingMean":
+        other = RollingMean.__new__(RollingMean)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.values = deque(self.values)
+        return other
+
+    def update(self, value: float) -> float:
+        """Push the next value and return the current mean (NaN below min_periods)."""
+        value = float(value)
+        if self.prev_value is None:
+            self.prev_value = value
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(value)
+        self._add(value)
+        return self.value()
+
+    def value(self) -> float:
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return math.nan
+        result = self.sum / self.nobs
+        if self.same_count >= self.nobs:
+            result = self.prev_value
+        elif self.neg_count == 0 and result < 0:
+            result = 0.0
+        elif self.neg_count == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def _add(self, value: float):
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.comp_add
+        t = self.sum + y
+        self.comp_add = t - self.sum - y
+        self.sum = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_count += 1
+        if value == self.prev_value:
+            self.same_count += 1
+        else:
+            self.same_count = 1
+        self.prev_value = value
+
+    def _remove(self, value: float):
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.comp_remove
+        t = self.sum + y
+        self.comp_remove = t - self.sum - y
+        self.sum = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_count -= 1
+
+
+class WilderRSI:
+    """
+    Streaming RSI equal to ta.momentum.RSIIndicator(close, window).rsi():
+    Wilder smoothing is pandas' adjust=False EWM with alpha = 1/window, run on one
+    up/down move at a time. NaN for the first window - 1 bars.
+    """
+
+    __slots__ = ("window", "prev_close", "ema_up", "ema_down", "nobs", "_old_weight", "_new_weight")
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.prev_close = None
+        self.ema_up = None
+        self.ema_down = None
+        self.nobs = 0
+        # pandas converts alpha to a centre of mass and back before running the EWM
+        alpha = 1 / window
+        com = (1 - alpha) / alpha
+        alpha = 1.0 / (1.0 + com)
+        self._old_weight = 1.0 - alpha
+        self._new_weight = alpha
+
+    def copy(self) -> "WilderRSI":
+        other = WilderRSI.__new__(WilderRSI)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def update(self, close: float) -> float:
+        """Push the next close and return the current RSI (NaN for the first window - 1 bars)."""
+        close = float(close)
+        diff = math.nan if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else -0.0
+        if self.ema_up is None:
+            self.ema_up, self.ema_down = up, down
+        else:
+            self.ema_up = self._ewm(self.ema_up, up)
+            self.ema_down = self._ewm(self.ema_down, down)
+        self.nobs += 1
+        return self.value()
+
+    def _ewm(self, weighted: float, value: float) -> float:
+        if weighted != value:
+            weighted = (self._old_weight * weighted + self._new_weight * value) / (self._old_weight + self._new_weight)
+        return weighted
+
+    def value(self) -> float:
+        if self.nobs < self.window:
+            return math.nan
+        if self.ema_down == 0:
+            return 100.0
+        return 100 - (100 / (1 + self.ema_up / self.ema_down))
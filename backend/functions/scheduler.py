@@ -0,0 +1,121 @@
+# Generation scheduling for the GA loop.
+# Instead of sleeping a fixed amount after each generation, the loop blocks on a
+# condition variable that is signalled when new market data is published or the
+# GA is stopped, so fresh bars are picked up immediately and /stop never waits.
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class GenerationScheduler:
+    """
+    Decides when the next generation should start:
+      - never sooner than `min_interval` seconds after the previous one started,
+      - as soon as a newer data version has been published,
+      - otherwise after `max_interval` seconds even without new data,
+      - or back-to-back when `burst` is set (offline optimization).
+    stop() wakes any waiter at once.
+    """
+
+    def __init__(self, min_interval=1.0, max_interval=120.0, burst=False):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.burst = burst
+        self._cond = threading.Condition()
+        self._latest_version = 0
+        self._stopped = False
+
+    def notify_data(self, version):
+        """Called by the ingestion path after a new snapshot is published."""
+        with self._cond:
+            if version > self._latest_version:
+                self._latest_version = version
+                self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    @property
+    def stopped(self):
+        with self._cond:
+            return self._stopped
+
+    def wait(self, seen_version, last_start, require_data=False):
+        """
+        Block until the next generation should start.
+        `seen_version` is the data version the last generation used and `last_start`
+        its time.monotonic() start. With `require_data`, only a newer data version
+        (or stop) ends the wait. Returns False if the scheduler was stopped.
+        """
+        with self._cond:
+            while not self._stopped:
+                fresh = self._latest_version > seen_version
+                if self.burst and (fresh or not require_data):
+                    return True
+
+                now = time.monotonic()
+                earliest = last_start + self.min_interval
+                if now < earliest:
+                    timeout = earliest - now
+                elif fresh:
+                    return True
+                elif require_data:
+                    timeout = None
+                elif now >= last_start + self.max_interval:
+                    return True
+                else:
+                    timeout = last_start + self.max_interval - now
+                self._cond.wait(timeout)
+            return False
+
+
+class GenerationGate:
+    """
+    Admission control for generations of several GA sessions sharing one instance.
+    At most `slots` generations are scored at once, and waiting sessions are served
+    in arrival order, so a session that just ran goes to the back of the queue and a
+    busy market can never starve the others.
+    """
+
+    def __init__(self, slots=1):
+        self.slots = max(1, slots)
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._active = 0
+
+    @contextmanager
+    def turn(self, cancelled=None, poll=0.1):
+        """
+        Hold a slot for the duration of the block. Yields False without a slot if
+        `cancelled()` becomes true while waiting (e.g. the session was stopped).
+        """
+        ticket = object()
+        admitted = False
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while self._queue[0] is not ticket or self._active >= self.slots:
+                    if cancelled is not None and cancelled():
+                        break
+                    self._cond.wait(poll if cancelled is not None else None)
+                else:
+                    admitted = True
+                    self._active += 1
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                with self._cond:
+                    self._active -= 1
+                    self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"slots": self.slots, "active": self._active, "waiting": len(self._queue)}
@@ -0,0 +1,131 @@
+# GA sessions for several markets on one function instance.
+# Each (symbol, interval) gets its own GA state, data buffer and event log, while
+# the expensive parts are shared: the worker pools, the indicator cache (namespaced
+# per session) and a gate that hands out generation slots fairly. A memory budget
+# decides how many sessions fit; once it is used up new sessions are refused (503)
+# until a client frees one with DELETE /sessions/<id>. Nothing is evicted behind a
+# client's back.
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from executor import PopulationEvaluator
+from indicators import IndicatorCache
+from scheduler import GenerationGate
+
+SESSION_ID = re.compile(r"^([A-Za-z0-9._]{1,32})-([0-9]{1,4}[smhdwM])$")
+
+# Rough per-entry cost of a FitnessMemo row (key tuple, score tuple, dict slot)
+MEMO_ENTRY_BYTES = 400
+# FitnessMemo cap per session: about 8 MB, so dozens of sessions fit the default
+# budget. A generation only adds population_size rows per data version.
+MEMO_ENTRIES = int(os.environ.get("GA_MEMO_ENTRIES", "20000"))
+# Fixed overhead of a session (state, event log, thread)
+SESSION_OVERHEAD_BYTES = 1024 * 1024
+
+
+class SessionLimitError(Exception):
+    """Raised when a new session does not fit in the memory budget or session cap."""
+
+
+def session_id(symbol, interval):
+    return f"{symbol.upper()}-{interval}"
+
+
+def parse_session_id(value):
+    """Split "<SYMBOL>-<interval>" (e.g. BTCUSDT-1m); None if it is not a valid id."""
+    match = SESSION_ID.match(value or "")
+    if not match:
+        return None
+    return match.group(1).upper(), match.group(2)
+
+
+class SessionManager:
+    """
+    Registry of GA sessions keyed by "<SYMBOL>-<interval>".
+    `factory(session_id)` builds the per-session state; it must expose `running`,
+    `lock`, `klines`, `memo` and `scheduler` like GAState does.
+    """
+
+    def __init__(self, factory, max_sessions=64, max_bytes=None, cache_bytes=None, slots=None):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get("GA_MAX_MEMORY_MB", "1024")) * 2**20
+        cache_bytes = cache_bytes if cache_bytes is not None else self.max_bytes // 4
+        self.indicators = IndicatorCache(max_bytes=cache_bytes)
+        self.gate = GenerationGate(slots or int(os.environ.get("GA_GENERATION_SLOTS", "0")) or os.cpu_count() or 1)
+        self._evaluators = {}
+        self._sessions = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()
+
+    def evaluator(self, mode, workers):
+        """Shared PopulationEvaluator for an executor setting; pools live as long as the instance."""
+        with self._lock:
+            key = (mode, workers)
+            if key not in self._evaluators:
+                self._evaluators[key] = PopulationEvaluator(mode=mode, workers=workers)
+            return self._evaluators[key]
+
+    def get(self, key):
+        with self._lock:
+            state = self._sessions.get(key)
+            if state is not None:
+                self._sessions.move_to_end(key)
+            return state
+
+    def get_or_create(self, key, capacity=None):
+        """
+        Return the session, creating it if needed. Raises SessionLimitError when the
+        session cap or the memory budget does not leave room for it.
+        """
+        with self._lock:
+            state = self._sessions.get(key)
+            if state is not None:
+                self._sessions.move_to_end(key)
+                return state
+            state = self.factory(key, capacity)
+            self._check_room(self.state_bytes(state))
+            self._sessions[key] = state
+            return state
+
+    def remove(self, key):
+        with self._lock:
+            state = self._sessions.pop(key, None)
+        if state is not None:
+            self._release(key)
+        return state
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.items())
+
+    def memory_bytes(self):
+        """Estimated memory held by all sessions plus the shared indicator cache."""
+        with self._lock:
+            states = list(self._sessions.values())
+        return sum(self.state_bytes(state) for state in states) + self.indicators.max_bytes
+
+    @staticmethod
+    def state_bytes(state):
+        # KlineBuffer preallocates its whole capacity; the memo grows to its cap
+        return (state.klines.capacity * 6 * 8
+                + state.memo.max_entries * MEMO_ENTRY_BYTES
+                + SESSION_OVERHEAD_BYTES)
+
+    def _check_room(self, needed):
+        """Raise SessionLimitError unless `needed` more bytes and one more session fit. Caller holds _lock."""
+        if len(self._sessions) >= self.max_sessions:
+            raise SessionLimitError(f"Session limit of {self.max_sessions} reached; DELETE an idle session first")
+        used = sum(self.state_bytes(s) for s in self._sessions.values()) + self.indicators.max_bytes
+        if used + needed > self.max_bytes:
+            raise SessionLimitError(
+                f"Not enough memory for a new session ({needed // 2**20} MiB needed, "
+                f"{(self.max_bytes - used) // 2**20} MiB free); DELETE an idle session first"
+            )
+
+    def _release(self, key):
+        self.indicators.forget(key)
+        for evaluator in list(self._evaluators.values()):
+            evaluator.forget(key)
@@ -0,0 +1,407 @@
+"""
+Offline benchmarks for the GA backend and trading-algo hot paths.
+
+Every stage runs on synthetic, seeded OHLCV data, so results are reproducible and
+no network access is needed. For each (stage, bars, population) case we report
+wall time (best and median of --repeat runs), the peak traced memory and the
+number of memory blocks the stage still holds when it returns (not a count of
+every allocation it made), measured with tracemalloc in a separate run so that
+tracing does not distort the timings.
+
+Usage (from the repository root):
+    python benchmarks/bench.py --bars 500,100000 --population 20,200
+    python benchmarks/bench.py --save benchmarks/baseline.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json --threshold 0.25
+    python benchmarks/bench.py --stages 'backend.*' --bars 5000000
+
+--compare exits with status 1 when a stage's best time (or peak memory) is more
+than `threshold` above the baseline, or when a stage of the baseline now errors.
+Stages that cannot run are reported with the reason, as skipped (missing
+dependency) or errored, and the suite goes on.
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend", "functions")
+TRADING = os.path.join(ROOT, "trading-algo")
+for path in (BACKEND, TRADING):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+STAGES = {}
+
+
+def stage(name):
+    """Register a benchmark. The function gets (data, population) and returns a no-arg callable."""
+    def register(setup):
+        STAGES[name] = setup
+        return setup
+    return register
+
+
+# --- Synthetic data ---
+
+def synthetic_ohlcv(n, seed=0):
+    """Random-walk minute bars: dict of int64 `time` (ms) and float64 OHLCV columns."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.empty(n)
+    open_[0] = close[0]
+    open_[1:] = close[:-1]
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    return {
+        "time": 1_600_000_000_000 + 60_000 * np.arange(n, dtype=np.int64),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.uniform(1, 100, n),
+    }
+
+
+def synthetic_population(size, seed=0):
+    """Genomes drawn from the same ranges as main.create_individual."""
+    rng = np.random.default_rng(seed)
+    return [{
+        "fast_ma": int(rng.integers(5, 25)),
+        "slow_ma": int(rng.integers(30, 80)),
+        "rsi_period": int(rng.integers(10, 25)),
+        "rsi_low": int(rng.integers(20, 40)),
+        "rsi_high": int(rng.integers(60, 85)),
+    } for _ in range(size)]
+
+
+def price_frame(data):
+    import pandas as pd
+    index = pd.to_datetime(data["time"], unit="ms")
+    return pd.DataFrame({
+        "Open": data["open"], "High": data["high"], "Low": data["low"],
+        "Close": data["close"], "Volume": data["volume"],
+    }, index=index)
+
+
+# --- Backend stages ---
+
+@stage("backend.parse_klines")
+def bench_parse_klines(data, population):
+    from market_data import parse_klines
+    payload = json.dumps({"klines": [
+        {"time": int(t), "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for t, o, h, l, c, v in zip(data["time"].tolist(), data["open"].tolist(), data["high"].tolist(),
+                                    data["low"].tolist(), data["close"].tolist(), data["volume"].tolist())
+    ]})
+    return lambda: parse_klines(json.loads(payload)["klines"])
+
+
+@stage("backend.decode_klines")
+def bench_decode_klines(data, population):
+    # The binary /update_data body, gzipped as a client would send it
+    from market_data import decode_klines, encode_klines
+    values = np.vstack([data[k] for k in ("open", "high", "low", "close", "volume")])
+    payload = encode_klines(data["time"] // 1000, values, compress=True)
+    return lambda: decode_klines(payload)
+
+
+@stage("backend.kline_ingest")
+def bench_kline_ingest(data, population):
+    from market_data import KlineBuffer
+    values = np.vstack([data[k] for k in ("open", "high", "low", "close", "volume")])
+    half = len(data["time"]) // 2
+
+    def run():
+        # load half the history, then append the rest in 100 batches, publishing each
+        buffer = KlineBuffer(capacity=len(data["time"]))
+        buffer.replace(data["time"][:half], values[:, :half])
+        version = 1
+        buffer.snapshot(version)
+        for batch in np.array_split(np.arange(half, len(data["time"])), 100):
+            if len(batch):
+                buffer.upsert(data["time"][batch], values[:, batch])
+                version += 1
+                buffer.snapshot(version)
+    return run
+
+
+@stage("backend.indicators")
+def bench_indicators(data, population):
+    from fitness import population_matrix, FAST, SLOW, RSI_PERIOD
+    from indicators import rolling_means, rsis
+    params = population_matrix(population)
+    ma_windows = np.unique(params[:, [FAST, SLOW]])
+    rsi_windows = np.unique(params[:, RSI_PERIOD])
+    close = data["close"]
+    return lambda: (rolling_means(close, ma_windows), rsis(close, rsi_windows))
+
+
+@stage("backend.evaluate_population")
+def bench_evaluate_population(data, population):
+    from fitness import evaluate_population, population_matrix
+    params = population_matrix(population)
+    return lambda: evaluate_population(params, data["close"])
+
+
+@stage("backend.evaluate_folds")
+def bench_evaluate_folds(data, population):
+    # Walk-forward fitness with 4 folds; compare with backend.evaluate_population
+    from fitness import evaluate_population, population_matrix
+    params = population_matrix(population)
+    return lambda: evaluate_population(params, data["close"], scoring=4)
+
+
+@stage("backend.calculate_fitness")
+def bench_calculate_fitness(data, population):
+    # main.py needs the Firebase/Flask stack; the stage is skipped where it is not installed
+    import main
+    main.numeric()
+    df = price_frame(data)
+    return lambda: [main.calculate_fitness(genome, df) for genome in population]
+
+
+@stage("backend.generate_signals")
+def bench_generate_signals(data, population):
+    import main
+    main.numeric()
+    df = price_frame(data)
+    return lambda: [main.generate_signals(df.copy(), genome) for genome in population]
+
+
+def cold_start(script):
+    """Run `script` in a fresh interpreter from backend/functions, as a new instance would."""
+    command = [sys.executable, "-c", script]
+    probe = subprocess.run(command, cwd=BACKEND, capture_output=True, text=True)
+    if probe.returncode != 0:
+        reason = probe.stderr.strip().splitlines()[-1] if probe.stderr.strip() else "startup failed"
+        raise (ImportError if reason.startswith(("ImportError", "ModuleNotFoundError")) else RuntimeError)(reason)
+    return lambda: subprocess.run(command, cwd=BACKEND, check=True, capture_output=True)
+
+
+@stage("backend.startup_status")
+def bench_startup_status(data, population):
+    # Interpreter start, `import main` and the first /status answer: the cold-start
+    # latency of the lightweight routes. Independent of bars and population.
+    return cold_start("import main; main.flask_app.test_client().get('/status')")
+
+
+@stage("backend.startup_numeric")
+def bench_startup_numeric(data, population):
+    # Until the background warm-up has loaded the numeric stack and built the GA state
+    return cold_start("import main; main.numeric()")
+
+
+# --- trading-algo stages ---
+
+@stage("trading.generate_signals")
+def bench_trading_signals(data, population):
+    from src.strategy import generate_signals
+    df = price_frame(data)
+    return lambda: generate_signals(df, fast=20, slow=50)
+
+
+@stage("trading.run_backtest")
+def bench_run_backtest(data, population):
+    from src.backtest import run_backtest
+    from src.strategy import generate_signals
+    signals = generate_signals(price_frame(data), fast=20, slow=50)
+    return lambda: run_backtest(signals, commission=1.0)
+
+
+@stage("trading.compute_perf")
+def bench_compute_perf(data, population):
+    import pandas as pd
+    from src.utils import compute_perf
+    equity = pd.Series(data["close"], index=pd.to_datetime(data["time"], unit="ms"))
+    return lambda: compute_perf(equity)
+
+
+@stage("trading.performance")
+def bench_performance(data, population):
+    # Batched analytics of one equity curve per genome, as a sweep chunk would see them
+    from src.analytics import performance
+    rng = np.random.default_rng(len(population))
+    returns = rng.normal(0, 0.001, (len(data["close"]), len(population)))
+    equity = np.cumprod(1 + returns, axis=0)
+    positions = np.sign(returns)
+    return lambda: performance(equity, positions=positions)
+
+
+@stage("trading.run_sweep")
+def bench_run_sweep(data, population):
+    from src.sweep import run_sweep
+    df = price_frame(data)
+    fast = sorted({g["fast_ma"] for g in population})
+    slow = sorted({g["slow_ma"] for g in population})
+    return lambda: run_sweep(df, fast=fast, slow=slow, rsi_high=[70])
+
+
+# --- Measurement ---
+
+def measure(run, repeat):
+    """Best/median wall time over `repeat` runs, then one traced run for memory."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    result = run()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "repeats": repeat,
+        "peak_bytes": peak - base,
+        "retained_blocks": retained_blocks,
+    }
+
+
+def case_name(stage_name, bars, population):
+    return f"{stage_name}[bars={bars},pop={population}]"
+
+
+def run_benchmarks(stages, bars_list, populations, repeat, seed):
+    """
+    Measure every stage at every size. A stage that cannot be set up or run is
+    recorded with its reason instead of aborting the suite: in `skipped` when a
+    dependency is missing, in `errors` for any other exception.
+    """
+    results, skipped, errors = {}, {}, {}
+    for bars in bars_list:
+        data = synthetic_ohlcv(bars, seed)
+        for population_size in populations:
+            population = synthetic_population(population_size, seed)
+            for name in stages:
+                key = case_name(name, bars, population_size)
+                try:
+                    run = STAGES[name](data, population)
+                    results[key] = measure(run, repeat)
+                except ImportError as e:
+                    skipped[key] = f"missing dependency: {e}"
+                    continue
+                except Exception as e:
+                    errors[key] = f"{type(e).__name__}: {e}"
+                    continue
+                r = results[key]
+                print(f"{key:<60} {r['best_s'] * 1e3:10.2f} ms  (median {r['median_s'] * 1e3:.2f})"
+                      f"  peak {r['peak_bytes'] / 2**20:8.2f} MiB  retained {r['retained_blocks']:+d} blocks", flush=True)
+    for key, reason in skipped.items():
+        print(f"{key:<60} skipped ({reason})")
+    for key, reason in errors.items():
+        print(f"{key:<60} error ({reason})")
+    return results, skipped, errors
+
+
+def environment():
+    versions = {"python": platform.python_version(), "numpy": np.__version__}
+    try:
+        import pandas
+        versions["pandas"] = pandas.__version__
+    except ImportError:
+        pass
+    return {"platform": platform.platform(), "machine": platform.machine(), **versions}
+
+
+def compare(results, baseline, threshold, errors=()):
+    """
+    Return the list of regressions: time or peak memory above baseline * (1 + threshold),
+    and stages of the baseline that errored in this run (metric "error", reason as new).
+    """
+    regressions = []
+    for key in errors:
+        if key in baseline:
+            regressions.append((key, "error", None, errors[key]))
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ("best_s", "peak_bytes"):
+            old, new = previous[metric], current[metric]
+            # ignore noise on tiny measurements
+            floor = 1e-4 if metric == "best_s" else 64 * 1024
+            if old > 0 and new > max(old * (1 + threshold), floor):
+                regressions.append((key, metric, old, new))
+    return regressions
+
+
+def parse_sizes(text):
+    return [int(float(part)) for part in text.split(",") if part]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", default="500,10000", help="comma-separated history lengths (e.g. 500,100000,5e6)")
+    parser.add_argument("--population", default="20,200", help="comma-separated population sizes")
+    parser.add_argument("--stages", default="*", help="comma-separated glob patterns of stage names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--list", action="store_true", help="list stage names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(STAGES))
+        return 0
+    patterns = args.stages.split(",")
+    stages = [name for name in STAGES if any(fnmatch.fnmatch(name, p) for p in patterns)]
+    if not stages:
+        parser.error(f"no stage matches {args.stages!r}")
+
+    results, skipped, errors = run_benchmarks(stages, parse_sizes(args.bars), parse_sizes(args.population),
+                                              args.repeat, args.seed)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "environment": environment(),
+        "results": results,
+        "skipped": skipped,
+        "errors": errors,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != report["environment"]:
+            print("warning: baseline was recorded in a different environment")
+        regressions = compare(results, baseline["results"], args.threshold, errors)
+        for key, metric, old, new in regressions:
+            if metric == "error":
+                print(f"REGRESSION {key} errored: {new}")
+            else:
+                print(f"REGRESSION {key} {metric}: {old:.6g} -> {new:.6g} (+{(new / old - 1) * 100:.1f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions above {args.threshold * 100:.0f}% against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
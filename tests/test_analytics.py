@@ -0,0 +1,31 @@
+# performance() must stay quiet and finite-or-inf when a short history of minute
+# bars is annualized.
+import os
+import sys
+import unittest
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "trading-algo"))
+
+from src.analytics import performance  # noqa: E402
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+class PerformanceTest(unittest.TestCase):
+    def test_minute_bars_overflow_to_inf_without_warnings(self):
+        equity = np.array([[1.0, 1.01, 1.02, 1.0, 1.05], [1.0, 0.99, 0.98, 0.97, 0.95]]).T
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            perf = performance(equity, freq_per_year=MINUTES_PER_YEAR)
+        self.assertEqual(perf["cagr"][0], np.inf)
+        self.assertEqual(perf["calmar"][0], np.inf)
+        self.assertEqual(perf["cagr"][1], -1.0)
+        self.assertAlmostEqual(perf["total_return"][0], 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
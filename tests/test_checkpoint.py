@@ -0,0 +1,83 @@
+# A checkpoint written to a store and read back must restore the run exactly:
+# population, memo, best genome, config and the session's RNG sequences.
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from checkpoint import Checkpoint, Checkpointer, LocalCheckpointStore, restore_memo  # noqa: E402
+from fitness import FitnessMemo, genome_key  # noqa: E402
+from market_data import PRICE_COLUMNS, KlineBuffer  # noqa: E402
+
+
+def session(seed):
+    return SimpleNamespace(lock=threading.Lock(), memo=FitnessMemo(), rng=random.Random(seed),
+                           np_rng=np.random.Generator(np.random.MT19937(seed)))
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        buffer = KlineBuffer()
+        buffer.replace(np.arange(300, dtype=np.int64) * 60, np.vstack([close] * len(PRICE_COLUMNS)))
+        self.market = buffer.snapshot(1)
+        self.population = [{"fast_ma": int(f), "slow_ma": 40 + i, "rsi_period": 14, "rsi_low": 30, "rsi_high": 70}
+                           for i, f in enumerate(rng.integers(5, 25, 12))]
+
+    def test_round_trip_through_store(self):
+        state = session(7)
+        state.generation, state.best_fitness = 42, 1.25
+        state.best_genome = dict(self.population[3])
+        state.config = {"population_size": 12, "num_parents": 6, "fitness": "sharpe", "folds": 4}
+        keys = [genome_key(g) for g in self.population]
+        state.memo.store(1, keys, np.linspace(0.5, 1.5, 12), [1, -1, 0] * 4, "sharpe")
+        state.rng.random()
+        state.np_rng.random(5)
+
+        with tempfile.TemporaryDirectory() as root:
+            checkpointer = Checkpointer(LocalCheckpointStore(root), "BTCUSDT-1m")
+            checkpointer.save(Checkpoint.capture(state, self.population, self.market, 1))
+            restored, how = checkpointer.latest(self.market)
+
+        self.assertEqual(how, "exact")
+        self.assertEqual(restored.generation, 42)
+        self.assertEqual(restored.best_fitness, 1.25)
+        self.assertEqual(restored.best_genome, self.population[3])
+        self.assertEqual(restored.config, state.config)
+        self.assertEqual(restored.genomes(), self.population)
+
+        memo = FitnessMemo()
+        self.assertEqual(restore_memo(memo, restored, 5, state.config), 12)
+        self.assertEqual(memo.entries(5, "sharpe"), state.memo.entries(1, "sharpe"))
+
+        expected = (state.rng.random(), state.np_rng.integers(0, 2**31, 4).tolist())
+        other = session(99)
+        restored.restore_rng(other)
+        self.assertEqual((other.rng.random(), other.np_rng.integers(0, 2**31, 4).tolist()), expected)
+
+    def test_other_data_does_not_match(self):
+        state = session(1)
+        state.generation, state.best_fitness, state.best_genome = 1, -np.inf, None
+        state.config = {"population_size": 12, "num_parents": 6, "fitness": "equity", "folds": 4}
+        blob = Checkpoint.capture(state, self.population, self.market, 1).to_bytes()
+        restored = Checkpoint.from_bytes(blob)
+        self.assertEqual(restored.best_fitness, -np.inf)
+        buffer = KlineBuffer()
+        buffer.replace(self.market.time, np.vstack([self.market.close * 1.01] * len(PRICE_COLUMNS)))
+        with tempfile.TemporaryDirectory() as root:
+            checkpointer = Checkpointer(LocalCheckpointStore(root), "ETHUSDT-1m")
+            checkpointer.save(restored)
+            self.assertEqual(checkpointer.latest(buffer.snapshot(2)), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
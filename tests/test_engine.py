@@ -0,0 +1,83 @@
+# run_event_backtest: the vectorized no-stop path must equal the bar loop, and the
+# default settings must reproduce run_backtest's equity curve.
+import math
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "trading-algo"))
+
+from src import engine  # noqa: E402
+from src.engine import run_event_backtest  # noqa: E402
+
+try:  # backtest.py also imports matplotlib for plot_results
+    from src.backtest import run_backtest
+except ImportError:
+    run_backtest = None
+
+
+def frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * np.exp(rng.normal(0, 0.002, n))
+    df = pd.DataFrame({"Open": open_, "High": np.maximum(open_, close) * 1.01,
+                       "Low": np.minimum(open_, close) * 0.99, "Close": close},
+                      index=pd.date_range("2000-01-01", periods=n, freq="h"))
+    df["position"] = np.repeat(rng.choice([-1.0, 0.0, 1.0, 0.5], n // 20 + 1), 20)[:n]
+    return df
+
+
+def buffers(n):
+    outputs = [np.empty(n), np.empty(n, dtype=np.int64), np.empty(n), np.empty(n)]
+    ledger = [np.zeros(n, dtype=np.int64), np.full(n, -1, dtype=np.int64), np.full(n, np.nan), np.full(n, np.nan),
+              np.zeros(n), np.zeros(n, dtype=np.int64)]
+    return outputs, ledger
+
+
+class EventBacktestTest(unittest.TestCase):
+    def test_vector_path_matches_bar_loop(self):
+        df = frame()
+        n = len(df)
+        open_, close, target = (df[c].to_numpy() for c in ("Open", "Close", "position"))
+        # size, slippage, commission, capital, next_open fills, commission on equity
+        for args in [(1.0, 0.0, 0.0, 1e4, False, False), (1.0, 0.001, 2.0, 1e4, True, False),
+                     (0.5, 0.002, 0.0, 1e4, True, True), (0.7, 0.0, 3.0, 1e4, False, False)]:
+            with self.subTest(args=args):
+                outputs, ledger = buffers(n)
+                rows = engine._vector_path(open_, close, target, *args, *outputs, *ledger)
+                loop_outputs, loop_ledger = (list(a.tolist() for a in group) for group in buffers(n))
+                loop_rows = engine._bar_loop(open_.tolist(), close.tolist(), close.tolist(), close.tolist(),
+                                             target.tolist(), *args, math.nan, math.nan,
+                                             *loop_outputs, *loop_ledger)
+                self.assertEqual(rows, loop_rows)
+                for vector, loop in zip(outputs, loop_outputs):
+                    np.testing.assert_array_equal(vector, np.asarray(loop))
+                for vector, loop in zip(ledger, loop_ledger):
+                    np.testing.assert_array_equal(vector[:rows], np.asarray(loop)[:rows])
+
+    def test_stop_loss_exits(self):
+        df = frame()
+        df["position"] = 1.0
+        result = run_event_backtest(df, stop_loss=0.02)
+        trades = result["trades"]
+        self.assertIn("stop_loss", set(trades["reason"]))
+        stopped = trades[trades["reason"] == "stop_loss"]
+        self.assertTrue((stopped["return"] <= -0.02 + 1e-12).all())
+
+    @unittest.skipIf(run_backtest is None, "run_backtest needs matplotlib")
+    def test_defaults_match_run_backtest(self):
+        df = frame()
+        df["position"] = df["position"].clip(0, 1)
+        for commission in (0.0, 1.0):
+            with self.subTest(commission=commission):
+                expected = run_backtest(df, commission=commission)
+                result = run_event_backtest(df, commission=commission)
+                np.testing.assert_allclose(result["equity"].to_numpy(), expected["equity"].to_numpy(), rtol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# PopulationEvaluator must hand ordinary GA populations to its pool and give the
+# same scores as a serial evaluation.
+import os
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+import executor  # noqa: E402
+from executor import PopulationEvaluator  # noqa: E402
+
+
+def population(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.integers(5, 25, count), rng.integers(30, 80, count), rng.integers(10, 25, count),
+                            rng.integers(20, 40, count), rng.integers(60, 85, count)])
+
+
+def closes(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+class PopulationEvaluatorTest(unittest.TestCase):
+    def test_small_population_reaches_thread_pool(self):
+        params, close = population(20), closes()
+        threads = []
+        original = executor.evaluate_population
+
+        def recording(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return original(*args, **kwargs)
+
+        evaluator = PopulationEvaluator(mode="thread", workers=4)
+        executor.evaluate_population = recording
+        try:
+            chunks = list(evaluator.iter_evaluate(params, close))
+        finally:
+            executor.evaluate_population = original
+            evaluator.close()
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(threads)
+        self.assertTrue(all(thread is not threading.main_thread() for thread in threads))
+
+    def test_pool_matches_serial(self):
+        params, close = population(20), closes()
+        expected = PopulationEvaluator().evaluate(params, close)
+        for mode in ("thread", "process"):
+            with self.subTest(mode=mode):
+                evaluator = PopulationEvaluator(mode=mode, workers=3)
+                try:
+                    fitness, last_position = evaluator.evaluate(params, close)
+                finally:
+                    evaluator.close()
+                np.testing.assert_array_equal(fitness, expected[0])
+                np.testing.assert_array_equal(last_position, expected[1])
+
+    def test_one_worker_stays_serial(self):
+        evaluator = PopulationEvaluator(mode="thread", workers=1)
+        self.assertEqual(len(list(evaluator.iter_evaluate(population(20), closes()))), 1)
+        self.assertIsNone(evaluator._pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# evaluate_population must score every genome exactly as the original per-genome
+# pandas backtest (main.calculate_fitness before batching) did.
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from fitness import evaluate_population, population_matrix  # noqa: E402
+
+
+def reference_fitness(genome, close):
+    """The original calculate_fitness / generate_signals: final equity and last position."""
+    df = pd.DataFrame({"Close": close})
+    if len(df) <= genome["slow_ma"] or genome["fast_ma"] >= genome["slow_ma"]:
+        return -np.inf, 0
+    df["ma_fast"] = df["Close"].rolling(window=genome["fast_ma"]).mean()
+    df["ma_slow"] = df["Close"].rolling(window=genome["slow_ma"]).mean()
+    df["rsi"] = RSIIndicator(close=df["Close"], window=genome["rsi_period"]).rsi()
+    df["signal"] = 0
+    df.loc[(df["ma_fast"] > df["ma_slow"]) & (df["rsi"] < genome["rsi_high"]), "signal"] = 1
+    df.loc[df["ma_fast"] < df["ma_slow"], "signal"] = -1
+    strategy_returns = df["Close"].pct_change() * df["signal"].shift(1)
+    return (1 + strategy_returns.fillna(0)).cumprod().iloc[-1], int(df["signal"].iloc[-1])
+
+
+def genomes(count, seed=0):
+    rng = np.random.default_rng(seed)
+    population = [{"fast_ma": int(rng.integers(5, 25)), "slow_ma": int(rng.integers(30, 80)),
+                   "rsi_period": int(rng.integers(10, 25)), "rsi_low": int(rng.integers(20, 40)),
+                   "rsi_high": int(rng.integers(60, 85))} for _ in range(count)]
+    # a mutated genome with fast >= slow is never traded
+    population.append({"fast_ma": 40, "slow_ma": 30, "rsi_period": 14, "rsi_low": 30, "rsi_high": 70})
+    return population
+
+
+class EvaluatePopulationTest(unittest.TestCase):
+    def test_matches_per_genome_backtest(self):
+        close = 100 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.01, 1500)))
+        close[400:430] = close[400]  # flat stretch: MA ties and RSI without down moves
+        population = genomes(40)
+        fitness, last_position = evaluate_population(population_matrix(population), close, chunk_size=16)
+        for i, genome in enumerate(population):
+            with self.subTest(genome=genome):
+                expected, position = reference_fitness(genome, close)
+                if np.isinf(expected):
+                    self.assertEqual(fitness[i], -np.inf)
+                else:
+                    self.assertAlmostEqual(fitness[i], expected, delta=1e-12 * abs(expected))
+                    self.assertEqual(last_position[i], position)
+
+    def test_short_history_scores_minus_inf(self):
+        population = genomes(5)
+        close = np.linspace(100, 110, 50)
+        fitness, _ = evaluate_population(population_matrix(population), close)
+        expected = [reference_fitness(genome, close)[0] for genome in population]
+        np.testing.assert_array_equal(np.isinf(fitness), np.isinf(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# Carrying survivors forward bar by bar must give exactly the scores of a full
+# re-backtest, through appends, rewrites of the forming bar, evictions from the
+# ring buffer and full replacements.
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from executor import PopulationEvaluator  # noqa: E402
+from fitness import evaluate_population, population_matrix  # noqa: E402
+from incremental import IncrementalEvaluator  # noqa: E402
+from market_data import PRICE_COLUMNS, KlineBuffer, MarketSnapshot  # noqa: E402
+
+
+class IncrementalEvaluatorTest(unittest.TestCase):
+    def test_matches_full_rescore(self):
+        rng = np.random.default_rng(0)
+        close = np.round(60000 * np.exp(np.cumsum(rng.normal(0, 0.001, 1200))), 1)
+
+        def bars(start, stop, last=None):
+            values = np.vstack([close[start:stop]] * len(PRICE_COLUMNS))
+            if last is not None:
+                values[:, -1] = last
+            return np.arange(start, stop, dtype=np.int64) * 60, values
+
+        def genome():
+            return {"fast_ma": int(rng.integers(5, 25)), "slow_ma": int(rng.integers(30, 80)),
+                    "rsi_period": int(rng.integers(10, 25)), "rsi_low": 30, "rsi_high": int(rng.integers(60, 85))}
+
+        buffer = KlineBuffer(capacity=400)
+        end = 350
+        buffer.replace(*bars(0, end))
+        market = MarketSnapshot.empty()
+        incremental = IncrementalEvaluator(PopulationEvaluator())
+        population = [genome() for _ in range(30)]
+        for step in range(120):
+            market = buffer.snapshot(market.version + 1)
+            fitness, position = incremental.evaluate(population, market)
+            expected = evaluate_population(population_matrix(population), market.close)
+            np.testing.assert_array_equal(fitness, expected[0], err_msg=f"step {step}")
+            np.testing.assert_array_equal(position, expected[1], err_msg=f"step {step}")
+
+            parents = [population[i] for i in np.argsort(fitness)[::-1][:10]]
+            incremental.retain(parents, market)
+            population = parents + [genome() for _ in range(20)]
+
+            r = rng.random()
+            if r < 0.5:  # a new bar; the buffer evicts the oldest once it is full
+                end += 1
+                buffer.upsert(*bars(end - 50, end))
+            elif r < 0.8:  # the forming bar is rewritten
+                buffer.upsert(*bars(end - 50, end, last=close[end - 1] + rng.normal()))
+            elif r < 0.95:  # several bars at once
+                end += 3
+                buffer.upsert(*bars(end - 50, end))
+            else:  # the whole window is replaced
+                buffer.replace(*bars(max(end - 350, 0), end))
+        self.assertGreater(incremental.hits, 0)
+        self.assertGreater(end, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+# IndicatorCache keeps its counters per series, so a session's view reports only
+# its own lookups while stats() covers the whole cache.
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from indicators import IndicatorCache  # noqa: E402
+
+
+class IndicatorCacheStatsTest(unittest.TestCase):
+    def test_view_stats_are_per_namespace(self):
+        close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, 300)))
+        cache = IndicatorCache()
+        btc, eth = cache.view("BTC"), cache.view("ETH")
+        btc.table("ma", close, [5, 10], version=1)
+        btc.table("ma", close, [5, 10, 20], version=1)
+        eth.table("rsi", close, [14], version=1)
+
+        self.assertEqual((btc.stats()["hits"], btc.stats()["misses"], btc.stats()["entries"]), (2, 3, 3))
+        self.assertEqual((eth.stats()["hits"], eth.stats()["misses"], eth.stats()["entries"]), (0, 1, 1))
+        self.assertEqual(btc.stats()["bytes"] + eth.stats()["bytes"], cache.stats()["bytes"])
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (2, 4))
+
+        cache.forget("ETH")
+        self.assertEqual((eth.stats()["misses"], eth.stats()["entries"]), (0, 0))
+        self.assertEqual(cache.stats()["misses"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# Islands are scored as one batch that the evaluator's pool splits into tasks;
+# with as many workers as islands each island becomes one task.
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from executor import PopulationEvaluator  # noqa: E402
+from fitness import GENOME_KEYS, population_matrix  # noqa: E402
+from islands import IslandModel, migration_targets  # noqa: E402
+
+
+def model(islands=4, population_size=12, seed=0):
+    rng = np.random.default_rng(seed)
+    create = lambda: dict(zip(GENOME_KEYS, (int(rng.integers(5, 25)), int(rng.integers(30, 80)),
+                                            int(rng.integers(10, 25)), int(rng.integers(20, 40)),
+                                            int(rng.integers(60, 85)))))
+    select = lambda population, scores, count: [population[i] for i in np.argsort(scores)[::-1][:count]]
+    breed = lambda parents, count: [dict(parents[i % len(parents)]) for i in range(count)]
+    return IslandModel(create, select, breed, islands=islands, population_size=population_size, num_parents=6,
+                       migration_interval=1, migrants=1, rng=random.Random(seed))
+
+
+class IslandModelTest(unittest.TestCase):
+    def test_one_pool_task_per_island(self):
+        islands = model()
+        close = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, 600)))
+        params = population_matrix(islands.population)
+        evaluator = PopulationEvaluator(mode="thread", workers=len(islands.islands))
+        try:
+            chunks = sorted((rows.start, rows.stop) for rows, _, _ in evaluator.iter_evaluate(params, close))
+            fitness, _ = evaluator.evaluate(params, close)
+        finally:
+            evaluator.close()
+        self.assertEqual(chunks, [(0, 12), (12, 24), (24, 36), (36, 48)])
+        np.testing.assert_array_equal(fitness, PopulationEvaluator().evaluate(params, close)[0])
+
+    def test_migration_keeps_sizes_and_island_best(self):
+        islands = model()
+        scores = np.arange(len(islands.population), dtype=np.float64)
+        best = [dict(island.population[-1]) for island in islands.islands]
+        islands.evolve(scores, generation=1)
+        self.assertEqual([len(island.population) for island in islands.islands], [12] * 4)
+        for island, genome in zip(islands.islands, best):
+            self.assertIn(genome, island.population)
+
+    def test_targets(self):
+        self.assertEqual(migration_targets("ring", 4, 3), [0])
+        self.assertEqual(migration_targets("fully_connected", 3, 1), [0, 2])
+        self.assertNotIn(2, migration_targets("random", 4, 2, random.Random(0)))
+        self.assertEqual(migration_targets("ring", 1, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
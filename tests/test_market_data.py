@@ -0,0 +1,60 @@
+# The binary kline format must round-trip, compressed or not, and reject
+# malformed or oversized bodies.
+import gzip
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from market_data import (PRICE_COLUMNS, PayloadTooLarge, decode_klines, encode_klines,  # noqa: E402
+                         maybe_gunzip, parse_klines)
+
+
+def bars(n=250, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.arange(n, dtype=np.int64) * 60 + 1_700_000_000
+    return time, rng.random((len(PRICE_COLUMNS), n)) * 100
+
+
+class BinaryKlinesTest(unittest.TestCase):
+    def test_round_trip(self):
+        time, values = bars()
+        for compress in (False, True):
+            for append in (False, True):
+                with self.subTest(compress=compress, append=append):
+                    decoded_time, decoded_values, decoded_append = decode_klines(
+                        encode_klines(time, values, append=append, compress=compress))
+                    np.testing.assert_array_equal(decoded_time, time)
+                    np.testing.assert_array_equal(decoded_values, values)
+                    self.assertEqual(decoded_append, append)
+
+    def test_matches_json_parsing(self):
+        time, values = bars(20)
+        klines = [dict(time=int(t), **{field: float(v) for field, v in zip(("open", "high", "low", "close", "volume"),
+                                                                            values[:, i])})
+                  for i, t in enumerate(time)]
+        parsed_time, parsed_values = parse_klines(klines[::-1])
+        decoded_time, decoded_values, _ = decode_klines(encode_klines(time, values))
+        np.testing.assert_array_equal(parsed_time, decoded_time)
+        np.testing.assert_array_equal(parsed_values, decoded_values)
+
+    def test_rejects_malformed(self):
+        payload = encode_klines(*bars())
+        for bad in (payload[:10], payload[:-8], b"XXXX" + payload[4:], gzip.compress(payload)[:-12]):
+            with self.assertRaises(ValueError):
+                decode_klines(bad)
+
+    def test_decompression_is_bounded(self):
+        self.assertEqual(maybe_gunzip(gzip.compress(b"a" * 100), max_size=100), b"a" * 100)
+        with self.assertRaises(PayloadTooLarge):
+            maybe_gunzip(gzip.compress(b"a" * 101), max_size=100)
+        with self.assertRaises(PayloadTooLarge):
+            maybe_gunzip(b"a" * 101, max_size=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# The streaming kernels in rolling.py must reproduce the batch indicators the GA
+# scores with (indicators.py) bit for bit, or incremental and live signals drift
+# from a full re-backtest.
+import math
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from indicators import rolling_means, rsi  # noqa: E402
+from rolling import RollingMean, WilderRSI  # noqa: E402
+
+
+def closes(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # flat stretches hit pandas' special cases for constant windows and zero down moves
+    close[300:360] = close[300]
+    close[900:905] = close[899]
+    return close
+
+
+def same(a, b):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return a.shape == b.shape and np.array_equal(a.view(np.int64), b.view(np.int64))
+
+
+class RollingParityTest(unittest.TestCase):
+    def test_rolling_mean_matches_batch(self):
+        close = closes()
+        for window in (1, 5, 20, 99):
+            with self.subTest(window=window):
+                state = RollingMean(window)
+                self.assertTrue(same([state.update(x) for x in close], rolling_means(close, [window])[0]))
+
+    def test_rolling_mean_min_periods(self):
+        close = closes()
+        state = RollingMean(50, min_periods=1)
+        expected = pd.Series(close).rolling(50, min_periods=1).mean().to_numpy()
+        self.assertTrue(same([state.update(x) for x in close], expected))
+
+    def test_rsi_matches_batch(self):
+        close = closes()
+        for window in (2, 14, 30):
+            with self.subTest(window=window):
+                state = WilderRSI(window)
+                self.assertTrue(same([state.update(x) for x in close], rsi(close, window)))
+
+    def test_copy_continues_independently(self):
+        close = closes()
+        for state in (RollingMean(20), WilderRSI(14)):
+            with self.subTest(kind=type(state).__name__):
+                for x in close[:1000]:
+                    state.update(x)
+                fork = state.copy()
+                tail = [state.update(x) for x in close[1000:]]
+                self.assertTrue(same([fork.update(x) for x in close[1000:]], tail))
+                self.assertFalse(math.isnan(tail[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+# The session manager refuses sessions past its budget instead of evicting
+# existing ones (and their market data) behind the clients' backs.
+import os
+import sys
+import threading
+import unittest
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from fitness import FitnessMemo  # noqa: E402
+from market_data import KlineBuffer  # noqa: E402
+from sessions import MEMO_ENTRIES, SessionLimitError, SessionManager  # noqa: E402
+
+
+def factory(key, capacity=None):
+    return SimpleNamespace(key=key, running=False, lock=threading.Lock(), klines=KlineBuffer(),
+                           memo=FitnessMemo(MEMO_ENTRIES))
+
+
+class SessionManagerTest(unittest.TestCase):
+    def test_dozens_fit_the_default_budget(self):
+        manager = SessionManager(factory, max_bytes=1024 * 2**20)
+        for i in range(48):
+            manager.get_or_create(f"S{i}-1m")
+        self.assertLessEqual(manager.memory_bytes(), manager.max_bytes)
+
+    def test_full_budget_refuses_without_evicting(self):
+        manager = SessionManager(factory, max_sessions=3, max_bytes=1024 * 2**20)
+        for i in range(3):
+            manager.get_or_create(f"S{i}-1m")
+        with self.assertRaises(SessionLimitError):
+            manager.get_or_create("NEW-1m")
+        self.assertEqual([key for key, _ in manager.sessions()], ["S0-1m", "S1-1m", "S2-1m"])
+        manager.remove("S0-1m")
+        manager.get_or_create("NEW-1m")
+
+
+if __name__ == "__main__":
+    unittest.main()
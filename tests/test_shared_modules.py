@@ -0,0 +1,25 @@
+# Modules that exist in both the Cloud Function (backend/functions) and trading-algo.
+# The function is deployed on its own, so it carries copies; these tests keep them
+# from drifting apart.
+import os
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (trading-algo path, backend path) of files that must be byte-for-byte identical
+COPIES = [
+    ("trading-algo/src/analytics.py", "backend/functions/analytics.py"),
+    ("trading-algo/src/rolling.py", "backend/functions/rolling.py"),
+]
+
+
+class SharedModulesTest(unittest.TestCase):
+    def test_copies_are_identical(self):
+        for source, copy in COPIES:
+            with self.subTest(copy=copy):
+                with open(os.path.join(ROOT, source), "rb") as a, open(os.path.join(ROOT, copy), "rb") as b:
+                    self.assertEqual(a.read(), b.read(), f"{copy} differs from {source}; copy it over again")
+
+
+if __name__ == "__main__":
+    unittest.main()
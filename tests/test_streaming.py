@@ -0,0 +1,66 @@
+# Streaming signals must agree with their batch counterparts: StreamingStrategy
+# with strategy.generate_signals, and the backend's LiveSignal with the last
+# position evaluate_population reports.
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "trading-algo"))
+sys.path.insert(0, os.path.join(ROOT, "backend", "functions"))
+
+from fitness import evaluate_population, population_matrix  # noqa: E402
+from live import LiveSignal  # noqa: E402
+from market_data import KlineBuffer  # noqa: E402
+from src.strategy import generate_signals  # noqa: E402
+from src.streaming import StreamingStrategy  # noqa: E402
+
+
+class StreamingStrategyTest(unittest.TestCase):
+    def test_matches_generate_signals(self):
+        rng = np.random.default_rng(5)
+        close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 2000))), 2)
+        close[500:520] = close[500]
+        df = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0},
+                          index=pd.bdate_range("2010-01-01", periods=len(close)))
+        for fast, slow, rsi_high, rsi_period in [(20, 50, 70, 14), (5, 30, 60, 10), (3, 7, 80, 21)]:
+            with self.subTest(fast=fast, slow=slow, rsi_high=rsi_high, rsi_period=rsi_period):
+                expected = generate_signals(df, fast=fast, slow=slow, rsi_high=rsi_high, rsi_period=rsi_period)
+                strategy = StreamingStrategy(fast, slow, rsi_high, rsi_period)
+                signals, positions = [], []
+                for value in close:
+                    signals.append(strategy.update(value))
+                    positions.append(strategy.position)
+                np.testing.assert_array_equal(signals, expected["signal"].to_numpy())
+                np.testing.assert_array_equal(positions, expected["position"].to_numpy())
+
+    def test_live_signal_matches_last_position(self):
+        rng = np.random.default_rng(1)
+        close = np.round(60000 * np.exp(np.cumsum(rng.normal(0, 0.001, 800))), 1)
+        genomes = [{"fast_ma": int(rng.integers(5, 25)), "slow_ma": int(rng.integers(30, 80)),
+                    "rsi_period": int(rng.integers(10, 25)), "rsi_low": 30, "rsi_high": int(rng.integers(60, 85))}
+                   for _ in range(5)]
+        live = [LiveSignal(genome) for genome in genomes]
+        params = population_matrix(genomes)
+        buffer = KlineBuffer(capacity=2000)
+        version, i = 0, 0
+        while i < len(close):
+            k = min(int(rng.integers(1, 4)), len(close) - i)
+            times = np.arange(i, i + k, dtype=np.int64) * 60
+            values = np.vstack([close[i:i + k]] * 4 + [np.ones(k)])
+            if i and rng.random() < 0.3:  # the forming bar is revised along with the new ones
+                times = np.concatenate([[times[0] - 60], times])
+                values = np.hstack([np.array([[close[i - 1] * 1.001]] * 4 + [[1.0]]), values])
+            buffer.upsert(times, values)
+            version += 1
+            i += k
+            market = buffer.snapshot(version)
+            expected = evaluate_population(params, market.close)[1]
+            self.assertEqual([signal.update(market) for signal in live], expected.tolist(), f"bar {i}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# run_sweep must report, for every combination, the metrics and trade count that
+# generate_signals + run_backtest give for the same parameters.
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "trading-algo"))
+
+from src.strategy import generate_signals  # noqa: E402
+from src.sweep import run_sweep  # noqa: E402
+
+try:  # backtest.py also imports matplotlib for plot_results
+    from src.backtest import run_backtest
+except ImportError:
+    run_backtest = None
+
+
+def prices(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({"Open": close * (1 + rng.normal(0, 0.001, n)), "High": close, "Low": close,
+                         "Close": close, "Volume": 1.0}, index=pd.bdate_range("2015-01-01", periods=n))
+
+
+@unittest.skipIf(run_backtest is None, "run_backtest needs matplotlib")
+class SweepTest(unittest.TestCase):
+    def test_matches_run_backtest(self):
+        df = prices()
+        results = run_sweep(df, fast=[5, 10, 20], slow=[30, 60], rsi_period=[7, 14], rsi_high=[65, 80],
+                            commission=1.0)
+        self.assertEqual(len(results), 3 * 2 * 2 * 2)
+        for _, row in results.iterrows():
+            with self.subTest(fast=row.fast, slow=row.slow, rsi_period=row.rsi_period, rsi_high=row.rsi_high):
+                signals = generate_signals(df, fast=int(row.fast), slow=int(row.slow), rsi_high=row.rsi_high,
+                                           rsi_period=int(row.rsi_period))
+                backtest = run_backtest(signals, commission=1.0)
+                for metric, value in backtest["perf"].items():
+                    self.assertTrue(np.isclose(row[metric], value, rtol=1e-9, atol=1e-12, equal_nan=True), metric)
+                self.assertEqual(row.trades, len(backtest["trades"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+# examples/run_sweep.py
+import argparse
+
+from src.data import fetch_history
+from src.sweep import run_sweep
+
+
+def grid(text):
+    """Parameter grid from "start:stop:step" (a Python range) or a comma-separated list."""
+    try:
+        if ":" in text:
+            return range(*(int(part) for part in text.split(":")))
+        return [int(part) for part in text.split(",") if part]
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f"expected start:stop:step or a comma-separated list, got {text!r}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep the MA crossover + RSI strategy over a parameter grid.")
+    parser.add_argument("--ticker", default="AAPL")
+    parser.add_argument("--start", default="2018-01-01")
+    parser.add_argument("--end", default="2024-12-31")
+    parser.add_argument("--fast", type=grid, default="5:55:5", help="fast MA windows (default: 5:55:5)")
+    parser.add_argument("--slow", type=grid, default="20:210:10", help="slow MA windows (default: 20:210:10)")
+    parser.add_argument("--rsi-period", type=grid, default="7,14,21", help="RSI periods (default: 7,14,21)")
+    parser.add_argument("--rsi-high", type=grid, default="60,70,80", help="RSI overbought levels (default: 60,70,80)")
+    parser.add_argument("--top", type=int, default=10, help="number of results to print")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    df = fetch_history(args.ticker, start=args.start, end=args.end, interval="1d")
+
+    results = run_sweep(df,
+                        fast=args.fast,
+                        slow=args.slow,
+                        rsi_period=args.rsi_period,
+                        rsi_high=args.rsi_high,
+                        initial_capital=10000,
+                        position_size=1.0,
+                        commission=1.0,  # $1 per trade
+                        freq_per_year=252)
+
+    print(f"Evaluated {len(results)} parameter combinations")
+    print(f"\nTop {args.top} by Sharpe:")
+    print(results.sort_values("sharpe", ascending=False).head(args.top).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
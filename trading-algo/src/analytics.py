@@ -0,0 +1,222 @@
+# src/analytics.py
+# Batched performance analytics for equity curves.
+# backend/functions/analytics.py is a copy of this file (the Cloud Function is deployed
+# on its own); tests/test_shared_modules.py fails when the two differ.
+from typing import Dict, Union
+
+import numpy as np
+
+METRICS = ("total_return", "cagr", "annual_vol", "sharpe", "sortino", "calmar",
+           "max_drawdown", "max_drawdown_duration", "turnover", "win_rate")
+ROLLING_METRICS = ("total_return", "annual_vol", "sharpe", "sortino", "max_drawdown", "win_rate")
+# Rolling max drawdown materializes (rows, runs, window) blocks of about this size
+CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def _as_time_major(values, axis: int) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return values[:, None]
+    return values if axis == 0 else values.T
+
+
+def _out(result: Dict[str, np.ndarray], squeeze: bool, axis: int) -> Dict[str, np.ndarray]:
+    if squeeze:
+        return {k: v[..., 0] if v.ndim > 1 else v[0] for k, v in result.items()}
+    if axis != 0:
+        return {k: v.T if v.ndim > 1 else v for k, v in result.items()}
+    return result
+
+
+def bar_returns(equity: np.ndarray) -> np.ndarray:
+    """
+    Bar-to-bar returns of time-major equity curves, like pct_change().fillna(0) on each
+    column's own history: the first valid bar gets 0, missing bars NaN, and a return
+    after a gap spans the gap.
+    """
+    valid = ~np.isnan(equity)
+    if valid.all():
+        returns = np.zeros_like(equity)
+        np.divide(equity[1:], equity[:-1], out=returns[1:])
+        returns[1:] -= 1
+        return returns
+    # carry the last value across gaps
+    rows = np.where(valid, np.arange(len(equity))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = np.take_along_axis(equity, rows, axis=0)
+    returns = np.full_like(equity, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = filled[1:] / filled[:-1] - 1
+    first = valid & ~(np.cumsum(valid, axis=0) > 1)
+    returns[first] = 0.0
+    returns[~valid] = np.nan
+    return returns
+
+
+def performance(equity,
+                years: Union[float, np.ndarray, None] = None,
+                freq_per_year: int = 252,
+                positions=None,
+                axis: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Performance metrics of many equity curves in one pass.
+    equity: (time, runs) matrix (or (runs, time) with axis=1, or a single 1-D curve);
+      NaN marks bars outside a run's history.
+    years: length of each run in years (scalar or per run); defaults to bars / freq_per_year.
+    positions: optional matrix of the same shape, needed for turnover.
+    Returns a dict of arrays with one value per run (scalars for a 1-D curve):
+      total_return, cagr, annual_vol, sharpe (annualized mean/std of bar returns, rf=0),
+      sortino (mean over downside deviation), calmar (cagr / |max_drawdown|; both inf
+      when annualized growth overflows),
+      max_drawdown (most negative drop from a running peak), max_drawdown_duration
+      (longest stretch of bars below a previous peak), turnover (position changes per
+      year, counting the initial entry) and win_rate (share of non-zero returns > 0).
+    """
+    squeeze = np.ndim(equity) == 1
+    values = _as_time_major(equity, axis)
+    n, k = values.shape
+    missing = np.isnan(values)
+    # Ragged histories need masking everywhere; full matrices (sweeps) skip it
+    dense = not missing.any()
+    valid = None if dense else ~missing
+    counts = np.full(k, n) if dense else valid.sum(axis=0)
+    has_data = counts > 0
+    cols = np.arange(k)
+    first = np.zeros(k, dtype=np.int64) if dense else np.argmax(valid, axis=0)
+    last = np.full(k, n - 1) if dense else n - 1 - np.argmax(valid[::-1], axis=0)
+    start = np.where(has_data, values[first, cols], np.nan)
+    end = np.where(has_data, values[last, cols], np.nan)
+    if years is None:
+        years = np.maximum(counts - 1, 1) / freq_per_year
+    years = np.broadcast_to(np.asarray(years, dtype=np.float64), (k,))
+
+    r = bar_returns(values)
+    if not dense:
+        r[missing] = 0.0
+    root = freq_per_year ** 0.5
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        growth = end / start
+        # Annualizing a few minute bars raises growth to a huge power; a gain that
+        # overflows float64 is reported as inf (and so is its calmar)
+        cagr = growth ** (1 / years) - 1.0
+        mean = r.sum(axis=0) / counts
+        dev = r - mean
+        if not dense:
+            dev[missing] = 0.0
+        std = np.sqrt(np.einsum("ij,ij->j", dev, dev) / (counts - 1))
+        np.minimum(r, 0, out=dev)
+        downside = np.sqrt(np.einsum("ij,ij->j", dev, dev) / counts)
+        ann_vol = np.where(counts > 1, std * root, np.nan)
+        sharpe = np.where((counts > 1) & (std != 0), mean / std * root, np.nan)
+        sortino = np.where((counts > 1) & (downside != 0), mean / downside * root, np.nan)
+
+        # drawdown from the running peak; missing bars are NaN and skipped
+        peak = np.fmax.accumulate(values, axis=0, out=dev)
+        at_peak = values >= peak
+        drawdown = np.divide(values, peak, out=peak)
+        drawdown -= 1.0
+        max_dd = np.where(has_data, np.fmin.reduce(drawdown, axis=0), np.nan)
+        calmar = np.where(max_dd < 0, cagr / np.abs(max_dd), np.nan)
+
+    # longest run of bars below the running peak: the widest gap between consecutive
+    # peak bars (or from the last peak to the end of the history), per run
+    col, row = np.nonzero(at_peak.T)
+    duration = np.full(k, np.nan)
+    if len(row):
+        last_in_col = np.append(col[1:] != col[:-1], True)
+        following = np.empty_like(row)
+        following[:-1] = row[1:]
+        following[last_in_col] = last[col[last_in_col]] + 1
+        starts = np.flatnonzero(np.insert(last_in_col[:-1], 0, True))
+        duration[col[starts]] = np.maximum.reduceat(following - row - 1, starts)
+
+    wins = np.count_nonzero(r > 0, axis=0)
+    nonzero = np.count_nonzero(r, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(nonzero > 0, wins / nonzero, np.nan)
+
+    turnover = np.full(k, np.nan)
+    if positions is not None:
+        pos = _as_time_major(positions, axis)
+        if not dense:
+            pos = np.where(missing, 0.0, pos)
+        # the first bar's position counts as a change from flat
+        step = dev
+        step[0] = pos[0]
+        np.subtract(pos[1:], pos[:-1], out=step[1:])
+        changes = np.abs(step, out=step).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            turnover = np.where(has_data, changes / years, np.nan)
+
+    return _out({
+        "total_return": growth - 1.0,
+        "cagr": cagr,
+        "annual_vol": ann_vol,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "calmar": calmar,
+        "max_drawdown": max_dd,
+        "max_drawdown_duration": duration,
+        "turnover": turnover,
+        "win_rate": win_rate,
+    }, squeeze, axis)
+
+
+def rolling_performance(equity, window: int, freq_per_year: int = 252, axis: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Trailing-window versions of the metrics, same shape as `equity`: the value at bar t
+    covers the `window` bar returns ending at t (the first bar's return counting as 0).
+    Windows that are not full yet or contain missing bars are NaN.
+    Keys: total_return, annual_vol, sharpe, sortino, max_drawdown, win_rate.
+    """
+    squeeze = np.ndim(equity) == 1
+    values = _as_time_major(equity, axis)
+    n, k = values.shape
+    result = {name: np.full((n, k), np.nan) for name in ROLLING_METRICS}
+    if window < 1 or window > n:
+        return _out(result, squeeze, axis)
+
+    returns = bar_returns(values)
+    missing = np.isnan(returns)
+    r = np.where(missing, 0.0, returns)
+
+    def window_sum(x):
+        total = np.cumsum(x, axis=0, dtype=np.float64)
+        out = total[window - 1:].copy()
+        out[1:] -= total[:-window]
+        return out
+
+    complete = window_sum(missing) == 0
+    s1 = window_sum(r)
+    s2 = window_sum(r * r)
+    neg2 = window_sum(np.minimum(r, 0) ** 2)
+    wins = window_sum(r > 0)
+    nonzero = window_sum(r != 0)
+    root = freq_per_year ** 0.5
+    rows = slice(window - 1, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / window
+        var = np.maximum(s2 - window * mean * mean, 0) / (window - 1) if window > 1 else np.full_like(s1, np.nan)
+        std = np.sqrt(var)
+        downside = np.sqrt(neg2 / window)
+        # equity at the bar before each window (the first bar stands in for bar -1)
+        base = np.concatenate([values[:1], values[:n - window]])
+        result["total_return"][rows] = values[window - 1:] / base - 1
+        result["annual_vol"][rows] = std * root
+        result["sharpe"][rows] = np.where(std != 0, mean / std * root, np.nan)
+        result["sortino"][rows] = np.where(downside != 0, mean / downside * root, np.nan)
+        result["win_rate"][rows] = np.where(nonzero > 0, wins / nonzero, np.nan)
+
+    # max drawdown inside each window, over the equity points the window's returns span
+    padded = np.concatenate([values[:1], values])
+    step = max(1, int(CHUNK_BYTES // (8 * k * (window + 1))))
+    for lo in range(0, n - window + 1, step):
+        hi = min(lo + step, n - window + 1)
+        block = np.lib.stride_tricks.sliding_window_view(padded[lo:hi + window], window + 1, axis=0)
+        peaks = np.maximum.accumulate(block, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["max_drawdown"][window - 1 + lo:window - 1 + hi] = ((block - peaks) / peaks).min(axis=-1)
+
+    for name in ROLLING_METRICS:
+        result[name][rows][~complete] = np.nan
+    return _out(result, squeeze, axis)
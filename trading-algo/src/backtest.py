@@ -50,7 +50,7 @@ def run_backtest(df: pd.DataFrame,
     # equity curve
     equity = (1 + df["net_ret"]).cumprod() * initial_capital
 
-    perf = compute_perf(equity, freq_per_year=freq_per_year)
+    perf = compute_perf(equity, freq_per_year=freq_per_year, positions=df["exposure"])
 
     trades = df.loc[trade_idx, ["trade", "entry_price", "exit_price", "Open", "Close"]].copy()
     return {
@@ -1,16 +1,250 @@
 # src/data.py
-import yfinance as yf
+import json
+import os
+import shutil
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import Dict, Iterable, Optional, Union
 
-def fetch_history(ticker: str, start: str, end: Optional[str]=None, interval: str="1d") -> pd.DataFrame:
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DATA_DIR_ENV = "TRADING_ALGO_DATA_DIR"
+
+
+class DataSource:
+    """
+    Provider of OHLCV bars. fetch() returns a DataFrame indexed by timestamp with
+    columns Open, High, Low, Close, Volume covering [start, end).
+    """
+    def fetch(self, ticker: str, start: str, end: Optional[str]=None, interval: str="1d") -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceSource(DataSource):
+    """Download bars with yfinance (imported on first use)."""
+    def fetch(self, ticker: str, start: str, end: Optional[str]=None, interval: str="1d") -> pd.DataFrame:
+        import yfinance as yf
+        df = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+        return normalize_ohlcv(df)
+
+
+class CSVSource(DataSource):
     """
-    Fetch OHLCV data using yfinance. Returns DataFrame with columns: Open, High, Low, Close, Volume
+    Read bars from local CSV files, e.g. test fixtures or exported data.
+    Looks for <directory>/<ticker>_<interval>.csv, then <directory>/<ticker>.csv;
+    the first column is the timestamp.
     """
-    df = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, ticker: str, start: str, end: Optional[str]=None, interval: str="1d") -> pd.DataFrame:
+        for name in (f"{ticker}_{interval}.csv", f"{ticker}.csv"):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                break
+        else:
+            raise FileNotFoundError(f"no CSV for {ticker} ({interval}) in {self.directory}")
+        df = normalize_ohlcv(pd.read_csv(path, index_col=0, parse_dates=True))
+        return df.loc[_index_mask(df.index, start, end)]
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Bring provider output to plain OHLCV columns, sorted by time without duplicate bars."""
+    if isinstance(df.columns, pd.MultiIndex):
+        # Newer yfinance versions return (field, ticker) columns even for one ticker
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
     # Some tickers return 'Adj Close' — keep Close as adjusted if present
     if "Adj Close" in df.columns:
+        df = df.copy()
         df["Close"] = df["Adj Close"]
         df = df.drop(columns=["Adj Close"])
-    df = df.dropna()
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].astype(float).dropna()
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df.index.name = "Date"
     return df
+
+
+class LocalStore:
+    """
+    On-disk OHLCV store with one directory per ticker/interval:
+        <root>/<ticker>/<interval>/index.npy, Open.npy, ..., Volume.npy, meta.json
+    Columns are plain .npy files loaded with mmap, so a cold start only maps the files
+    instead of parsing or downloading anything. meta.json records the date range already
+    requested from the source; fetch() only asks the source for what is missing.
+    """
+    def __init__(self, root: str, source: Optional[DataSource]=None):
+        self.root = root
+        self.source = source if source is not None else YFinanceSource()
+
+    def path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, ticker.replace(os.sep, "_"), interval)
+
+    def meta(self, ticker: str, interval: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.path(ticker, interval), "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load_arrays(self, ticker: str, interval: str="1d",
+                    start: Optional[str]=None, end: Optional[str]=None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Memory-mapped column arrays (index as int64 nanoseconds) sliced to [start, end),
+        without copying. Returns None if nothing is stored yet.
+        """
+        meta = self.meta(ticker, interval)
+        if meta is None:
+            return None
+        path = self.path(ticker, interval)
+        index = np.load(os.path.join(path, "index.npy"), mmap_mode="r")
+        lo = np.searchsorted(index, _as_int(start, meta["tz"]), side="left") if start is not None else 0
+        hi = np.searchsorted(index, _as_int(end, meta["tz"]), side="left") if end is not None else len(index)
+        arrays = {"index": index[lo:hi]}
+        for col in meta["columns"]:
+            arrays[col] = np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r")[lo:hi]
+        return arrays
+
+    def load(self, ticker: str, interval: str="1d",
+             start: Optional[str]=None, end: Optional[str]=None) -> Optional[pd.DataFrame]:
+        """Stored bars in [start, end) as a DataFrame, or None if nothing is stored yet."""
+        arrays = self.load_arrays(ticker, interval, start, end)
+        if arrays is None:
+            return None
+        tz = self.meta(ticker, interval)["tz"]
+        index = pd.DatetimeIndex(np.asarray(arrays.pop("index")).view("datetime64[ns]"), name="Date")
+        if tz:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame({col: np.asarray(values) for col, values in arrays.items()}, index=index)
+
+    def fetch(self, ticker: str, start: str, end: Optional[str]=None, interval: str="1d") -> pd.DataFrame:
+        """
+        Bars in [start, end), topping up the store from the source first if the
+        requested range is not fully covered. With end=None the store is extended
+        up to now, re-fetching the last stored day so a still-forming bar is refreshed.
+        """
+        meta = self.meta(ticker, interval)
+        start_ts = pd.Timestamp(start)
+        end_ts = pd.Timestamp(end) if end is not None else None
+        if meta is None:
+            gaps = [(start_ts, end_ts)]
+            lo, hi = start_ts, end_ts
+        else:
+            lo, hi = pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"])
+            gaps = []
+            if start_ts < lo:
+                gaps.append((start_ts, lo))
+            if end_ts is None:
+                last = self._last_day(ticker, interval)
+                gaps.append((min(hi, last) if last is not None else hi, None))
+            elif end_ts > hi:
+                gaps.append((hi, end_ts))
+            lo = min(lo, start_ts)
+            hi = max(hi, end_ts) if end_ts is not None else hi
+
+        if gaps:
+            frames = [self.source.fetch(ticker, _fmt(a), _fmt(b) if b is not None else None, interval)
+                      for a, b in gaps]
+            if end_ts is None:
+                today = pd.Timestamp.now().normalize()
+                hi = max(hi, today) if hi is not None else today
+            self._merge(ticker, interval, frames, lo, hi)
+        df = self.load(ticker, interval, start, end)
+        return df if df is not None else pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    def _last_day(self, ticker: str, interval: str) -> Optional[pd.Timestamp]:
+        arrays = self.load_arrays(ticker, interval)
+        if arrays is None or len(arrays["index"]) == 0:
+            return None
+        last = pd.Timestamp(int(arrays["index"][-1]))
+        tz = self.meta(ticker, interval)["tz"]
+        if tz:
+            last = last.tz_localize("UTC").tz_convert(tz).tz_localize(None)
+        return last.normalize()
+
+    def _merge(self, ticker: str, interval: str, frames, start: pd.Timestamp, end: pd.Timestamp):
+        """Combine stored and new bars (new bars win) and rewrite the column files."""
+        old = self.load(ticker, interval)
+        frames = [f for f in ([old] if old is not None else []) + frames if f is not None and len(f)]
+        df = normalize_ohlcv(pd.concat(frames)) if frames else pd.DataFrame(columns=OHLCV_COLUMNS, dtype=float)
+
+        tz = None
+        index = df.index
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            tz = str(index.tz)
+            index = index.tz_convert("UTC").tz_localize(None)
+        index = pd.DatetimeIndex(index).as_unit("ns") if len(index) else pd.DatetimeIndex([], dtype="datetime64[ns]")
+
+        path = self.path(ticker, interval)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "index.npy"), index.asi8)
+        columns = [c for c in OHLCV_COLUMNS if c in df.columns]
+        for col in columns:
+            np.save(os.path.join(tmp, f"{col}.npy"), df[col].to_numpy(dtype=np.float64))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"start": _fmt(start), "end": _fmt(end), "tz": tz, "columns": columns}, f)
+
+        # Swap the directory in whole so readers never see a half-written store
+        backup = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, backup)
+        os.replace(tmp, path)
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+def fetch_history(ticker: str, start: str, end: Optional[str]=None, interval: str="1d",
+                  source: Optional[DataSource]=None,
+                  store: Union[LocalStore, str, None]=None) -> pd.DataFrame:
+    """
+    Fetch OHLCV data. Returns DataFrame with columns: Open, High, Low, Close, Volume
+      - source: where bars come from (default: yfinance)
+      - store: LocalStore or directory to cache bars in; defaults to $TRADING_ALGO_DATA_DIR
+        if set, otherwise every call goes straight to the source. A LocalStore instance
+        fetches from its own source.
+    """
+    if store is None and os.environ.get(DATA_DIR_ENV):
+        store = os.environ[DATA_DIR_ENV]
+    if isinstance(store, str):
+        store = LocalStore(store, source)
+    if store is None:
+        return (source or YFinanceSource()).fetch(ticker, start, end, interval)
+    return store.fetch(ticker, start, end, interval)
+
+
+def fetch_histories(tickers: Iterable[str], start: str, end: Optional[str]=None, interval: str="1d",
+                    source: Optional[DataSource]=None,
+                    store: Union[LocalStore, str, None]=None) -> Dict[str, pd.DataFrame]:
+    """fetch_history for several tickers, sharing one store."""
+    if store is None and os.environ.get(DATA_DIR_ENV):
+        store = os.environ[DATA_DIR_ENV]
+    if isinstance(store, str):
+        store = LocalStore(store, source)
+    return {t: fetch_history(t, start, end, interval, source=source, store=store) for t in tickers}
+
+
+def _fmt(ts: pd.Timestamp) -> str:
+    ts = pd.Timestamp(ts)
+    return ts.strftime("%Y-%m-%d") if ts == ts.normalize() else ts.isoformat()
+
+
+def _as_int(value, tz: Optional[str]) -> int:
+    """Timestamp as int64 nanoseconds in the store's (UTC) representation."""
+    ts = pd.Timestamp(value)
+    if tz:
+        ts = (ts.tz_localize(tz) if ts.tz is None else ts).tz_convert("UTC").tz_localize(None)
+    elif ts.tz is not None:
+        ts = ts.tz_localize(None)
+    return ts.as_unit("ns").value
+
+
+def _index_mask(index: pd.DatetimeIndex, start: Optional[str], end: Optional[str]) -> np.ndarray:
+    mask = np.ones(len(index), dtype=bool)
+    tz = index.tz if isinstance(index, pd.DatetimeIndex) else None
+    if start is not None:
+        ts = pd.Timestamp(start)
+        mask &= index >= (ts.tz_localize(tz) if tz is not None and ts.tz is None else ts)
+    if end is not None:
+        ts = pd.Timestamp(end)
+        mask &= index < (ts.tz_localize(tz) if tz is not None and ts.tz is None else ts)
+    return mask
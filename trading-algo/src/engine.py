@@ -0,0 +1,261 @@
+# src/engine.py
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from .utils import compute_perf
+
+try:  # optional: compile the bar loop when numba is installed
+    from numba import njit
+except ImportError:
+    njit = None
+
+FILL_MODES = ("close", "next_open")
+COMMISSION_MODES = ("initial", "equity")
+EXIT_REASONS = ("signal", "stop_loss", "take_profit", "open")
+
+
+def _bar_loop(open_, high, low, close, target, size, slippage, commission, initial_capital,
+              fill_next_open, commission_on_equity, stop_loss, take_profit,
+              held_out, trades_out, ret_out, equity_out,
+              entry_i, exit_i, entry_px, exit_px, side, reason):
+    """
+    Path-dependent backtest over bars. Works on numpy arrays (compiled with numba)
+    or on plain lists (pure Python); outputs are written into the *_out/ledger buffers.
+    Returns the number of ledger rows.
+    """
+    n = len(close)
+    held = 0.0
+    growth = 1.0
+    equity = initial_capital
+    entry_price = math.nan
+    stopped_target = math.nan  # after a stop, stay flat until the target position changes
+    k = -1  # index of the open trade in the ledger, -1 if flat
+    rows = 0
+    for t in range(n):
+        want = target[t]
+        if stopped_target == stopped_target:
+            if want == stopped_target:
+                want = 0.0
+            else:
+                stopped_target = math.nan
+        prev_close = close[t - 1] if t > 0 else close[0]
+        ref = open_[t] if fill_next_open else prev_close
+        ret = 0.0
+        trades = 0
+        base = prev_close
+
+        if want != held:
+            trades += 1
+            if held != 0.0:
+                px = ref * (1 - slippage * (1.0 if held > 0 else -1.0))
+                ret += held * size * (px / prev_close - 1)
+                exit_i[k] = t
+                exit_px[k] = px
+                reason[k] = 0
+                k = -1
+            if want != 0.0:
+                entry_price = ref * (1 + slippage * (1.0 if want > 0 else -1.0))
+                base = entry_price
+                k = rows
+                rows += 1
+                entry_i[k] = t
+                entry_px[k] = entry_price
+                side[k] = want
+            held = want
+
+        if held != 0.0:
+            long = held > 0
+            stop_px = math.nan
+            code = 0
+            if stop_loss == stop_loss:
+                level = entry_price * (1 - stop_loss) if long else entry_price * (1 + stop_loss)
+                if (long and low[t] <= level) or (not long and high[t] >= level):
+                    stop_px = min(open_[t], level) if long else max(open_[t], level)
+                    code = 1
+            if code == 0 and take_profit == take_profit:
+                level = entry_price * (1 + take_profit) if long else entry_price * (1 - take_profit)
+                if (long and high[t] >= level) or (not long and low[t] <= level):
+                    stop_px = max(open_[t], level) if long else min(open_[t], level)
+                    code = 2
+            if code != 0:
+                px = stop_px * (1 - slippage * (1.0 if long else -1.0))
+                ret += held * size * (px / base - 1)
+                trades += 1
+                exit_i[k] = t
+                exit_px[k] = px
+                reason[k] = code
+                k = -1
+                stopped_target = target[t]
+                held = 0.0
+            else:
+                ret += held * size * (close[t] / base - 1)
+
+        if commission_on_equity:
+            equity = equity * (1 + ret) - commission * trades
+        else:
+            net = ret - commission / initial_capital * trades if trades else ret
+            growth = growth * (1 + net)
+            equity = growth * initial_capital
+            ret = net
+        held_out[t] = held
+        trades_out[t] = trades
+        ret_out[t] = ret
+        equity_out[t] = equity
+
+    if k >= 0:
+        reason[k] = 3
+    return rows
+
+
+if njit is not None:
+    _bar_loop = njit(cache=True)(_bar_loop)
+
+
+def _vector_path(open_, close, target, size, slippage, commission, initial_capital,
+                 fill_next_open, commission_on_equity,
+                 held_out, trades_out, ret_out, equity_out,
+                 entry_i, exit_i, entry_px, exit_px, side, reason):
+    """
+    _bar_loop without stops, where the held position is just the target. Without
+    stops nothing depends on the path except the equity, so this is done with array
+    operations in the same floating point order, giving identical results. Only
+    valid when equity does not compound a per-trade charge (initial commission, or
+    none). Same buffers and return value as _bar_loop.
+    """
+    n = len(close)
+    held = target
+    before = np.concatenate(([0.0], held[:-1]))
+    prev_close = np.concatenate((close[:1], close[:-1]))
+    ref = open_ if fill_next_open else prev_close
+    change = held != before
+
+    ret = np.zeros(n)
+    exiting = change & (before != 0)
+    exit_side = np.where(before > 0, 1.0, -1.0)
+    exit_fill = ref * (1 - slippage * exit_side)
+    ret[exiting] += (before * size)[exiting] * (exit_fill / prev_close - 1)[exiting]
+    entering = change & (held != 0)
+    entry_fill = ref * (1 + slippage * np.where(held > 0, 1.0, -1.0))
+    base = np.where(entering, entry_fill, prev_close)
+    holding = held != 0
+    ret[holding] += (held * size)[holding] * (close / base - 1)[holding]
+    trades = change.astype(np.int64)
+
+    if commission_on_equity:
+        # no commission here: equity * (1 + ret), bar after bar
+        equity = np.cumprod(np.concatenate(([initial_capital], 1 + ret)))[1:]
+    else:
+        ret = np.where(change, ret - commission / initial_capital * trades, ret)
+        equity = np.cumprod(1 + ret) * initial_capital
+    held_out[:] = held
+    trades_out[:] = trades
+    ret_out[:] = ret
+    equity_out[:] = equity
+
+    # every change after an entry closes that trade
+    entries = np.flatnonzero(entering)
+    rows = len(entries)
+    if rows:
+        changes = np.flatnonzero(change)
+        following = np.searchsorted(changes, entries, side="right")
+        closed = following < len(changes)
+        exits = changes[np.minimum(following, len(changes) - 1)]
+        entry_i[:rows] = entries
+        entry_px[:rows] = entry_fill[entries]
+        side[:rows] = held[entries]
+        exit_i[:rows] = np.where(closed, exits, -1)
+        exit_px[:rows] = np.where(closed, exit_fill[exits], np.nan)
+        reason[:rows] = np.where(closed, 0, 3)
+    return rows
+
+
+def run_event_backtest(df: pd.DataFrame,
+                       initial_capital: float = 10000,
+                       position_size: float = 1.0,
+                       slippage: float = 0.0,
+                       commission: float = 0.0,
+                       fill: str = "close",
+                       commission_on: str = "initial",
+                       stop_loss: Optional[float] = None,
+                       take_profit: Optional[float] = None,
+                       freq_per_year: int = 252) -> Dict:
+    """
+    Bar-by-bar backtest for path-dependent rules:
+      - df must contain columns: Open, Close, position (desired position at bar open);
+        High and Low are needed for stop_loss / take_profit
+      - fill: "close" holds the position from the previous close (as run_backtest does);
+        "next_open" fills position changes at this bar's Open
+      - slippage: proportion of price moved against you on every fill
+      - commission: flat cost per trade; "initial" charges commission / initial_capital
+        as a return (as run_backtest does), "equity" deducts it from current equity
+      - stop_loss / take_profit: fractions of the entry price; hit intrabar on Low/High,
+        filled at the level or at the Open if the bar gaps through it (stop checked first).
+        After an exit the position stays flat until the desired position changes.
+    With fill="close", commission_on="initial", no slippage and no stops, the equity
+    curve is identical to run_backtest.
+    Returns:
+      dict with df (per-bar held position, trades, returns, equity), equity series,
+      performance stats and the trade ledger
+    """
+    if fill not in FILL_MODES:
+        raise ValueError(f"fill must be one of {FILL_MODES}")
+    if commission_on not in COMMISSION_MODES:
+        raise ValueError(f"commission_on must be one of {COMMISSION_MODES}")
+    use_stops = stop_loss is not None or take_profit is not None
+    required = ["Open", "Close", "position"] + (["High", "Low"] if use_stops else [])
+    df = df.copy().dropna(subset=required)
+    n = len(df)
+
+    open_ = df["Open"].to_numpy(dtype=float)
+    close = df["Close"].to_numpy(dtype=float)
+    high = df["High"].to_numpy(dtype=float) if use_stops else close
+    low = df["Low"].to_numpy(dtype=float) if use_stops else close
+    target = df["position"].to_numpy(dtype=float)
+    inputs = [open_, high, low, close, target]
+    outputs = [np.empty(n), np.empty(n, dtype=np.int64), np.empty(n), np.empty(n)]
+    ledger = [np.zeros(n, dtype=np.int64), np.full(n, -1, dtype=np.int64),
+              np.full(n, np.nan), np.full(n, np.nan), np.zeros(n), np.zeros(n, dtype=np.int64)]
+    if not use_stops and (commission_on == "initial" or commission == 0):
+        rows = _vector_path(open_, close, target, float(position_size), float(slippage), float(commission),
+                            float(initial_capital), fill == "next_open", commission_on == "equity",
+                            *outputs, *ledger)
+    else:
+        if njit is None:
+            # plain Python floats are much faster than numpy scalars in an interpreted loop
+            inputs = [a.tolist() for a in inputs]
+            outputs = [a.tolist() for a in outputs]
+            ledger = [a.tolist() for a in ledger]
+        rows = _bar_loop(*inputs, float(position_size), float(slippage), float(commission), float(initial_capital),
+                         fill == "next_open", commission_on == "equity",
+                         math.nan if stop_loss is None else float(stop_loss),
+                         math.nan if take_profit is None else float(take_profit),
+                         *outputs, *ledger)
+
+    held, trades, net_ret, equity = (np.asarray(a) for a in outputs)
+    df["held"] = held
+    df["trades"] = trades
+    df["net_ret"] = net_ret
+    equity = pd.Series(equity, index=df.index, name="equity")
+    df["equity"] = equity
+
+    entry_i, exit_i, entry_px, exit_px, side, reason = (np.asarray(a)[:rows] for a in ledger)
+    closed = exit_i >= 0
+    index = df.index
+    ledger_df = pd.DataFrame({
+        "entry_time": index[entry_i],
+        "entry_price": entry_px,
+        "exit_time": pd.Series(index[np.where(closed, exit_i, 0)]).where(closed).to_numpy(),
+        "exit_price": exit_px,
+        "side": side,
+        "return": np.sign(side) * (exit_px / entry_px - 1),
+        "bars": np.where(closed, exit_i - entry_i, n - 1 - entry_i),
+        "reason": [EXIT_REASONS[r] for r in reason],
+    })
+    perf = compute_perf(equity, freq_per_year=freq_per_year, positions=held * position_size)
+    return {
+        "df": df,
+        "equity": equity,
+        "perf": perf,
+        "trades": ledger_df
+    }
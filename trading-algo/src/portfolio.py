@@ -0,0 +1,113 @@
+# src/portfolio.py
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Union
+from .utils import compute_perf
+
+
+def build_panel(frames: Dict[str, pd.DataFrame],
+                columns: Iterable[str] = ("Open", "Close", "position")) -> Dict[str, pd.DataFrame]:
+    """
+    Align per-ticker DataFrames (e.g. generate_signals output) into (time x asset) panels,
+    one per column, on the union of their indexes. Bars a ticker does not have are NaN.
+    """
+    index = None
+    for df in frames.values():
+        index = df.index if index is None else index.union(df.index)
+    return {col: pd.DataFrame({t: df[col].reindex(index) for t, df in frames.items()}, index=index)
+            for col in columns}
+
+
+def run_portfolio_backtest(open_: pd.DataFrame,
+                           close: pd.DataFrame,
+                           position: pd.DataFrame,
+                           initial_capital: float = 10000,
+                           position_size: float = 1.0,
+                           slippage: float = 0.0,
+                           commission: float = 0.0,
+                           weights: Union[pd.DataFrame, pd.Series, None] = None,
+                           mask: Optional[pd.DataFrame] = None,
+                           freq_per_year: int = 252) -> Dict:
+    """
+    Panel backtest over aligned (time x asset) frames in one vectorized pass:
+      - open_, close, position: same index/columns; position (0 or 1) is the desired
+        position at bar open, as produced by generate_signals
+      - mask: bars that belong to each asset's history; defaults to the bars where
+        Open, Close and position are all present (ragged histories)
+      - per asset, the equity curve is what run_backtest gives on that asset's bars
+        (each asset starts with initial_capital) and is NaN outside its history
+      - the portfolio holds `weights` (fraction of portfolio equity per asset, per bar or
+        per asset) of each asset; default is equal weight over the assets trading that bar
+      - costs: commission is a flat amount per trade; slippage is charged on the traded
+        fraction of equity (run_backtest only applies it to the reported fill prices,
+        so keep slippage=0 to compare per-asset curves with it)
+    Returns:
+      dict with per-asset and portfolio equity, portfolio returns and exposure,
+      the trade matrix, and compute_perf for the assets and for the portfolio
+    """
+    open_, close, position = (x.reindex(index=close.index, columns=close.columns) for x in (open_, close, position))
+    if mask is None:
+        mask = open_.notna() & close.notna() & position.notna()
+    valid = mask.reindex(index=close.index, columns=close.columns, fill_value=False).to_numpy(dtype=bool)
+
+    # previous position / close on each asset's own bars (gaps are skipped, like dropna)
+    px = np.where(valid, close.to_numpy(dtype=float), np.nan)
+    pos = np.where(valid, position.to_numpy(dtype=float), np.nan)
+    px_prev = _shift_valid(px)
+    pos_prev = np.nan_to_num(_shift_valid(pos), nan=0.0)
+    pos = np.where(valid, pos, 0.0)
+
+    trade = np.where(valid, pos - pos_prev, 0.0)
+    traded = trade != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        close_ret = np.where(valid & ~np.isnan(px_prev), px / px_prev - 1, 0.0)
+    exposure = pos * position_size
+    strategy_ret = exposure * close_ret
+
+    # per-asset curves, each on its own capital
+    trade_cost = np.where(traded, commission / initial_capital, 0.0)
+    if slippage:
+        trade_cost = trade_cost + np.abs(trade) * position_size * slippage
+    asset_equity = np.cumprod(1 + (strategy_ret - trade_cost), axis=0) * initial_capital
+    asset_equity[~valid] = np.nan
+
+    # portfolio: weighted sum of asset returns, flat commission per trade on the whole book
+    w = _weights(weights, close, valid)
+    portfolio_ret = (w * strategy_ret).sum(axis=1)
+    portfolio_ret -= traded.sum(axis=1) * (commission / initial_capital)
+    if slippage:
+        portfolio_ret -= (w * np.abs(trade)).sum(axis=1) * position_size * slippage
+    gross_exposure = (w * exposure).sum(axis=1)
+
+    index, columns = close.index, close.columns
+    equity = pd.Series(np.cumprod(1 + portfolio_ret) * initial_capital, index=index, name="equity")
+    asset_equity = pd.DataFrame(asset_equity, index=index, columns=columns)
+    return {
+        "equity": equity,
+        "returns": pd.Series(portfolio_ret, index=index, name="returns"),
+        "exposure": pd.Series(gross_exposure, index=index, name="exposure"),
+        "asset_equity": asset_equity,
+        "trades": pd.DataFrame(trade, index=index, columns=columns),
+        "weights": pd.DataFrame(w, index=index, columns=columns),
+        "asset_perf": compute_perf(asset_equity, freq_per_year=freq_per_year, positions=exposure),
+        "perf": compute_perf(equity, freq_per_year=freq_per_year, positions=gross_exposure),
+    }
+
+
+def _shift_valid(values: np.ndarray) -> np.ndarray:
+    """For every bar, the value at the asset's previous valid bar (NaN if none)."""
+    filled = pd.DataFrame(values).ffill().to_numpy()
+    prev = np.full_like(values, np.nan)
+    prev[1:] = filled[:-1]
+    return prev
+
+
+def _weights(weights, close: pd.DataFrame, valid: np.ndarray) -> np.ndarray:
+    if weights is None:
+        active = valid.sum(axis=1, keepdims=True)
+        return np.divide(valid, active, out=np.zeros(valid.shape), where=active > 0)
+    if isinstance(weights, pd.Series):
+        w = np.broadcast_to(weights.reindex(close.columns).to_numpy(dtype=float), valid.shape)
+    else:
+        w = weights.reindex(index=close.index, columns=close.columns).to_numpy(dtype=float)
+    return np.where(valid, np.nan_to_num(w), 0.0)
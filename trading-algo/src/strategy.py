@@ -15,7 +15,8 @@ def generate_signals(df: pd.DataFrame,
                      fast: int=20,
                      slow: int=50,
                      rsi_low: float=30,
-                     rsi_high: float=70) -> pd.DataFrame:
+                     rsi_high: float=70,
+                     rsi_period: int=14) -> pd.DataFrame:
     """
     Vectorized signal generation:
       - Long when ma_fast crosses above ma_slow AND rsi < rsi_high
@@ -24,7 +25,7 @@ def generate_signals(df: pd.DataFrame,
       1 => long
       0 => flat
     """
-    df = add_indicators(df, fast=fast, slow=slow)
+    df = add_indicators(df, fast=fast, slow=slow, rsi_period=rsi_period)
     df["ma_diff"] = df["ma_fast"] - df["ma_slow"]
     # sign of diff
     df["ma_sign"] = np.sign(df["ma_diff"])
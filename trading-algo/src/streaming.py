@@ -0,0 +1,35 @@
+# src/streaming.py
+from typing import Iterable, List
+
+from .rolling import RollingMean, WilderRSI
+
+
+class StreamingStrategy:
+    """
+    MA crossover + RSI filter fed one bar at a time, with O(window) state:
+      - update(close) returns the signal for the bar just closed, i.e. the position
+        to hold from the next bar's open
+      - `position` is the position held during the bar just closed
+    Both match the signal / position columns of generate_signals with the same parameters.
+    """
+    def __init__(self, fast: int=20, slow: int=50, rsi_high: float=70, rsi_period: int=14):
+        self.rsi_high = rsi_high
+        self.ma_fast = RollingMean(fast, min_periods=1)
+        self.ma_slow = RollingMean(slow, min_periods=1)
+        self.rsi = WilderRSI(rsi_period)
+        self.signal = 0
+        self.position = 0
+
+    def update(self, close: float) -> int:
+        fast = self.ma_fast.update(close)
+        slow = self.ma_slow.update(close)
+        rsi = self.rsi.update(close)
+        self.position = self.signal
+        self.signal = 1 if fast > slow else 0
+        if rsi > self.rsi_high:
+            self.signal = 0
+        return self.signal
+
+    def update_many(self, closes: Iterable[float]) -> List[int]:
+        """Feed a batch of closes; returns the signal after each bar."""
+        return [self.update(close) for close in closes]
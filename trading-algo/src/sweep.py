@@ -0,0 +1,117 @@
+# src/sweep.py
+import itertools
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+
+from .analytics import METRICS, performance
+
+PARAM_COLUMNS = ["fast", "slow", "rsi_period", "rsi_high"]
+PERF_COLUMNS = list(METRICS)
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def param_grid(fast: Iterable[int],
+               slow: Iterable[int],
+               rsi_period: Iterable[int] = (14,),
+               rsi_high: Iterable[float] = (70,),
+               require_fast_below_slow: bool = True) -> pd.DataFrame:
+    """
+    Cartesian product of parameter ranges as a DataFrame with one row per combination.
+    Combinations with fast >= slow are dropped unless require_fast_below_slow=False.
+    """
+    grid = pd.DataFrame(list(itertools.product(fast, slow, rsi_period, rsi_high)), columns=PARAM_COLUMNS)
+    if require_fast_below_slow:
+        grid = grid[grid["fast"] < grid["slow"]]
+    return grid.reset_index(drop=True)
+
+
+def indicator_matrices(close: pd.Series, ma_windows: Iterable[int], rsi_periods: Iterable[int]):
+    """
+    Compute every needed indicator window once.
+    Returns (ma_windows, ma_matrix, rsi_periods, rsi_matrix) where each matrix has one
+    row per window, using the same rolling/RSI definitions as strategy.add_indicators.
+    """
+    ma_windows = np.unique(np.asarray(list(ma_windows), dtype=np.int64))
+    rsi_periods = np.unique(np.asarray(list(rsi_periods), dtype=np.int64))
+    ma = np.empty((len(ma_windows), len(close)))
+    for i, w in enumerate(ma_windows):
+        ma[i] = close.rolling(window=int(w), min_periods=1).mean().to_numpy()
+    rsi = np.empty((len(rsi_periods), len(close)))
+    for i, p in enumerate(rsi_periods):
+        rsi[i] = RSIIndicator(close=close, window=int(p)).rsi().to_numpy()
+    return ma_windows, ma, rsi_periods, rsi
+
+
+def run_sweep(df: pd.DataFrame,
+              fast: Iterable[int],
+              slow: Iterable[int],
+              rsi_period: Iterable[int] = (14,),
+              rsi_high: Iterable[float] = (70,),
+              initial_capital: float = 10000,
+              position_size: float = 1.0,
+              commission: float = 0.0,
+              freq_per_year: int = 252,
+              max_memory_mb: float = 512,
+              grid: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Vectorized parameter sweep of the MA crossover + RSI strategy:
+      - evaluates every (fast, slow, rsi_period, rsi_high) combination with the same
+        rules as strategy.generate_signals + backtest.run_backtest
+      - indicators are computed once per distinct window and shared by all combinations
+      - combinations are processed in chunks so the working set stays under max_memory_mb
+    Returns:
+      DataFrame with one row per combination: parameters, compute_perf metrics and trade count
+    """
+    df = df.dropna(subset=["Open", "Close"])
+    if grid is None:
+        grid = param_grid(fast, slow, rsi_period, rsi_high)
+    grid = grid.reset_index(drop=True)
+    close = df["Close"].astype(float)
+    n = len(close)
+
+    ma_windows, ma, rsi_periods, rsi = indicator_matrices(
+        close, np.concatenate([grid["fast"], grid["slow"]]), grid["rsi_period"]
+    )
+    fast_idx = np.searchsorted(ma_windows, grid["fast"].to_numpy())
+    slow_idx = np.searchsorted(ma_windows, grid["slow"].to_numpy())
+    rsi_idx = np.searchsorted(rsi_periods, grid["rsi_period"].to_numpy())
+    rsi_high_values = grid["rsi_high"].to_numpy(dtype=float)
+
+    close_ret = close.pct_change().fillna(0).to_numpy()
+    days = (df.index[-1] - df.index[0]).days if n > 1 else 0
+    years = days / 365.25 if days > 0 else 1/252
+
+    # About a dozen float64 (rows, n) buffers are alive while a chunk is evaluated and its
+    # metrics computed; besides the memory cap, keep each buffer around CHUNK_BYTES so the
+    # working set stays in cache
+    rows_per_chunk = max(1, int(min(max_memory_mb * 1024 * 1024 / 12, CHUNK_BYTES) // (8 * max(n, 1))))
+    strategy_ret = position_size * close_ret
+    results = []
+    for start in range(0, len(grid), rows_per_chunk):
+        rows = slice(start, start + rows_per_chunk)
+        signal = ma[fast_idx[rows]] > ma[slow_idx[rows]]
+        signal &= ~(rsi[rsi_idx[rows]] > rsi_high_values[rows, None])
+
+        # position = signal.shift(1).fillna(0); a trade happens whenever the position changes
+        position = np.zeros_like(signal)
+        position[:, 1:] = signal[:, :-1]
+        trade = np.zeros_like(signal)
+        np.not_equal(position[:, 1:], position[:, :-1], out=trade[:, 1:])
+        equity = np.where(position, strategy_ret, 0.0)
+        if commission:
+            equity[trade] -= commission / initial_capital
+        equity += 1
+        np.cumprod(equity, axis=1, out=equity)
+        equity *= initial_capital
+
+        perf = performance(equity, years=years, freq_per_year=freq_per_year,
+                           positions=position * position_size, axis=1)
+        perf["trades"] = np.count_nonzero(trade, axis=1)
+        results.append(pd.DataFrame(perf))
+
+    if not results:
+        return grid.reindex(columns=PARAM_COLUMNS + PERF_COLUMNS + ["trades"])
+    return pd.concat([grid, pd.concat(results, ignore_index=True)], axis=1)
@@ -2,26 +2,39 @@
 import numpy as np
 import pandas as pd
 
-def compute_perf(equity: pd.Series, freq_per_year: int = 252):
+from .analytics import performance
+
+def compute_perf(equity, freq_per_year: int = 252, positions=None):
     """
-    Given equity curve (index = date), compute CAGR, annualized volatility, Sharpe (rf=0),
-    and max drawdown.
+    Given equity curve (index = date), compute total return, CAGR, annualized volatility,
+    Sharpe and Sortino (rf=0), Calmar, max drawdown and its duration in bars, win rate
+    and, when `positions` is given, turnover (see analytics.performance).
+    A DataFrame of equity curves gives one row of metrics per column; NaNs mark bars
+    outside a column's history (ragged histories).
     """
-    returns = equity.pct_change().fillna(0)
-    total_return = equity.iloc[-1] / equity.iloc[0] - 1.0
-    days = (equity.index[-1] - equity.index[0]).days
-    years = days / 365.25 if days > 0 else 1/252
-    cagr = (equity.iloc[-1] / equity.iloc[0]) ** (1/years) - 1.0
-    ann_vol = returns.std() * (freq_per_year ** 0.5)
-    sharpe = cagr / ann_vol if ann_vol != 0 else np.nan
-    # max drawdown
-    roll_max = equity.cummax()
-    drawdown = (equity - roll_max) / roll_max
-    max_dd = drawdown.min()
-    return {
-        "total_return": total_return,
-        "cagr": cagr,
-        "annual_vol": ann_vol,
-        "sharpe": sharpe,
-        "max_drawdown": max_dd
-    }
+    if isinstance(equity, pd.DataFrame):
+        return _compute_perf_columns(equity, freq_per_year, positions)
+    perf = performance(equity.to_numpy(dtype=float), years=_years(equity.index), freq_per_year=freq_per_year,
+                       positions=None if positions is None else np.asarray(positions, dtype=float))
+    return {name: float(value) for name, value in perf.items()}
+
+
+def _years(index) -> float:
+    days = (index[-1] - index[0]).days if len(index) > 1 else 0
+    return days / 365.25 if days > 0 else 1/252
+
+
+def _compute_perf_columns(equity: pd.DataFrame, freq_per_year: int = 252, positions=None) -> pd.DataFrame:
+    """compute_perf for every column at once, each over its own non-NaN bars."""
+    values = equity.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=0)
+    n = len(values)
+    first = np.argmax(valid, axis=0)
+    last = n - 1 - np.argmax(valid[::-1], axis=0)
+    dates = pd.DatetimeIndex(equity.index).values
+    days = np.where(has_data, (dates[last] - dates[first]) / np.timedelta64(1, "D"), 0) if n else np.zeros(len(has_data))
+    years = np.where(days > 0, days / 365.25, 1/252)
+    perf = performance(values, years=years, freq_per_year=freq_per_year,
+                       positions=None if positions is None else np.asarray(positions, dtype=float))
+    return pd.DataFrame(perf, index=equity.columns)